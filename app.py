@@ -7,6 +7,8 @@ import glob
 import io  # 엑셀 변환을 위한 모듈
 from datetime import datetime
 from src.parser import load_all_data
+from src.trade_cache import ParsedTradeCache
+from src.indicator_cache import get_indicator_cache
 
 st.set_page_config(layout="wide", page_title="부자의 트레이딩 분석기 (Expi)")
 
@@ -14,6 +16,9 @@ st.title("🧪 테스트(Expi Mode)")
 st.markdown("---")
 
 DATA_DIR = "data"
+CACHE_DIR = os.path.join(DATA_DIR, ".parse_cache")
+# 병렬 파싱 프로세스 수 기본 상한
+PARSE_WORKERS_DEFAULT = 4
 # 색상 매핑 (더 선명하게 변경)
 COLOR_MAP = {"ok": "#00FF00", "x": "#FF0000", "NB": "#0000FF", "unknown": "gray"}
 
@@ -26,7 +31,7 @@ if 'is_analyzed' not in st.session_state:
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
-# 다양한 로그 확장자 대응 (.txt, .txt.log, .log)
+# 다양한 로그 확장자 대응 (.txt, .txt.log, .log + 압축본 .gz/.zst/.bz2)
 files = glob.glob(os.path.join(DATA_DIR, "acc_log.*"))
 dates = set()
 for f in files:
@@ -51,12 +56,35 @@ else:
     else:
         selected_dates = st.sidebar.multiselect("날짜", available_dates, default=available_dates)
 
+    # Streamlit 서버 프로세스 안에서 띄우는 프로세스이므로 기본값은 작게 (날짜 수, CPU 수, PARSE_WORKERS_DEFAULT 중 최솟값)
+    default_workers = max(1, min(PARSE_WORKERS_DEFAULT, os.cpu_count() or 1, len(selected_dates)))
+    parse_workers = st.sidebar.number_input("병렬 파싱 프로세스 수", min_value=1, max_value=64, value=default_workers, step=1)
+
     if st.sidebar.button("🚀 분석 시작"):
         with st.spinner('로그 분석 중...'):
-            raw_df = load_all_data(DATA_DIR, selected_dates)
+            raw_df = load_all_data(DATA_DIR, selected_dates, max_workers=int(parse_workers), cache=ParsedTradeCache(CACHE_DIR))
+            for err_date, err_path, err_msg in raw_df.attrs.get('load_errors', []):
+                st.sidebar.warning(f"⚠️ {err_date} 로그 파싱 실패 ({os.path.basename(err_path)}): {err_msg}")
             st.session_state.df = raw_df
             st.session_state.is_analyzed = True
 
+    # 파싱 캐시 상태 / 초기화
+    with st.sidebar.expander("🗄️ 파싱 캐시"):
+        parse_cache = ParsedTradeCache(CACHE_DIR)
+        cache_cnt, cache_bytes = parse_cache.size()
+        st.caption(f"{cache_cnt}개 날짜 / {cache_bytes / 1024 / 1024:.2f} MB")
+        if st.button("캐시 비우기"):
+            st.success(f"{parse_cache.clear()}개 캐시를 삭제했습니다.")
+
+    # 지표 계산 캐시 상태 / 초기화 (메모리, 앱 프로세스가 살아 있는 동안 유지)
+    with st.sidebar.expander("🧮 지표 캐시"):
+        indicator_cache = get_indicator_cache()
+        ic = indicator_cache.stats()
+        st.caption(f"{ic['entries']:,}개 / {ic['bytes'] / 1024 / 1024:.2f} MB · 적중 {ic['hits']:,} / 미스 {ic['misses']:,} "
+                   f"({ic['hit_rate'] * 100:.0f}%) · 밀려남 {ic['evictions']:,} · 진행 중 캔들이라 건너뜀 {ic['bypassed']:,}")
+        if st.button("지표 캐시 비우기"):
+            st.success(f"{indicator_cache.clear()}개 지표 결과를 삭제했습니다.")
+
 # --- 메인 화면 ---
 if st.session_state.is_analyzed and not st.session_state.df.empty:
     df = st.session_state.df
@@ -273,61 +301,72 @@ if st.session_state.is_analyzed and not st.session_state.df.empty:
         # 1. 전체 재계산 로직
         if submit_batch:
             with st.spinner(f"총 {len(filtered_df)}건에 대해 PASS1 및 전체 지표 재계산 중..."):
-                from src.fetcher import get_ohlcv
-                from src.calculator import IndicatorCalculator
-                import time
+                from src.fetch_planner import fetch_windows
+                from src.calculator import IndicatorBatch, IndicatorCalculator
                 
                 calc = IndicatorCalculator()
                 results = []
                 params_a = {'pass1_n': pass1_n_a, 'wide_n': wide_n_a, 'wide2_n': wide2_n_a, 'trend_n': trend_n_a, 'fast_n': fast_n_a}
                 
                 progress_bar = st.progress(0)
-                total_rows = len(filtered_df)
+                fetch_failed = 0
                 
-                # 지표 추출용 헬퍼 함수 (강력한 패턴 매칭)
-                def get_val(res_dict, pattern):
-                    for k, v in res_dict.items():
-                        if pattern in k: return v
-                    return 0
-
+                # 캔들 조회는 전부 모아서 동시에 실행 (진행바 앞 80%는 조회, 나머지는 지표 계산)
+                # 같은 마켓에서 겹치는 구간은 한 번에 받아 거래별로 잘라서 사용
+                # 거래마다 1분봉(PASS1 계산용, trade_time_utc까지만 정확히 수집) + 기준 분봉
+                jobs = []
+                for _, row in filtered_df.iterrows():
+                    trade_time_utc = pd.to_datetime(row['timestamp'])
+                    jobs.append((row['market'], trade_time_utc, 1, 60))
+                    jobs.append((row['market'], trade_time_utc, tf_a, 200))
+                candles = fetch_windows(jobs, progress=lambda done, total: progress_bar.progress(0.8 * done / total))
+
+                # 같은 마켓 거래들은 받은 구간을 합쳐서 calculate_series 한 번으로 모든 거래 시점을 계산
+                # (lookback=200 이라 거래마다 200개를 받아 calculate 를 부른 것과 같은 값)
+                by_market = {}
                 for i, (idx, row) in enumerate(filtered_df.iterrows()):
+                    df_1m, df_target = candles[2 * i], candles[2 * i + 1]
+                    if df_1m.empty or df_target.empty:
+                        # 데이터 없음과 조회 실패를 구분해서 실패 건수만 따로 집계
+                        if 'fetch_error' in df_1m.attrs or 'fetch_error' in df_target.attrs: fetch_failed += 1
+                        continue
+                    by_market.setdefault(row['market'], []).append(i)
+
+                for done, (market, positions) in enumerate(by_market.items(), 1):
                     try:
-                        market = row['market']
-                        trade_time_utc = pd.to_datetime(row['timestamp'])
-                        
-                        # 1분봉 데이터 수집 (PASS1 계산용) - trade_time_utc까지만 정확히 수집
-                        df_1m = get_ohlcv(market, trade_time_utc, interval_min=1, count=60)
-                        # 기준 분봉 데이터 수집
-                        df_target = get_ohlcv(market, trade_time_utc, interval_min=tf_a, count=200)
-                        
-                        if df_1m.empty or df_target.empty: continue
+                        rows = filtered_df.iloc[positions]
+                        df_target = pd.concat([candles[2 * i + 1] for i in positions]).drop_duplicates('time').sort_values('time')
+                        df_1m = pd.concat([candles[2 * i] for i in positions]).drop_duplicates('time').sort_values('time')
+                        series = calc.calculate_series(df_target.reset_index(drop=True), df_1m.reset_index(drop=True), params=params_a,
+                                                       times=pd.to_datetime(rows['timestamp']), lookback=200)
 
-                        df_target.attrs['interval'] = tf_a
-                        
-                        res = calc.calculate(df_target, df_1m, row.get('bid5_24h', 0), params=params_a)
-                        
-                        if res:
+                        batch = IndicatorBatch.from_frame(series)
+
+                        for j, (i, (_, row)) in enumerate(zip(positions, rows.iterrows())):
+                            if not batch.valid[j]: continue  # 데이터 부족 (calculate 가 None 을 주는 경우)
                             res_row = {
                                 'timestamp': row['timestamp'],
                                 'market': market,
                                 'result': row['result'],
-                                'Sim_PASS1': get_val(res, "PASS1"),
-                                'Sim_Wide1': get_val(res, "wideTrendAvg (n"),
-                                'Sim_Wide2': get_val(res, "wideTrendAvg2"),
-                                'Sim_Trend': get_val(res, "trendAvg"),
-                                'Sim_Cross': get_val(res, "CrossAvg"),
-                                'Sim_Fast': get_val(res, "FastRate"),
-                                'Sim_PrevRate': get_val(res, "PrevPriceRate")
+                                'Sim_PASS1': batch.pass1_ratio[j],
+                                'Sim_Wide1': batch.wide_trend[j],
+                                'Sim_Wide2': batch.wide_trend2[j],
+                                'Sim_Trend': batch.trend_avg[j],
+                                'Sim_Cross': batch.cross_avg[j],
+                                'Sim_Fast': batch.fast_rate[j],
+                                'Sim_PrevRate': batch.price_rate[j]
                             }
-                            results.append(res_row)
-                        
+                            results.append((i, res_row))
+
                     except Exception as e:
-                        print(f"Error processing {idx}: {e}")
-                    
-                    progress_bar.progress((i + 1) / total_rows)
-                    time.sleep(0.01)
-                
+                        print(f"Error processing {market}: {e}")
+
+                    progress_bar.progress(0.8 + 0.2 * done / max(len(by_market), 1))
+                results = [res_row for _, res_row in sorted(results, key=lambda r: r[0])]
+
                 st.session_state.batch_result = pd.DataFrame(results)
+                if fetch_failed:
+                    st.warning(f"⚠️ 캔들 조회 실패 {fetch_failed}건은 결과에서 제외되었습니다. (네트워크/API 오류)")
                 st.success("✅ 재계산 완료! Sim_PASS1 값이 정상적으로 나와야 합니다.")
 
         # --- [전체 결과 표시] ---
@@ -363,16 +402,16 @@ if st.session_state.is_analyzed and not st.session_state.df.empty:
             fetch_end_time = trade_time_utc + pd.Timedelta(minutes=180)
             
             with st.spinner(f"{market} 분석 중..."):
-                from src.fetcher import get_ohlcv
-                from src.calculator import IndicatorCalculator
+                from src.fetcher import get_ohlcv, get_ohlcv_range
                 
-                # 차트용 넉넉한 데이터
+                # 차트용 넉넉한 데이터 (400개는 API 한 페이지(200개)를 넘으므로 구간 조회)
                 df_1m_full = get_ohlcv(market, fetch_end_time, interval_min=1, count=200)
-                df_a_full = get_ohlcv(market, fetch_end_time, interval_min=tf_a, count=400)
-                df_b_full = get_ohlcv(market, fetch_end_time, interval_min=tf_b, count=400)
+                df_a_full = get_ohlcv_range(market, fetch_end_time - pd.Timedelta(minutes=400 * tf_a), fetch_end_time, interval_min=tf_a)
+                df_b_full = get_ohlcv_range(market, fetch_end_time - pd.Timedelta(minutes=400 * tf_b), fetch_end_time, interval_min=tf_b)
                 
                 if not df_a_full.empty and not df_b_full.empty:
-                    calc = IndicatorCalculator()
+                    # 같은 거래/설정을 다시 분석하면 지표는 캐시에서 꺼냄 (거래가 든 캔들이 아직 진행 중이면 매번 계산)
+                    indicator_cache = get_indicator_cache()
                     
                     # 지표 계산용 데이터 분리 (매수 시점까지만)
                     # PASS1의 정확도를 위해 1분봉은 trade_time_utc까지만 잘라서 보냅니다.
@@ -386,8 +425,8 @@ if st.session_state.is_analyzed and not st.session_state.df.empty:
                     params_a = {'pass1_n': pass1_n_a, 'wide_n': wide_n_a, 'wide2_n': wide2_n_a, 'trend_n': trend_n_a, 'fast_n': fast_n_a}
                     params_b = {'pass1_n': pass1_n_b, 'wide_n': wide_n_b, 'wide2_n': wide2_n_b, 'trend_n': trend_n_b, 'fast_n': fast_n_b}
                     
-                    res_a = calc.calculate(df_a_calc, df_1m_calc, target_row.get('bid5_24h', 0), params=params_a)
-                    res_b = calc.calculate(df_b_calc, df_1m_calc, target_row.get('bid5_24h', 0), params=params_b)
+                    res_a = indicator_cache.calculate(market, df_a_calc, df_1m_calc, target_row.get('bid5_24h', 0), params=params_a, interval=tf_a)
+                    res_b = indicator_cache.calculate(market, df_b_calc, df_1m_calc, target_row.get('bid5_24h', 0), params=params_b, interval=tf_b)
                     
                     st.session_state.ab_result = {
                         'row': target_row,
@@ -404,23 +443,22 @@ if st.session_state.is_analyzed and not st.session_state.df.empty:
             
             st.markdown("#### 📊 상세 지표 비교")
             
-            # 지표 추출용 헬퍼
-            def get_val(res_dict, pattern):
-                for k, v in res_dict.items():
-                    if pattern in k: return v
-                return 0
+            # 데이터 부족으로 결과가 없으면 0 으로 표시
+            from src.calculator import IndicatorResult
+            res_a = res['res_a'] or IndicatorResult.zeros()
+            res_b = res['res_b'] or IndicatorResult.zeros()
 
             comp_df = pd.DataFrame({
                 "지표명": ["PASS1 Ratio", "WideTrend1", "WideTrend2", "TrendAvg", "CrossAvg", "FastRate", "PrevPriceRate(%)"],
                 f"🅰️ {res['conf_a']}": [
-                    get_val(res['res_a'], "PASS1"), get_val(res['res_a'], "wideTrendAvg (n"), get_val(res['res_a'], "wideTrendAvg2"),
-                    get_val(res['res_a'], "trendAvg"), get_val(res['res_a'], "CrossAvg"), get_val(res['res_a'], "FastRate"),
-                    get_val(res['res_a'], "PrevPriceRate")
+                    res_a.pass1_ratio, res_a.wide_trend, res_a.wide_trend2,
+                    res_a.trend_avg, res_a.cross_avg, res_a.fast_rate,
+                    res_a.price_rate
                 ],
                 f"🅱️ {res['conf_b']}": [
-                    get_val(res['res_b'], "PASS1"), get_val(res['res_b'], "wideTrendAvg (n"), get_val(res['res_b'], "wideTrendAvg2"),
-                    get_val(res['res_b'], "trendAvg"), get_val(res['res_b'], "CrossAvg"), get_val(res['res_b'], "FastRate"),
-                    get_val(res['res_b'], "PrevPriceRate")
+                    res_b.pass1_ratio, res_b.wide_trend, res_b.wide_trend2,
+                    res_b.trend_avg, res_b.cross_avg, res_b.fast_rate,
+                    res_b.price_rate
                 ]
             })
             st.table(comp_df)
@@ -500,161 +538,58 @@ if st.session_state.is_analyzed and not st.session_state.df.empty:
                 st.markdown("---")
                 st.markdown("#### 4️⃣ 추세 지표 (Trend) 필터")
                 range_w1 = st.slider("WideTrend1 (N값 탐색)", 5, 60, (10, 30), step=5)
+
+                st.markdown("---")
+                sample_n = st.number_input("성공/실패 각각 사용할 거래 수 (0 = 필터된 거래 전체)", min_value=0, value=30, step=10)
                 
                 run_cross = st.form_submit_button("🚀 정밀 타점 시뮬레이션 시작")
 
             if run_cross:
-                import itertools
-                import time
-                import numpy as np
-                from src.fetcher import get_ohlcv
-                from src.calculator import IndicatorCalculator # 기존 계산기도 쓰지만, PASS1은 여기서 직접 계산
+                from src.fetch_planner import fetch_windows
+                from src.entry_optimizer import build_entry_features, score_entry_filters
 
                 st.toast("1분봉과 기준 분봉을 교차 분석 중입니다...")
                 
-                # 데이터 캐싱 준비
-                # 전수조사 대신 속도를 위해 30건씩 샘플링
-                sample_ok = ok_df.head(30)
-                sample_fail = fail_df.head(30)
+                # 데이터 캐싱 준비 (샘플 수 0 이면 필터된 거래 전체)
+                sample_ok = ok_df.head(sample_n) if sample_n else ok_df
+                sample_fail = fail_df.head(sample_n) if sample_n else fail_df
                 combined_samples = pd.concat([sample_ok, sample_fail])
                 
-                cached_data = {}
                 progress_bar = st.progress(0)
+
+                # UTC 시간 문제 해결 (거래마다 한 번만)
+                trade_times = []
+                for ts in combined_samples['timestamp']:
+                    ts_str = str(ts)
+                    if '+' in ts_str: trade_times.append(pd.to_datetime(ts_str).tz_convert(None))
+                    else: trade_times.append(pd.to_datetime(ts_str))
+
+                # 샘플 거래의 1분봉/기준 분봉을 미리 한꺼번에 조회 (같은 마켓의 겹치는 구간은 묶어서 한 번만 호출)
+                sample_keys = []
+                for market, trade_time in zip(combined_samples['market'], trade_times):
+                    # 1분봉은 직전 상황 봐야 하므로 넉넉히
+                    sample_keys.append(((market, trade_time, 1), 20))
+                    for interval in target_intervals:
+                        sample_keys.append(((market, trade_time, interval), 100))
+                sample_keys = list(dict(sample_keys).items())
+                fetched = fetch_windows([key + (count,) for key, count in sample_keys],
+                                        progress=lambda done, total: progress_bar.progress(done / total * 0.9))
+                cached_data = {key: df for (key, _), df in zip(sample_keys, fetched)}
                 
                 # 조합 생성: (분봉, N값_Pass1, N값_Wide1)
                 list_p1 = list(range(range_p1_n[0], range_p1_n[1] + 1))
                 list_w1 = list(range(range_w1[0], range_w1[1] + 1, 5))
-                
-                combinations = list(itertools.product(target_intervals, list_p1, list_w1))
-                total_combs = len(combinations)
-                
-                results = []
-                step = 0
-                
-                for combo in combinations:
-                    interval, n_p1, n_w1 = combo
-                    
-                    # 카운터
-                    cnt_ok_pass = 0    # 성공 케이스인데 조건 통과한 수 (Win)
-                    cnt_fail_pass = 0  # 실패 케이스인데 조건 통과한 수 (Loss)
-                    cnt_fail_skip = 0  # 실패 케이스인데 조건 안 맞아서 잘 거른 수 (Avoid)
-                    cnt_ok_skip = 0    # 성공 케이스인데 조건 너무 빡빡해서 놓친 수 (Miss)
-                    
-                    for idx, row in combined_samples.iterrows():
-                        market = row['market']
-                        # UTC 시간 문제 해결
-                        ts_str = str(row['timestamp'])
-                        if '+' in ts_str: trade_time = pd.to_datetime(ts_str).tz_convert(None)
-                        else: trade_time = pd.to_datetime(ts_str)
-                        
-                        log_24h = row.get('bid5_24h', 0)
-
-                        # [1] 1분봉 데이터 가져오기 (디테일 확인용)
-                        k_1m = (market, trade_time, 1)
-                        if k_1m not in cached_data:
-                            # 1분봉은 직전 상황 봐야 하므로 넉넉히
-                            cached_data[k_1m] = get_ohlcv(market, trade_time, 1, 20)
-                        df_1m = cached_data[k_1m]
-                        
-                        # [2] 기준 분봉 데이터 가져오기 (배경 확인용)
-                        k_base = (market, trade_time, interval)
-                        if k_base not in cached_data:
-                            cached_data[k_base] = get_ohlcv(market, trade_time, interval, 100)
-                        df_base = cached_data[k_base]
-                        
-                        if df_1m.empty or df_base.empty: continue
-                        
-                        # --- [형님의 PASS 1 로직 직접 구현] ---
-                        # 1. 1분봉 파워 (직전 1분봉 거래대금) - 실제 체결된 봉 기준
-                        # timestamp가 '진입 시점'이라면, 그 직전에 완성된 1분봉을 봐야 함 (iloc[-1] or -2 주의)
-                        # 보통 백테스팅에선 iloc[-2]가 '직전 완성봉'
-                        last_1m = df_1m.iloc[-2] 
-                        vol_1m = last_1m['volume'] * last_1m['close'] # 거래대금 근사치
-                        
-                        # 2. 기준 분봉 배경 (N개 평균)
-                        # df_base에서 N개 가져오기
-                        if len(df_base) < n_p1 + 1: continue
-                        base_subset = df_base.iloc[-(n_p1+1):-1] # 직전 완성봉들
-                        avg_base_val = (base_subset['volume'] * base_subset['close']).mean()
-                        
-                        # 3. 비율 계산
-                        if avg_base_val == 0: pass1_ratio = 0
-                        else: pass1_ratio = vol_1m / avg_base_val
-                        
-                        # --- [필터링 1: 비율 조건] ---
-                        if not (range_p1_ratio[0] <= pass1_ratio <= range_p1_ratio[1]):
-                            # 범위 밖이면 진입 안함 (Skip)
-                            if row['result'] == 'ok': cnt_ok_skip += 1
-                            else: cnt_fail_skip += 1
-                            continue
-
-                        # --- [필터링 2: 체결강도 시뮬레이션 (Skip 조건)] ---
-                        # 양봉 조건: 시가보다 종가가 높았나?
-                        if use_yangbong and (last_1m['close'] <= last_1m['open']):
-                            if row['result'] == 'ok': cnt_ok_skip += 1
-                            else: cnt_fail_skip += 1
-                            continue
-                        
-                        # 거래량 증가 조건
-                        if use_vol_up:
-                            prev_1m = df_1m.iloc[-3]
-                            if last_1m['volume'] <= prev_1m['volume']:
-                                if row['result'] == 'ok': cnt_ok_skip += 1
-                                else: cnt_fail_skip += 1
-                                continue
-                                
-                        # --- [필터링 3: 추세 지표 (WideTrend)] ---
-                        # 이건 기존 계산기 활용
-                        df_base.attrs['interval'] = interval
-                        calc = IndicatorCalculator()
-                        # WideTrend만 봅니다
-                        p_sim = {'pass1_n': 3, 'wide_n': n_w1, 'wide2_n': 2, 'trend_n': 1, 'fast_n': 10}
-                        res_ind = calc.calculate(df_base, df_1m, log_24h, p_sim)
-                        if not res_ind: continue
-                        
-                        wd_val = res_ind.get(f"wideTrendAvg (n{n_w1})", 0)
-                        
-                        # WideTrend가 1.0 이상이어야 진입한다고 가정 (기본 필터)
-                        if wd_val < 1.0:
-                             if row['result'] == 'ok': cnt_ok_skip += 1
-                             else: cnt_fail_skip += 1
-                             continue
-
-                        # --- [최종 진입] ---
-                        # 여기까지 왔으면 매수 버튼 누른 것
-                        if row['result'] == 'ok': cnt_ok_pass += 1
-                        else: cnt_fail_pass += 1
-
-                    # --- [점수 산정] ---
-                    total_try = cnt_ok_pass + cnt_fail_pass
-                    if total_try == 0: continue
-                    
-                    win_rate = cnt_ok_pass / total_try
-                    # 실패 방어율: 원래 실패였던 애들 중 몇 개나 안 사고 넘겼나?
-                    fail_total = len(sample_fail)
-                    avoid_rate = cnt_fail_skip / fail_total if fail_total > 0 else 0
-                    
-                    score = (win_rate * 0.7) + (avoid_rate * 0.3)
-                    
-                    results.append({
-                        "Score": score,
-                        "설정": f"[{interval}분봉] vs 1분봉",
-                        "PASS1_N": n_p1,
-                        "Wide_N": n_w1,
-                        "승률(Win Rate)": f"{win_rate*100:.1f}%",
-                        "진입 횟수": total_try,
-                        "실패 방어율": f"{avoid_rate*100:.1f}%",
-                        "놓친 수익(Miss)": cnt_ok_skip
-                    })
-                    
-                    step += 1
-                    if step % 100 == 0:
-                        progress_bar.progress(min(step / total_combs, 1.0))
+
+                # 거래마다 PASS1 비율 / 1분봉 양봉·거래량 증가 / WideTrend 를 N 후보 전체에 대해 한 번만 계산하고
+                # 조합 전체를 배열 마스크로 한 번에 채점 (조합 x 거래 루프 없음)
+                features = build_entry_features(combined_samples, trade_times, cached_data, target_intervals, list_p1, list_w1)
+                df_res = score_entry_filters(features, range_p1_ratio, use_yangbong, use_vol_up)
                 
                 progress_bar.progress(1.0)
+                st.caption(f"거래 {len(combined_samples):,}건 (성공 {len(sample_ok):,} / 실패 {len(sample_fail):,}) x 조합 {len(target_intervals) * len(list_p1) * len(list_w1):,}개 채점")
                 
-                if results:
-                    df_res = pd.DataFrame(results).sort_values("Score", ascending=False)
+                if not df_res.empty:
+                    df_res = df_res.sort_values("Score", ascending=False)
                     best = df_res.iloc[0]
                     
                     st.success(f"🎉 찾았습니다! 1분봉의 '가짜 신호'를 가장 잘 걸러내는 설정입니다.")
@@ -0,0 +1,710 @@
+"""
+성능 측정 / 회귀 비교 스크립트
+사용 예) python benchmark.py parser data/acc_log.2025-12-30.txt
+"""
+import argparse
+import bz2
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+from src import fetcher
+from src.parser import _TIME_RE, _time_to_ms, concat_result_frames, open_acc_log, parse_single_day_expi
+from tests.legacy import (baseline_entry_scan, legacy_calculate, legacy_decode, legacy_entry_scan,
+                          legacy_parse_single_day_expi, tuple_decode)
+from tests.synthetic import synthetic_history, synthetic_trades
+
+
+def _date_from_path(path):
+    match = re.search(r'acc_log\.(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+    if not match:
+        raise SystemExit(f"파일명에서 날짜를 찾을 수 없습니다: {path}")
+    return match.group(1)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def bench_parser(paths):
+    """원본 파서와 현재 파서의 결과가 같은지 확인하고 처리 속도(lines/s)를 비교"""
+    for path in paths:
+        date_str = _date_from_path(path)
+        n_lines = _count_lines(path)
+
+        old_df, old_sec = _timed(legacy_parse_single_day_expi, path, date_str)
+        new_df, new_sec = _timed(parse_single_day_expi, path, date_str)
+
+        # 출력 dtype(categorical/float32/datetime64[ns])이 바뀌었으므로 원본 결과를 같은 dtype으로 맞춘 뒤 비교
+        pd.testing.assert_frame_equal(new_df.reset_index(drop=True), old_df.reset_index(drop=True).astype(new_df.dtypes.to_dict()))
+
+        print(f"[{os.path.basename(path)}] {n_lines:,} lines / 거래 {len(new_df):,}건 - 결과 일치")
+        print(f"   원본: {old_sec:.3f}s ({n_lines / old_sec:,.0f} lines/s)")
+        print(f"   현재: {new_sec:.3f}s ({n_lines / new_sec:,.0f} lines/s) -> x{old_sec / new_sec:.2f}")
+
+
+def bench_timestamps(paths):
+    """타임스탬프 디코딩 마이크로 벤치마크: 줄마다 strptime vs 자리수 기반 ms 변환"""
+    for path in paths:
+        date_str = _date_from_path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            time_strs = [m.group(1) for m in map(_TIME_RE.search, f) if m]
+        n = len(time_strs)
+
+        def old_decode():
+            for t in time_strs:
+                datetime.strptime(f"{date_str} {t}", "%Y-%m-%d %H:%M:%S.%f")
+
+        def new_decode():
+            for t in time_strs:
+                _time_to_ms(t)
+
+        def old_column():
+            return pd.Series([datetime.strptime(f"{date_str} {t}", "%Y-%m-%d %H:%M:%S.%f") for t in time_strs])
+
+        def new_column():
+            ms = pd.Series([_time_to_ms(t) for t in time_strs])
+            return pd.Timestamp(date_str) + pd.to_timedelta(ms, unit='ms')
+
+        _, old_sec = _timed(old_decode)
+        _, new_sec = _timed(new_decode)
+        old_col, old_col_sec = _timed(old_column)
+        new_col, new_col_sec = _timed(new_column)
+        assert (old_col == new_col).all()
+
+        print(f"[{os.path.basename(path)}] 타임스탬프 줄 {n:,}개")
+        print(f"   strptime      : {n / old_sec:,.0f} lines/s")
+        print(f"   ms 정수 변환  : {n / new_sec:,.0f} lines/s -> x{old_sec / new_sec:.2f}")
+        print(f"   컬럼 생성 (datetime 객체 vs ms 벡터 변환): {old_col_sec:.3f}s vs {new_col_sec:.3f}s")
+
+
+def _compress_copies(path, out_dir):
+    base = os.path.join(out_dir, os.path.basename(path))
+    copies = {}
+    with open(path, 'rb') as src, gzip.open(base + '.gz', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    copies['gz'] = base + '.gz'
+    with open(path, 'rb') as src, bz2.open(base + '.bz2', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    copies['bz2'] = base + '.bz2'
+    try:
+        import zstandard
+        with open(path, 'rb') as src, open(base + '.zst', 'wb') as dst:
+            zstandard.ZstdCompressor().copy_stream(src, dst)
+        copies['zst'] = base + '.zst'
+    except ImportError:
+        print("   (zstandard 미설치 - .zst 생략)")
+    return copies
+
+
+def _read_all_lines(path):
+    with open_acc_log(path) as f:
+        return sum(1 for _ in f)
+
+
+def bench_compressed(paths):
+    """압축 로그 직접 읽기: 평문 대비 줄 읽기 처리량(MB/s)과 전체 파싱 시간 비교"""
+    for path in paths:
+        date_str = _date_from_path(path)
+        text_mb = os.path.getsize(path) / 1024 / 1024
+        with tempfile.TemporaryDirectory() as tmp:
+            copies = _compress_copies(path, tmp)
+            base_df, base_parse = _timed(parse_single_day_expi, path, date_str)
+            _, base_read = _timed(_read_all_lines, path)
+
+            print(f"[{os.path.basename(path)}] 평문 {text_mb:.1f} MB")
+            print(f"   평문 : 읽기 {text_mb / base_read:8.1f} MB/s | 파싱 {base_parse:.3f}s")
+            for kind, c_path in copies.items():
+                c_mb = os.path.getsize(c_path) / 1024 / 1024
+                c_df, c_parse = _timed(parse_single_day_expi, c_path, date_str)
+                _, c_read = _timed(_read_all_lines, c_path)
+                pd.testing.assert_frame_equal(c_df, base_df)
+                print(f"   {kind:4} : 읽기 {text_mb / c_read:8.1f} MB/s | 파싱 {c_parse:.3f}s "
+                      f"(x{c_parse / base_parse:.2f}, 파일 {c_mb:.1f} MB = {c_mb / text_mb * 100:.0f}%) - 결과 일치")
+
+
+def _traced(func, *args):
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def bench_memory(paths):
+    """여러 날짜(예: 한 달치) 로그 파싱 시 피크 메모리와 결과 DataFrame 크기 비교"""
+    jobs = [(path, _date_from_path(path)) for path in paths]
+
+    def run_legacy():
+        return pd.concat([legacy_parse_single_day_expi(p, d) for p, d in jobs], ignore_index=True)
+
+    def run_current():
+        return concat_result_frames([parse_single_day_expi(p, d) for p, d in jobs])
+
+    old_df, old_peak = _traced(run_legacy)
+    new_df, new_peak = _traced(run_current)
+    old_size = old_df.memory_usage(deep=True).sum()
+    new_size = new_df.memory_usage(deep=True).sum()
+
+    mb = 1024 * 1024
+    print(f"로그 {len(jobs)}개 / 거래 {len(new_df):,}건")
+    print(f"   파싱 피크 메모리 : 원본 {old_peak / mb:8.2f} MB -> 현재 {new_peak / mb:8.2f} MB ({new_peak / old_peak * 100:.0f}%)")
+    print(f"   결과 DataFrame   : 원본 {old_size / mb:8.2f} MB -> 현재 {new_size / mb:8.2f} MB ({new_size / old_size * 100:.0f}%)")
+    print(f"   거래 1건당       : 원본 {old_size / len(old_df):,.0f} B -> 현재 {new_size / len(new_df):,.0f} B")
+    print("   컬럼별 (원본 -> 현재, bytes):")
+    old_cols = old_df.memory_usage(deep=True, index=False)
+    new_cols = new_df.memory_usage(deep=True, index=False)
+    for c in new_df.columns:
+        print(f"      {c:15} {str(old_df[c].dtype):15} {old_cols[c]:>12,} -> {str(new_df[c].dtype):15} {new_cols[c]:>12,}")
+
+
+def bench_http(n_requests, latency_ms, handshake_ms):
+    """로컬 스텁 서버로 요청마다 새 연결(원본 requests.get)과 keep-alive 세션의 요청당 지연 비교"""
+    from src.upbit_stub import UpbitStubServer
+
+    with UpbitStubServer(latency=latency_ms / 1000, handshake=handshake_ms / 1000, rate_limit=None) as server:
+        url = f"{server.url}/v1/candles/minutes/1"
+        base = pd.Timestamp('2024-03-01 12:00:00')
+        params = [{"market": "KRW-BTC", "to": (base - pd.Timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ"), "count": 200}
+                  for i in range(n_requests)]
+
+        def legacy():
+            for p in params:
+                requests.get(url, params=p, headers={"accept": "application/json"}).json()
+
+        def pooled():
+            session = fetcher.get_session()
+            for p in params:
+                session.get(url, params=p, timeout=fetcher.HTTP_TIMEOUT).json()
+
+        fetcher.configure_http(base_url=server.url)
+        pooled()  # 연결 미리 열어두기
+        _, old_sec = _timed(legacy)
+        _, new_sec = _timed(pooled)
+
+    print(f"요청 {n_requests}건 (지연 {latency_ms}ms, 핸드셰이크 {handshake_ms}ms)")
+    print(f"   requests.get : {old_sec * 1000 / n_requests:.2f} ms/req")
+    print(f"   세션 풀      : {new_sec * 1000 / n_requests:.2f} ms/req -> 요청당 {(old_sec - new_sec) * 1000 / n_requests:.2f} ms 절약")
+
+
+def bench_fetch(n_jobs, latency_ms, workers):
+    """로컬 스텁 서버(초당 한도 적용)로 순차 get_ohlcv 와 fetch_many 동시 조회 비교"""
+    from src.upbit_stub import UpbitStubServer
+
+    fetcher.set_candle_store(None)  # 저장소 없이 매번 API 호출
+    base = pd.Timestamp('2024-03-01 12:00:00')
+    jobs = [(market, base + pd.Timedelta(minutes=7 * i), interval, 200)
+            for i in range(n_jobs // 2) for market, interval in (('KRW-BTC', 1), ('KRW-ETH', 5))]
+
+    with UpbitStubServer(latency=latency_ms / 1000) as server:
+        fetcher.configure_http(base_url=server.url)
+        old, old_sec = _timed(lambda: [fetcher.get_ohlcv(*job) for job in jobs])
+        old_throttled = server.throttled
+        new, new_sec = _timed(lambda: fetcher.fetch_many(jobs, max_workers=workers))
+        new_throttled = server.throttled - old_throttled
+
+    for a, b in zip(old, new):
+        pd.testing.assert_frame_equal(a, b)
+    print(f"조회 {len(jobs)}건 (지연 {latency_ms}ms, 서버 한도 초당 {server.rate_limit}회) - 결과 일치")
+    print(f"   순차        : {old_sec:.2f}s ({len(jobs) / old_sec:.1f} req/s, 429 {old_throttled}회)")
+    print(f"   fetch_many  : {new_sec:.2f}s ({len(jobs) / new_sec:.1f} req/s, 429 {new_throttled}회) -> x{old_sec / new_sec:.2f}")
+
+
+def bench_plan(n_trades, n_markets, interval):
+    """하루치 거래(랜덤 시각)에 대해 fetch_many 개별 조회와 fetch_windows 묶음 조회의 API 호출 수/시간 비교"""
+    import random
+    from src.fetch_planner import fetch_windows, plan_stats
+    from src.upbit_stub import UpbitStubServer
+
+    fetcher.set_candle_store(None)
+    rng = random.Random(0)
+    base = pd.Timestamp('2024-03-01 00:00:00')
+    markets = [f"KRW-M{i:02d}" for i in range(n_markets)]
+    jobs = []
+    for _ in range(n_trades):
+        market, trade_time = rng.choice(markets), base + pd.Timedelta(seconds=rng.randrange(86400))
+        jobs.append((market, trade_time, 1, 60))
+        jobs.append((market, trade_time, interval, 200))
+
+    with UpbitStubServer(rate_limit=None) as server:
+        fetcher.configure_http(base_url=server.url)
+        old, old_sec = _timed(fetcher.fetch_many, jobs)
+        old_calls = server.requests_served
+        new, new_sec = _timed(fetch_windows, jobs)
+        new_calls = server.requests_served - old_calls
+
+    for a, b in zip(old, new):
+        pd.testing.assert_frame_equal(a, b.reset_index(drop=True))
+    _, _, planned = plan_stats(jobs)
+    print(f"거래 {n_trades}건 / 마켓 {n_markets}개 / 조회 {len(jobs)}건 (1분봉 60개 + {interval}분봉 200개) - 결과 일치")
+    print(f"   fetch_many    : API {old_calls}회, {old_sec:.2f}s")
+    print(f"   fetch_windows : API {new_calls}회 (계획 {planned}회), {new_sec:.2f}s -> 호출 x{old_calls / max(new_calls, 1):.1f} 감소")
+
+
+def bench_resample(days, no_trade_rate=None):
+    """같은 구간의 1분봉을 resample_candles 로 묶은 결과가 업비트(스텁) 분봉과 같은지 + 합성 시간"""
+    from src import upbit_stub
+    from src.fetcher import get_ohlcv_range
+    from src.resample import resample_candles
+    from src.upbit_stub import UpbitStubServer
+
+    fetcher.set_candle_store(None)
+    if no_trade_rate is not None:
+        upbit_stub.NO_TRADE_RATE = no_trade_rate  # 거래 없는 분 비율 (높을수록 비유동 마켓)
+    intervals = [3, 5, 10, 15, 30, 60, 240]
+    # 가장 큰 분봉(240분) 경계에 맞춘 구간: 양 끝 버킷이 모두 온전함
+    start = pd.Timestamp('2024-03-01 00:00:00')
+    end = start + pd.Timedelta(days=days)
+
+    with UpbitStubServer(rate_limit=None) as server:
+        fetcher.configure_http(base_url=server.url)
+        df_1m = get_ohlcv_range('KRW-BTC', start, end, interval_min=1)
+        direct = {interval: get_ohlcv_range('KRW-BTC', start, end, interval_min=interval) for interval in intervals}
+
+    local, sec = _timed(lambda: {interval: resample_candles(df_1m, interval, start=start) for interval in intervals})
+    for interval in intervals:
+        pd.testing.assert_frame_equal(direct[interval], local[interval])
+    print(f"1분봉 {len(df_1m):,}개 ({days}일, 거래 없는 분 {upbit_stub.NO_TRADE_RATE:.0%}) -> 분봉 {intervals} - 결과 일치")
+    print(f"   resample_candles : {sec * 1000 / len(intervals):.2f} ms/분봉")
+
+
+def bench_decode(n_responses, count):
+    """캔들 응답 JSON -> DataFrame 변환 CPU 시간 비교 (네트워크 없이, 스텁 서버와 같은 응답 형식)"""
+    from src.candle_store import rows_to_frame
+    from src.upbit_stub import candles_to_json, synthetic_candles
+
+    base = pd.Timestamp('2024-03-01 12:00:00')
+    payloads = []
+    for i in range(n_responses):
+        to_ts = int((base - pd.Timedelta(minutes=count * i)).value // 10**9)
+        payloads.append(json.dumps(candles_to_json('KRW-BTC', 1, synthetic_candles('KRW-BTC', 1, to_ts, count))))
+    decoded = [json.loads(p) for p in payloads]
+
+    old, old_sec = _timed(lambda: [legacy_decode(d) for d in decoded])
+    mid, mid_sec = _timed(lambda: [rows_to_frame(tuple_decode(d)) for d in decoded])
+    new, new_sec = _timed(lambda: [rows_to_frame(fetcher.decode_candles(d)) for d in decoded])
+    _, json_sec = _timed(lambda: [json.loads(p) for p in payloads])
+
+    cols = ['time', 'open', 'high', 'low', 'close', 'volume']
+    for a, b, c in zip(old, mid, new):
+        pd.testing.assert_frame_equal(a[cols].astype({'time': 'datetime64[ns]'}), c)
+        pd.testing.assert_frame_equal(b, c)
+    per = 1000 / n_responses
+    print(f"응답 {n_responses}개 x 캔들 {count}개 - 결과 일치 (참고: json.loads {json_sec * per:.3f} ms/응답)")
+    print(f"   DataFrame(dict 목록) : {old_sec * per:.3f} ms/응답")
+    print(f"   행 튜플 + Timestamp  : {mid_sec * per:.3f} ms/응답")
+    print(f"   decode_candles       : {new_sec * per:.3f} ms/응답 -> x{old_sec / new_sec:.1f} / x{mid_sec / new_sec:.1f}")
+
+
+def bench_replay(n_trades, n_markets, interval, fixture):
+    """
+    Tab 5 일괄 재계산과 같은 조회+지표 계산 파이프라인을 녹화 후 재생 서버로 다시 실행해 결과/시간 비교
+    fixture 가 이미 있으면 녹화 없이 재생만 함 (실제 API 에서 ALNALYTIC_RECORD 로 녹화한 파일도 가능)
+    """
+    import random
+    from src.calculator import IndicatorCalculator
+    from src.fetch_planner import fetch_windows
+    from src.fixtures import FixtureSource
+    from src.upbit_stub import UpbitStubServer
+
+    fetcher.set_candle_store(None)
+    rng = random.Random(0)
+    base = pd.Timestamp('2024-03-01 00:00:00')
+    markets = [f"KRW-M{i:02d}" for i in range(n_markets)]
+    jobs = []
+    for _ in range(n_trades):
+        market, trade_time = rng.choice(markets), base + pd.Timedelta(seconds=rng.randrange(86400))
+        jobs.append((market, trade_time, 1, 60))
+        jobs.append((market, trade_time, interval, 200))
+
+    def pipeline():
+        candles = fetch_windows(jobs)
+        calc = IndicatorCalculator()
+        out = []
+        for df_1m, df_target in zip(candles[::2], candles[1::2]):
+            df_target.attrs['interval'] = interval
+            out.append(calc.calculate(df_target, df_1m) if not df_1m.empty and not df_target.empty else None)
+        return candles, out
+
+    recorded = None
+    if not os.path.exists(fixture):
+        with UpbitStubServer(rate_limit=None) as server:
+            fetcher.configure_http(base_url=server.url)
+            fetcher.set_recorder(fixture)
+            try:
+                recorded, rec_sec = _timed(pipeline)
+            finally:
+                fetcher.set_recorder(None)
+        print(f"녹화: API {server.requests_served}회, {rec_sec:.2f}s -> {fixture} ({os.path.getsize(fixture) / 1e6:.1f} MB)")
+
+    source = FixtureSource(fixture)
+    with UpbitStubServer(source=source) as server:
+        fetcher.configure_http(base_url=server.url)
+        (candles, out), sec = _timed(pipeline)
+    failed = sum('fetch_error' in df.attrs for df in candles)
+
+    if recorded is not None:
+        for a, b in zip(recorded[0], candles):
+            pd.testing.assert_frame_equal(a, b)
+        assert recorded[1] == out
+    print(f"재생: 응답 {source.responses}건 녹화분 / 조회 {len(jobs)}건 (실패 {failed}) / API {server.requests_served}회"
+          f"{' - 녹화 결과와 일치' if recorded is not None else ''}")
+    print(f"   조회+계산 {sec:.2f}s ({len(jobs) / sec:.1f} 조회/s, 서버 한도 초당 {server.rate_limit}회, 429 {server.throttled}회)")
+
+
+def bench_series(days, interval, lookback):
+    """기준 분봉마다 calculate 를 부르는 방식과 calculate_series 한 번의 결과/시간 비교"""
+    import numpy as np
+    from src.calculator import INDICATOR_FIELDS, IndicatorCalculator
+
+    df_base, df_1m = synthetic_history(days, interval)
+    calc = IndicatorCalculator()
+    m1_time = df_1m['time']
+
+    def loop():
+        rows = []
+        for i in range(len(df_base)):
+            window = df_base.iloc[max(0, i + 1 - lookback):i + 1]
+            rows.append(calc.calculate(window, df_1m[m1_time <= df_base['time'].iat[i]]))
+        return rows
+
+    old, old_sec = _timed(loop)
+    new, new_sec = _timed(calc.calculate_series, df_base, df_1m, 0, None, None, lookback)
+
+    values = new[list(INDICATOR_FIELDS)].to_numpy()
+    for i, ref in enumerate(old):
+        if ref is None:
+            assert np.isnan(values[i]).all()
+            continue
+        assert np.allclose(values[i], ref[:len(INDICATOR_FIELDS)], rtol=1e-9, equal_nan=True), (i, values[i], ref)
+    print(f"{days}일 {interval}분봉 {len(df_base):,}개 (1분봉 {len(df_1m):,}개, lookback {lookback}) - 결과 일치")
+    print(f"   calculate 반복   : {old_sec:.3f}s ({len(df_base) / old_sec:,.0f} 시점/s)")
+    print(f"   calculate_series : {new_sec * 1000:.2f} ms ({len(df_base) / new_sec:,.0f} 시점/s) -> x{old_sec / new_sec:.0f}")
+
+
+def bench_grid(interval):
+    """파라미터 조합 전체: 조합마다 calculate 호출 vs calculate_grid 한 번"""
+    import itertools
+    import numpy as np
+    from src.calculator import GRID_COLUMNS, IndicatorCalculator
+
+    df_base, df_1m = synthetic_history(2, interval)
+    df_base, df_1m = df_base.iloc[-200:], df_1m.iloc[-60:]
+    grid = {'pass1_n': range(1, 11), 'wide_n': range(5, 65, 5), 'wide2_n': range(1, 6),
+            'trend_n': range(1, 5), 'fast_n': range(10, 40, 5)}
+    calc = IndicatorCalculator()
+    combos = list(itertools.product(*grid.values()))
+
+    old, old_sec = _timed(lambda: [calc.calculate(df_base, df_1m, 0, dict(zip(grid, c))) for c in combos])
+    new, new_sec = _timed(calc.calculate_grid, df_base, df_1m, 0, grid)
+
+    values = new[GRID_COLUMNS].to_numpy()
+    for i, ref in enumerate(old):
+        if ref is None:
+            assert np.isnan(values[i]).all()
+            continue
+        expected = ref[:len(GRID_COLUMNS)]
+        assert np.allclose(values[i], expected, rtol=1e-9), (combos[i], values[i], expected)
+    print(f"{interval}분봉 200개, 조합 {len(combos):,}개 - 결과 일치")
+    print(f"   calculate 반복 : {old_sec:.2f}s")
+    print(f"   calculate_grid : {new_sec * 1000:.2f} ms -> x{old_sec / new_sec:.0f}")
+
+
+def bench_calc(interval, n_calls):
+    """한 시점 지표 계산 초당 호출 수: 원본 pandas 경로 vs calculate(배열 경로) vs calculate_arrays(큰 배열의 뷰)"""
+    import numpy as np
+    from src.calculator import IndicatorCalculator
+
+    df_base_all, df_1m_all = synthetic_history(3, interval)
+    calc = IndicatorCalculator()
+    close_all = df_base_all['close'].to_numpy()
+    vol_all = df_base_all['volume'].to_numpy()
+    vol_1m_all = df_1m_all['volume'].to_numpy()
+    m1_end = np.searchsorted(df_1m_all['time'].to_numpy(), df_base_all['time'].to_numpy(), side='right')
+    ends = [200 + i % (len(df_base_all) - 200) for i in range(n_calls)]
+    frames = [(df_base_all.iloc[e - 200:e], df_1m_all.iloc[max(0, m1_end[e - 1] - 60):m1_end[e - 1]]) for e in ends]
+
+    old, old_sec = _timed(lambda: [legacy_calculate(b, m) for b, m in frames])
+    new, new_sec = _timed(lambda: [calc.calculate(b, m) for b, m in frames])
+    arr, arr_sec = _timed(lambda: [calc.calculate_arrays(close_all[e - 200:e], vol_all[e - 200:e],
+                                                         vol_1m_all[max(0, m1_end[e - 1] - 60):m1_end[e - 1]]) for e in ends])
+
+    for a, b, c in zip(old, new, arr):
+        assert list(a) == list(b.as_dict())  # 예전 dict 키 (표시용 이름) 유지
+        expected = [v for k, v in a.items() if k != 'settings']
+        assert np.allclose(expected, b[:9], rtol=1e-12) and np.allclose(b[:9], c[:9], rtol=1e-12), (a, b, c)
+    print(f"{interval}분봉 200개 + 1분봉 60개, 호출 {n_calls:,}회 - 결과 일치")
+    print(f"   원본 (pandas)              : {n_calls / old_sec:>9,.0f} calls/s")
+    print(f"   calculate (DataFrame 입력) : {n_calls / new_sec:>9,.0f} calls/s -> x{old_sec / new_sec:.1f}")
+    print(f"   calculate_arrays (뷰 입력) : {n_calls / arr_sec:>9,.0f} calls/s -> x{old_sec / arr_sec:.1f}")
+
+
+def bench_stream(n_markets, interval, hours):
+    """완성봉마다 지표 갱신: calculate(최근 200개 프레임) vs IndicatorStream 증분 갱신 (여러 마켓)"""
+    import numpy as np
+    from src.calculator import IndicatorCalculator
+    from src.indicator_stream import IndicatorStreams
+
+    df_base, df_1m = synthetic_history(max(1, -(-(hours + 17 * interval) // 24)), interval)
+    closes, vols = df_base['close'].tolist(), df_base['volume'].tolist()
+    warm = 200
+    n_new = min(len(closes) - warm, hours * 60 // interval)
+    calc = IndicatorCalculator()
+
+    def recompute():
+        out = []
+        for i in range(warm, warm + n_new):
+            frame = df_base.iloc[i - 199:i + 1]
+            # 1분봉 기준이면 새 완성봉이 곧 직전 완성 1분봉 (스트림도 on_candle 에서 PASS1 분자로 반영)
+            frame_1m = frame if interval == 1 else df_1m.iloc[:2]
+            for _ in range(n_markets):
+                out.append(calc.calculate(frame, frame_1m))
+        return out
+
+    streams = IndicatorStreams(lookback=200)
+    markets = [f"KRW-M{i:03d}" for i in range(n_markets)]
+    for m in markets:
+        streams.get(m, interval).warm_up(df_base.iloc[:warm - 1]).add_minute(df_1m['volume'].iat[0])
+
+    def incremental():
+        out = []
+        for i in range(warm - 1, warm - 1 + n_new):
+            for m in markets:
+                # 진행 중 캔들 거래대금도 넘겨야 BID5_Ratio 분모가 calculate 와 같음
+                out.append(streams.on_candle(m, interval, closes[i], vols[i], live_volume=vols[i + 1]))
+        return out
+
+    old, old_sec = _timed(recompute)
+    new, new_sec = _timed(incremental)
+    checked = 0
+    for a, b in zip(old[::n_markets], new[::n_markets]):
+        assert np.allclose(a[:9], b[:9], rtol=1e-9), (a, b)
+        checked += 1
+    n = n_markets * n_new
+    print(f"마켓 {n_markets}개 x {interval}분봉 완성 {n_new}개 = 갱신 {n:,}회 - 결과 일치 ({checked}개 시점 비교)")
+    print(f"   calculate 재계산    : {n / old_sec:>10,.0f} 갱신/s")
+    print(f"   IndicatorStream 증분 : {n / new_sec:>10,.0f} 갱신/s -> x{old_sec / new_sec:.0f} "
+          f"(한 코어로 1분봉 기준 {n / new_sec / (1 / 60):,.0f} 마켓 감당)")
+
+
+def bench_cache(n_samples, interval, sweeps):
+    """같은 샘플을 여러 번 분석 (단건 A/B calculate + 타점 시뮬레이션 calculate_grid): 매번 계산 vs IndicatorCache"""
+    import numpy as np
+    from src.calculator import IndicatorCalculator
+    from src.indicator_cache import IndicatorCache
+
+    df_base_all, df_1m_all = synthetic_history(3, interval)
+    m1_end = np.searchsorted(df_1m_all['time'].to_numpy(), df_base_all['time'].to_numpy(), side='right')
+    samples = []
+    for i in range(n_samples):
+        e = 200 + (i * 37) % (len(df_base_all) - 200)
+        samples.append((f"KRW-M{i % 20:03d}", df_base_all.iloc[e - 100:e], df_1m_all.iloc[max(0, m1_end[e - 1] - 20):m1_end[e - 1]]))
+    params_ab = [{'pass1_n': 3, 'wide_n': 17}, {'pass1_n': 5, 'wide_n': 20}]
+    wide_grid = {'pass1_n': [3], 'wide_n': list(range(10, 35, 5)), 'wide2_n': [2], 'trend_n': [1], 'fast_n': [10]}
+
+    def sweep(calculate, calculate_grid):
+        out = []
+        for market, df_base, df_1m in samples:
+            out.extend(calculate(market, df_base, df_1m, p) for p in params_ab)
+            out.append(calculate_grid(market, df_base, df_1m, wide_grid)['wide_trend'].to_numpy())
+        return out
+
+    calc = IndicatorCalculator()
+    plain = (lambda m, b, o, p: calc.calculate(b, o, 0, p), lambda m, b, o, g: calc.calculate_grid(b, o, 0, g))
+    old, old_sec = _timed(lambda: [sweep(*plain) for _ in range(sweeps)])
+
+    cache = IndicatorCache()
+    cached = (lambda m, b, o, p: cache.calculate(m, b, o, 0, p, interval), lambda m, b, o, g: cache.calculate_grid(m, b, o, 0, g, interval))
+    new, new_sec = _timed(lambda: [sweep(*cached) for _ in range(sweeps)])
+    for run_old, run_new in zip(old, new):
+        for a, b in zip(run_old, run_new):
+            assert (a is None and b is None) or np.allclose(a[:9] if isinstance(a, tuple) else a,
+                                                            b[:9] if isinstance(b, tuple) else b, equal_nan=True), (a, b)
+    stats = cache.stats()
+
+    # calculate 한 번만 놓고 보면 적중해도 키 만들기(DataFrame 시각 두 칸 읽기) 비용은 남음
+    market, df_base, df_1m = samples[0]
+    _, calc_sec = _timed(lambda: [calc.calculate(df_base, df_1m, 0, params_ab[0]) for _ in range(1000)])
+    _, hit_sec = _timed(lambda: [cache.calculate(market, df_base, df_1m, 0, params_ab[0], interval) for _ in range(1000)])
+
+    # 엔트리 한도를 한 번 훑는 데 필요한 양의 절반으로 두면 LRU 로 계속 밀려남 (한도 동작 확인)
+    small = IndicatorCache(max_entries=len(samples) * 3 // 2)
+    for _ in range(sweeps):
+        sweep(lambda m, b, o, p: small.calculate(m, b, o, 0, p, interval), lambda m, b, o, g: small.calculate_grid(m, b, o, 0, g, interval))
+    small_stats = small.stats()
+
+    n = len(samples) * (len(params_ab) + 1)
+    print(f"샘플 {len(samples)}개 x (calculate 2회 + calculate_grid 1회) x {sweeps}번 반복 - 결과 일치")
+    print(f"   매번 계산      : {old_sec:.3f}s")
+    print(f"   IndicatorCache : {new_sec:.3f}s -> x{old_sec / new_sec:.1f} "
+          f"(적중 {stats['hits']:,} / 미스 {stats['misses']:,}, 엔트리 {stats['entries']:,}개 {stats['bytes'] / 1024:.0f} KB)")
+    print(f"   calculate 1회   : 계산 {calc_sec * 1e3:.0f} us / 캐시 적중 {hit_sec * 1e3:.0f} us")
+    print(f"   한도 {small.max_entries}개 캐시 : 적중 {small_stats['hits']:,} / 미스 {small_stats['misses']:,} / "
+          f"밀려남 {small_stats['evictions']:,} (한 번 훑을 때 조회 {n:,}회)")
+
+
+def bench_optimizer(n_trades, population):
+    """Tab 6 채점: 조합 x 거래 이중 루프 vs build_entry_features + score_entry_filters (같은 샘플에서 결과 일치 확인)"""
+    from src.entry_optimizer import build_entry_features, score_entry_filters
+
+    intervals = [5, 10]
+    list_p1 = list(range(3, 11))
+    list_w1 = list(range(10, 31, 5))
+    trades, frames = synthetic_trades(n_trades, intervals)
+    trade_times = list(trades['timestamp'])
+    n_fail = int((trades['result'] == 'x').sum())
+
+    base_total = old_total = new_total = 0.0
+    for ratio_range in [(0.1, 2.0), (0.0, 10.0)]:
+        for use_yangbong in (True, False):
+            for use_vol_up in (False, True):
+                base, base_sec = _timed(baseline_entry_scan, trades, n_fail, frames, intervals, list_p1, list_w1,
+                                        ratio_range, use_yangbong, use_vol_up)
+                old, old_sec = _timed(legacy_entry_scan, trades, n_fail, frames, intervals, list_p1, list_w1,
+                                      ratio_range, use_yangbong, use_vol_up)
+                new, new_sec = _timed(lambda: score_entry_filters(
+                    build_entry_features(trades, trade_times, frames, intervals, list_p1, list_w1),
+                    ratio_range, use_yangbong, use_vol_up))
+                assert base == old == new.to_dict('records'), (ratio_range, use_yangbong, use_vol_up)
+                base_total += base_sec
+                old_total += old_sec
+                new_total += new_sec
+    n_combs = len(intervals) * len(list_p1) * len(list_w1)
+    print(f"거래 {n_trades}개 x 조합 {n_combs}개, 필터 설정 8가지 - 결과 일치")
+    print(f"   최초 루프 (거래마다 calculate)    : {base_total:.2f}s")
+    print(f"   조합 x 거래 루프 (calculate_grid) : {old_total:.2f}s")
+    print(f"   배열 채점                         : {new_total:.3f}s -> 최초 대비 x{base_total / new_total:.0f}, "
+          f"직전 대비 x{old_total / new_total:.0f}")
+
+    trades, frames = synthetic_trades(population, intervals, seed=1)
+    trade_times = list(trades['timestamp'])
+    features, feat_sec = _timed(build_entry_features, trades, trade_times, frames, intervals, list_p1, list_w1)
+    _, score_sec = _timed(score_entry_filters, features, (0.1, 2.0), True, False)
+    print(f"전체 거래 {population:,}개: 특징 계산 {feat_sec:.2f}s + 채점 {score_sec * 1e3:.1f} ms "
+          f"(필터만 바꿔 다시 채점할 때는 채점만)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="alnalytic 성능 측정")
+    sub = ap.add_subparsers(dest='command', required=True)
+
+    p_parser = sub.add_parser('parser', help="로그 파서 결과 비교 + 속도 측정")
+    p_parser.add_argument('paths', nargs='+', help="acc_log 파일 경로")
+
+    p_ts = sub.add_parser('timestamps', help="타임스탬프 디코딩 마이크로 벤치마크")
+    p_ts.add_argument('paths', nargs='+', help="acc_log 파일 경로")
+
+    p_comp = sub.add_parser('compressed', help="압축 로그(.gz/.bz2/.zst) 스트리밍 처리량 비교")
+    p_comp.add_argument('paths', nargs='+', help="평문 acc_log 파일 경로 (압축본은 임시로 생성)")
+
+    p_mem = sub.add_parser('memory', help="여러 날짜 로그 파싱 메모리 비교 (원본 vs 현재)")
+    p_mem.add_argument('paths', nargs='+', help="acc_log 파일 경로 (예: data/acc_log.2025-12-*)")
+
+    p_http = sub.add_parser('http', help="로컬 스텁 서버로 HTTP 세션 풀(keep-alive) 효과 측정")
+    p_http.add_argument('-n', '--requests', type=int, default=200, help="요청 수")
+    p_http.add_argument('--latency-ms', type=float, default=0.0, help="요청마다 서버 지연")
+    p_http.add_argument('--handshake-ms', type=float, default=0.0, help="새 연결마다 서버 지연 (TLS 핸드셰이크 흉내)")
+
+    p_fetch = sub.add_parser('fetch', help="로컬 스텁 서버로 순차 조회와 동시 조회(fetch_many) 비교")
+    p_fetch.add_argument('-n', '--jobs', type=int, default=60, help="조회 수")
+    p_fetch.add_argument('--latency-ms', type=float, default=150.0, help="요청마다 서버 지연")
+    p_fetch.add_argument('--workers', type=int, default=fetcher.FETCH_WORKERS, help="동시 조회 스레드 수")
+
+    p_plan = sub.add_parser('plan', help="겹치는 캔들 구간 묶음 조회(fetch_windows) API 호출 수 비교")
+    p_plan.add_argument('-n', '--trades', type=int, default=300, help="거래 수")
+    p_plan.add_argument('--markets', type=int, default=10, help="마켓 수")
+    p_plan.add_argument('--interval', type=int, default=3, help="기준 분봉")
+
+    p_res = sub.add_parser('resample', help="1분봉 합성(resample_candles) 결과를 업비트 분봉과 비교")
+    p_res.add_argument('--days', type=int, default=3, help="1분봉 구간 일 수")
+    p_res.add_argument('--no-trade', type=float, default=None, help="스텁의 거래 없는 분 비율 (기본 0.15)")
+
+    p_dec = sub.add_parser('decode', help="캔들 응답 JSON -> DataFrame 변환 속도 비교")
+    p_dec.add_argument('-n', '--responses', type=int, default=300, help="응답 수")
+    p_dec.add_argument('--count', type=int, default=200, help="응답당 캔들 수")
+
+    p_rep = sub.add_parser('replay', help="조회+계산 파이프라인 녹화 후 재생 서버로 재실행 (네트워크 불필요)")
+    p_rep.add_argument('fixture', help="픽스처 파일 (없으면 합성 서버에서 녹화해서 생성)")
+    p_rep.add_argument('-n', '--trades', type=int, default=100, help="거래 수")
+    p_rep.add_argument('--markets', type=int, default=5, help="마켓 수")
+    p_rep.add_argument('--interval', type=int, default=3, help="기준 분봉")
+
+    p_ser = sub.add_parser('series', help="기준 분봉 전체 지표 계산: calculate 반복 vs calculate_series")
+    p_ser.add_argument('--days', type=int, default=3, help="합성 데이터 일수")
+    p_ser.add_argument('--interval', type=int, default=5, help="기준 분봉")
+    p_ser.add_argument('--lookback', type=int, default=200, help="시점마다 사용할 기준 분봉 수 (get_ohlcv count)")
+
+    p_grid = sub.add_parser('grid', help="파라미터 조합 전체 지표: calculate 반복 vs calculate_grid")
+    p_grid.add_argument('--interval', type=int, default=5, help="기준 분봉")
+
+    p_calc = sub.add_parser('calc', help="한 시점 지표 계산 속도: 원본 pandas 경로 vs 배열 경로")
+    p_calc.add_argument('--interval', type=int, default=5, help="기준 분봉")
+    p_calc.add_argument('-n', '--calls', type=int, default=3000, help="호출 수")
+
+    p_stream = sub.add_parser('stream', help="완성봉마다 지표 갱신: calculate 재계산 vs IndicatorStream 증분")
+    p_stream.add_argument('--markets', type=int, default=200, help="마켓 수")
+    p_stream.add_argument('--interval', type=int, default=1, help="기준 분봉")
+    p_stream.add_argument('--hours', type=int, default=2, help="갱신할 시간 (완성봉 수 = hours*60/interval)")
+    p_opt = sub.add_parser('optimizer', help="Tab 6 채점: 최초 루프 / 조합 x 거래 루프 vs 배열 채점 (entry_optimizer)")
+    p_opt.add_argument('--trades', type=int, default=60, help="결과 비교용 샘플 거래 수 (기존 기본값 성공/실패 30건씩)")
+    p_opt.add_argument('--population', type=int, default=3000, help="배열 채점만 돌려볼 전체 거래 수")
+    p_cache = sub.add_parser('cache', help="같은 샘플 반복 분석: 매번 계산 vs IndicatorCache")
+    p_cache.add_argument('--samples', type=int, default=60, help="샘플 거래 수")
+    p_cache.add_argument('--interval', type=int, default=5, help="기준 분봉")
+    p_cache.add_argument('--sweeps', type=int, default=5, help="반복 횟수 (첫 번째만 계산, 나머지는 캐시 적중)")
+
+    args = ap.parse_args()
+    if args.command == 'parser':
+        bench_parser(args.paths)
+    elif args.command == 'timestamps':
+        bench_timestamps(args.paths)
+    elif args.command == 'compressed':
+        bench_compressed(args.paths)
+    elif args.command == 'memory':
+        bench_memory(args.paths)
+    elif args.command == 'http':
+        bench_http(args.requests, args.latency_ms, args.handshake_ms)
+    elif args.command == 'fetch':
+        bench_fetch(args.jobs, args.latency_ms, args.workers)
+    elif args.command == 'plan':
+        bench_plan(args.trades, args.markets, args.interval)
+    elif args.command == 'resample':
+        bench_resample(args.days, args.no_trade)
+    elif args.command == 'decode':
+        bench_decode(args.responses, args.count)
+    elif args.command == 'replay':
+        bench_replay(args.trades, args.markets, args.interval, args.fixture)
+    elif args.command == 'series':
+        bench_series(args.days, args.interval, args.lookback)
+    elif args.command == 'grid':
+        bench_grid(args.interval)
+    elif args.command == 'calc':
+        bench_calc(args.interval, args.calls)
+    elif args.command == 'stream':
+        bench_stream(args.markets, args.interval, args.hours)
+    elif args.command == 'cache':
+        bench_cache(args.samples, args.interval, args.sweeps)
+    elif args.command == 'optimizer':
+        bench_optimizer(args.trades, args.population)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from src.fetcher import get_ohlcv
-from src.calculator import IndicatorCalculator
+from src.fetcher import fetch_many
+from src.calculator import IndicatorCalculator, IndicatorResult
 
 st.set_page_config(layout="wide", page_title="Market Comparison Lab")
 
@@ -42,22 +42,26 @@ if st.sidebar.button("🚀 비교 분석 시작"):
 
     # 1. 데이터 수집
     with st.spinner("데이터 수집 및 분석 중..."):
-        # 과거 데이터 (지표 계산용)
-        df_a_past = get_ohlcv(market_a, trade_time_a, interval_min=interval, count=200)
-        df_b_past = get_ohlcv(market_b, trade_time_b, interval_min=interval, count=200)
-        
-        # 1분봉 데이터 (PASS1용)
-        df_a_1m = get_ohlcv(market_a, trade_time_a, interval_min=1, count=60)
-        df_b_1m = get_ohlcv(market_b, trade_time_b, interval_min=1, count=60)
-        
-        # 미래 데이터 (1시간 = 60분)
-        df_a_future = get_ohlcv(market_a, trade_time_a + timedelta(minutes=60), interval_min=1, count=120)
-        df_b_future = get_ohlcv(market_b, trade_time_b + timedelta(minutes=60), interval_min=1, count=120)
+        # 6개 조회를 동시에 실행
+        (df_a_past, df_b_past, df_a_1m, df_b_1m, df_a_future, df_b_future) = fetch_many([
+            # 과거 데이터 (지표 계산용)
+            (market_a, trade_time_a, interval, 200),
+            (market_b, trade_time_b, interval, 200),
+            # 1분봉 데이터 (PASS1용)
+            (market_a, trade_time_a, 1, 60),
+            (market_b, trade_time_b, 1, 60),
+            # 미래 데이터 (1시간 = 60분)
+            (market_a, trade_time_a + timedelta(minutes=60), 1, 120),
+            (market_b, trade_time_b + timedelta(minutes=60), 1, 120),
+        ])
 
-    if df_a_past.empty or df_b_past.empty:
+    fetch_error = df_a_past.attrs.get('fetch_error') or df_b_past.attrs.get('fetch_error')
+    if fetch_error:
+        st.error(f"API 호출에 실패했습니다. 잠시 후 다시 시도해주세요. ({fetch_error})")
+    elif df_a_past.empty or df_b_past.empty:
         st.error("데이터를 가져오는데 실패했습니다. 마켓명이나 시간을 확인해주세요.")
     else:
-        # 2. 지표 계산
+        # 2. 지표 계산 (기준 시간이 지금이면 마지막 캔들이 진행 중이라 지표 캐시를 쓰지 않음)
         calc = IndicatorCalculator()
         params = {
             'pass1_n': pass1_n, 'wide_n': wide_n, 'wide2_n': wide2_n,
@@ -67,8 +71,9 @@ if st.sidebar.button("🚀 비교 분석 시작"):
         df_a_past.attrs['interval'] = interval
         df_b_past.attrs['interval'] = interval
         
-        res_a = calc.calculate(df_a_past, df_a_1m, 0, params=params)
-        res_b = calc.calculate(df_b_past, df_b_1m, 0, params=params)
+        # 데이터 부족으로 결과가 없으면 0 으로 표시
+        res_a = calc.calculate(df_a_past, df_a_1m, 0, params=params) or IndicatorResult.zeros(params, interval)
+        res_b = calc.calculate(df_b_past, df_b_1m, 0, params=params) or IndicatorResult.zeros(params, interval)
 
         # 3. 결과 판정 (상위 2% / 하위 2%)
         def judge_outcome(df_future, start_price, trade_time):
@@ -108,26 +113,21 @@ if st.sidebar.button("🚀 비교 분석 시작"):
         st.markdown("---")
         st.subheader("📊 지표 비교 데이터")
         
-        def get_val(res, pattern):
-            for k, v in res.items():
-                if pattern in k: return v
-            return 0
-
-        # 지표 이름 매핑 (계산기 내부 키값과 맞춤)
+        # 지표 이름 매핑 (IndicatorResult 필드)
         metrics = {
-            "PASS1 Ratio": "PASS1",
-            "WideTrend1": "wideTrendAvg (n",
-            "WideTrend2": "wideTrendAvg2",
-            "TrendAvg": "trendAvg",
-            "CrossAvg": "CrossAvg",
-            "FastRate": "FastRate",
-            "PrevPriceRate(%)": "PrevPriceRate"
+            "PASS1 Ratio": "pass1_ratio",
+            "WideTrend1": "wide_trend",
+            "WideTrend2": "wide_trend2",
+            "TrendAvg": "trend_avg",
+            "CrossAvg": "cross_avg",
+            "FastRate": "fast_rate",
+            "PrevPriceRate(%)": "price_rate"
         }
         
         comp_data = []
-        for display_name, pattern in metrics.items():
-            val_a = get_val(res_a, pattern)
-            val_b = get_val(res_b, pattern)
+        for display_name, field in metrics.items():
+            val_a = getattr(res_a, field)
+            val_b = getattr(res_b, field)
             diff = val_a - val_b
             comp_data.append({
                 "지표명": display_name,
@@ -149,31 +149,31 @@ if st.sidebar.button("🚀 비교 분석 시작"):
         analysis = []
         
         # PASS1 분석
-        p1_a = get_val(res_a, "PASS1")
-        p1_b = get_val(res_b, "PASS1")
+        p1_a = res_a.pass1_ratio
+        p1_b = res_b.pass1_ratio
         if abs(p1_a - p1_b) > 0.3:
             stronger = name_a if p1_a > p1_b else name_b
             weaker = name_b if p1_a > p1_b else name_a
             analysis.append(f"💡 **거래량 폭발력**: {stronger}의 PASS1 수치가 {weaker}보다 눈에 띄게 높습니다. {stronger}일 때 순간적인 매수 에너지가 훨씬 강하게 들어온 상태입니다.")
 
         # WideTrend 분석
-        w1_a = get_val(res_a, "wideTrendAvg (n")
-        w1_b = get_val(res_b, "wideTrendAvg (n")
+        w1_a = res_a.wide_trend
+        w1_b = res_b.wide_trend
         if (w1_a >= 1.0 and w1_b < 1.0) or (w1_a < 1.0 and w1_b >= 1.0):
             up_m = name_a if w1_a >= 1.0 else name_b
             down_m = name_b if w1_a >= 1.0 else name_a
             analysis.append(f"💡 **장기 추세(Wide1)**: {up_m}은 장기 추세가 상승세(1.0 이상)인 반면, {down_m}은 하락세입니다. 상승장에서는 {up_m}이 훨씬 유리합니다.")
 
         # CrossAvg 분석 (이격도)
-        c_a = get_val(res_a, "CrossAvg")
-        c_b = get_val(res_b, "CrossAvg")
+        c_a = res_a.cross_avg
+        c_b = res_b.cross_avg
         if abs(c_a - c_b) > 0.005:
             higher = name_a if c_a > c_b else name_b
             analysis.append(f"💡 **이격도(Cross)**: {higher}의 이격도가 더 높습니다. 이는 단기 흐름이 장기 평균보다 위에서 놀고 있다는 뜻이며, 더 강한 돌파 에너지를 의미합니다.")
 
         # PrevPriceRate 분석
-        pr_a = get_val(res_a, "PrevPriceRate")
-        pr_b = get_val(res_b, "PrevPriceRate")
+        pr_a = res_a.price_rate
+        pr_b = res_b.price_rate
         if abs(pr_a - pr_b) > 0.5:
             jump = name_a if pr_a > pr_b else name_b
             analysis.append(f"💡 **직전 급등**: {jump}는 진입 직전에 이미 {max(pr_a, pr_b):.2f}% 상승했습니다. 이미 많이 오른 상태인지 체크가 필요합니다.")
@@ -197,7 +197,7 @@ if st.sidebar.button("🚀 비교 분석 시작"):
         def create_context(name, res, outcome, start_p):
             ctx = []
             ctx.append(f"{name} 결과: {outcome}")
-            ctx.append(f"PASS1={get_val(res, 'PASS1'):.3f}, Wide1={get_val(res, 'wideTrendAvg (n'):.3f}, CrossAvg={get_val(res, 'CrossAvg'):.3f}")
+            ctx.append(f"PASS1={res.pass1_ratio:.3f}, Wide1={res.wide_trend:.3f}, CrossAvg={res.cross_avg:.3f}")
             ctx.append(f"진입가={start_p:.8f}")
             return "; ".join(ctx)
 
@@ -1,11 +1,132 @@
+from typing import NamedTuple
+
 import pandas as pd
 import numpy as np
 
+# 파라미터 기본값 (calculate / calculate_grid / IndicatorStream 공통)
+GRID_DEFAULTS = {'pass1_n': 3, 'wide_n': 17, 'wide2_n': 3, 'trend_n': 2, 'fast_n': 24}
+# 지표 필드 (IndicatorResult 필드, calculate_series / calculate_grid / IndicatorBatch 컬럼 이름과 순서)
+INDICATOR_FIELDS = ('pass1_ratio', 'bid5_ratio', 'wide_trend', 'wide_trend2', 'trend_avg',
+                    'cross_avg', 'fast_rate', 'up_rate', 'price_rate')
+GRID_COLUMNS = list(INDICATOR_FIELDS)
+
+
+class IndicatorResult(NamedTuple):
+    """calculate 결과 (필드 이름이 고정이라 파라미터가 바뀌어도 같은 이름으로 꺼냄)"""
+    pass1_ratio: float  # PASS1_Ratio (avg pass1_n)
+    bid5_ratio: float   # BID5_Ratio
+    wide_trend: float   # wideTrendAvg (n wide_n)
+    wide_trend2: float  # wideTrendAvg2 (n wide2_n)
+    trend_avg: float    # trendAvg (n trend_n)
+    cross_avg: float    # CrossAvg
+    fast_rate: float    # FastRate (range fast_n)
+    up_rate: float      # upRate(Vol)
+    price_rate: float   # PrevPriceRate(%)
+    params: tuple = tuple(GRID_DEFAULTS.values())  # (pass1_n, wide_n, wide2_n, trend_n, fast_n)
+    interval: object = None
+
+    def as_dict(self):
+        """예전 calculate 의 dict 형식 (키에 파라미터가 들어간 표시용 이름)"""
+        pass1_n, wide_n, wide2_n, trend_n, fast_n = self.params
+        return {
+            f"PASS1_Ratio (avg{pass1_n})": self.pass1_ratio,
+            "BID5_Ratio": self.bid5_ratio,
+            f"wideTrendAvg (n{wide_n})": self.wide_trend,
+            f"wideTrendAvg2 (n{wide2_n})": self.wide_trend2,
+            f"trendAvg (n{trend_n})": self.trend_avg,
+            "CrossAvg": self.cross_avg,
+            f"FastRate (range{fast_n})": self.fast_rate,
+            "upRate(Vol)": self.up_rate,
+            "PrevPriceRate(%)": self.price_rate,
+            "settings": f"{self.interval}분",
+        }
+
+    @classmethod
+    def zeros(cls, params=None, interval=None):
+        """데이터 부족 시 화면 표시용 (예전 get_val 이 빈 dict 에서 0 을 돌려주던 것과 같음)"""
+        return cls(*([0.0] * len(INDICATOR_FIELDS)), params=_param_tuple(params), interval=interval)
+
+
+class IndicatorBatch:
+    """
+    여러 IndicatorResult 를 필드별 float64 배열로 쌓은 것 (batch.pass1_ratio -> shape (n,) 배열)
+    결과가 없는 위치(None)는 NaN, valid 가 False
+    """
+    __slots__ = ('arrays', 'valid')
+
+    def __init__(self, arrays, valid):
+        self.arrays = arrays
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.valid)
+
+    def __getattr__(self, name):
+        if name in IndicatorBatch.__slots__:
+            raise AttributeError(name)
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def from_results(cls, results):
+        results = list(results)
+        values = np.full((len(results), len(INDICATOR_FIELDS)), np.nan)
+        valid = np.zeros(len(results), dtype=bool)
+        for i, res in enumerate(results):
+            if res is not None:
+                values[i] = res[:len(INDICATOR_FIELDS)]
+                valid[i] = True
+        return cls({name: values[:, j] for j, name in enumerate(INDICATOR_FIELDS)}, valid)
+
+    @classmethod
+    def from_frame(cls, df):
+        """calculate_series / calculate_grid 결과 DataFrame 에서 (지표 컬럼이 NaN 인 행은 결과 없음)"""
+        arrays = {name: df[name].to_numpy(dtype=np.float64) for name in INDICATOR_FIELDS}
+        return cls(arrays, ~np.isnan(arrays['pass1_ratio']))
+
+    def result(self, i):
+        """i 번째 IndicatorResult (결과 없으면 None)"""
+        if not self.valid[i]:
+            return None
+        return IndicatorResult(*(float(self.arrays[name][i]) for name in INDICATOR_FIELDS))
+
+    def to_frame(self):
+        return pd.DataFrame(self.arrays)
+
+
+def _param_tuple(params):
+    params = params or {}
+    return tuple(params.get(name, default) for name, default in GRID_DEFAULTS.items())
+
+
 class IndicatorCalculator:
     def __init__(self):
         pass
 
     def calculate(self, df_base, df_1m, log_24h_vol=0, params=None):
+        """
+        기준 분봉/1분봉 DataFrame 의 마지막 캔들을 '진행 중'으로 보고 직전 완성봉 기준 지표 9개 계산
+        :return: IndicatorResult (데이터 부족 시 None, 예전 dict 형식은 result.as_dict())
+        값 계산은 calculate_arrays 가 하고, 여기서는 컬럼을 float64 배열로 꺼내기만 함
+        (FastRate 의 '고점 2칸 전' 은 프레임 안의 위치 기준: 정수 인덱스가 이어지는 프레임이면 원래의 라벨 기준과 같음)
+        """
+        if df_base is None or df_base.empty:
+            return None
+        vol_1m = df_1m['volume'].to_numpy(dtype=np.float64) if df_1m is not None and not df_1m.empty else None
+        return self.calculate_arrays(df_base['close'].to_numpy(dtype=np.float64),
+                                     df_base['volume'].to_numpy(dtype=np.float64),
+                                     vol_1m, log_24h_vol, params, df_base.attrs.get('interval'))
+
+    def calculate_arrays(self, close, volume, vol_1m=None, log_24h_vol=0, params=None, interval=None):
+        """
+        calculate 의 배열 버전 (pandas 객체 없이 float64 배열/뷰만 사용)
+        :param close, volume: 기준 분봉 종가/거래대금 (오름차순, 마지막이 진행 중인 캔들). 더 큰 배열의 슬라이스 뷰여도 됨
+        :param vol_1m: 1분봉 거래대금 (마지막이 진행 중인 캔들, 직전 완성봉 [-2] 만 사용), None 이면 0
+        :param interval: 결과 'settings' 표시용 분봉
+        :return: IndicatorResult (데이터 부족 시 None)
+        """
         if params is None:
             params = {}
         
@@ -17,47 +138,41 @@ class IndicatorCalculator:
         fast_n = params.get('fast_n', 24)
 
         # 데이터 유효성 검사
-        if df_base is None or df_base.empty or len(df_base) < (wide_n * 2 + 5):
-            return {}
+        n = len(close)
+        if n == 0 or n < (wide_n * 2 + 5):
+            return None
 
         # 1. PASS1_Ratio (거래량 비율)
-        # df_1m이 비어있으면 0 처리
-        if df_1m is not None and len(df_1m) >= 2:
-            # [수정] 현재 진행중인 1분봉(-1)이 아니라, '직전 완성된 1분봉(-2)'의 거래대금을 사용
-            cur_1m_vol = df_1m.iloc[-2]['volume'] 
-        elif df_1m is not None and not df_1m.empty:
-            cur_1m_vol = df_1m.iloc[-1]['volume']
+        # [수정] 현재 진행중인 1분봉(-1)이 아니라, '직전 완성된 1분봉(-2)'의 거래대금을 사용
+        if vol_1m is not None and len(vol_1m) >= 2:
+            cur_1m_vol = float(vol_1m[-2])
+        elif vol_1m is not None and len(vol_1m):
+            cur_1m_vol = float(vol_1m[-1])
         else:
             cur_1m_vol = 0
-            
-        # 기준 분봉(df_base)의 직전 N개 평균 거래량 (거래대금)
-        # 수정: 인덱싱 범위를 [-(n+1) : -1]로 하여 '진행중인 봉' 제외하고 '직전 완성봉'부터 N개를 가져옴
-        base_vol_avg_N = df_base['volume'].iloc[-(pass1_n + 1):-1].mean()
-        
-        # 분모가 0이거나 데이터가 없으면 방어 처리
-        if base_vol_avg_N > 0:
-            pass1_ratio = cur_1m_vol / base_vol_avg_N
-        else:
-            pass1_ratio = 0
+
+        # 기준 분봉의 직전 N개 평균 거래대금 ('진행중인 봉' 제외하고 '직전 완성봉'부터 N개)
+        base_vol_avg_N = _mean(volume[-(pass1_n + 1):-1])
+        pass1_ratio = cur_1m_vol / base_vol_avg_N if base_vol_avg_N > 0 else 0
 
         # 2. BID5_Ratio (직전 2개 캔들 거래량 합 / 24시간 거래량)
-        bid_sum_2 = df_base['volume'].iloc[-3:-1].sum()
-        final_24h_vol = log_24h_vol if log_24h_vol > 0 else df_base['volume'].sum()
+        bid_sum_2 = float(volume[-3:-1].sum())
+        final_24h_vol = log_24h_vol if log_24h_vol > 0 else float(volume.sum())
         bid5_ratio = bid_sum_2 / final_24h_vol if final_24h_vol > 0 else 0
 
         # 3. wideTrendAvg (Wide1 - 장기)
-        ma_curr = df_base['close'].iloc[-(wide_n+1):-1].mean()
-        ma_prev = df_base['close'].iloc[-(2*wide_n+1):-(wide_n+1)].mean()
+        ma_curr = _mean(close[-(wide_n+1):-1])
+        ma_prev = _mean(close[-(2*wide_n+1):-(wide_n+1)])
         wide_trend = ma_curr / ma_prev if ma_prev > 0 else 1.0
 
         # 4. wideTrendAvg2 (Wide2 - 중기)
-        ma2_curr = df_base['close'].iloc[-(wide2_n+1):-1].mean()
-        ma2_prev = df_base['close'].iloc[-(2*wide2_n+1):-(wide2_n+1)].mean()
+        ma2_curr = _mean(close[-(wide2_n+1):-1])
+        ma2_prev = _mean(close[-(2*wide2_n+1):-(wide2_n+1)])
         wide_trend2 = ma2_curr / ma2_prev if ma2_prev > 0 else 1.0
 
         # 5. trendAvg (Trend - 단기)
-        trend_curr = df_base['close'].iloc[-(trend_n+1):-1].mean()
-        trend_prev = df_base['close'].iloc[-(2*trend_n+1):-(trend_n+1)].mean()
+        trend_curr = _mean(close[-(trend_n+1):-1])
+        trend_prev = _mean(close[-(2*trend_n+1):-(trend_n+1)])
         trend_avg_val = trend_curr / trend_prev if trend_prev > 0 else 1.0
 
         # 6. CrossAvg (이격도: Trend / Wide1)
@@ -65,40 +180,254 @@ class IndicatorCalculator:
         cross_avg = trend_curr / ma_curr if ma_curr > 0 else 1.0
 
         # 7. FastRate (고점 대비 하락률)
-        window_fast = df_base.iloc[-(fast_n + 1):-1]
-        if not window_fast.empty:
-            max_vol_idx_rel = window_fast['volume'].argmax()
-            max_vol_idx_abs = window_fast.index[max_vol_idx_rel]
-            target_idx = max_vol_idx_abs - 2 # 고점 2칸 전
-            
-            if target_idx in df_base.index:
-                max_vol = df_base.loc[max_vol_idx_abs]['volume']
-                target_vol = df_base.loc[target_idx]['volume']
+        lo = max(n - (fast_n + 1), 0)
+        window_fast = volume[lo:n - 1]
+        fast_rate = 0
+        if len(window_fast):
+            max_vol_idx = lo + int(window_fast.argmax())
+            target_idx = max_vol_idx - 2 # 고점 2칸 전
+            if target_idx >= 0:
+                max_vol = float(volume[max_vol_idx])
+                target_vol = float(volume[target_idx])
                 fast_rate = (target_vol - max_vol) / max_vol if max_vol > 0 else 0
-            else:
-                fast_rate = 0
-        else:
-            fast_rate = 0
 
         # 8. upRate (Volume 변동률)
-        vol_prev = df_base.iloc[-2]['volume']
-        vol_prev_2 = df_base.iloc[-3]['volume']
+        vol_prev = float(volume[-2])
+        vol_prev_2 = float(volume[-3])
         up_rate = (vol_prev - vol_prev_2) / vol_prev_2 if vol_prev_2 > 0 else 0
 
         # 9. PrevPriceRate (직전 캔들 가격 등락률 %)
-        close_prev = df_base.iloc[-2]['close']   # 직전 봉 종가
-        close_prev_2 = df_base.iloc[-3]['close'] # 전전 봉 종가
+        close_prev = float(close[-2])   # 직전 봉 종가
+        close_prev_2 = float(close[-3]) # 전전 봉 종가
         price_rate = ((close_prev - close_prev_2) / close_prev_2) * 100 if close_prev_2 > 0 else 0
 
-        return {
-            f"PASS1_Ratio (avg{pass1_n})": pass1_ratio, # 0
-            "BID5_Ratio": bid5_ratio,                   # 1
-            f"wideTrendAvg (n{wide_n})": wide_trend,    # 2
-            f"wideTrendAvg2 (n{wide2_n})": wide_trend2, # 3
-            f"trendAvg (n{trend_n})": trend_avg_val,    # 4
-            "CrossAvg": cross_avg,                      # 5
-            f"FastRate (range{fast_n})": fast_rate,     # 6
-            "upRate(Vol)": up_rate,                     # 7
-            "PrevPriceRate(%)": price_rate,             # 8
-            "settings": f"{df_base.attrs.get('interval')}분" # 9
+        return IndicatorResult(pass1_ratio, bid5_ratio, wide_trend, wide_trend2, trend_avg_val,
+                               cross_avg, fast_rate, up_rate, price_rate,
+                               (pass1_n, wide_n, wide2_n, trend_n, fast_n), interval)
+
+    def calculate_series(self, df_base, df_1m, log_24h_vol=0, params=None, times=None, lookback=None):
+        """
+        calculate 를 여러 시점에 대해 한 번에 계산 (시점마다 DataFrame 을 잘라 다시 부르지 않고 누적합/배열 연산으로)
+        시점 T 에서는 T 이전에 시작한 캔들만 있는 것으로 보고, 그 마지막 캔들(T 를 포함, 진행 중)을 calculate 와 똑같이 제외함
+        :param times: 계산할 시각 목록 (UTC). None 이면 기준 분봉마다 그 캔들이 막 시작한 시점
+                      (기준 분봉은 그 캔들까지, 1분봉은 그 캔들 시작 분까지 있는 상태)
+        :param lookback: 시점마다 기준 분봉을 최근 lookback 개만 사용 (get_ohlcv(..., count=lookback) 로 받은 것과 같게)
+                         None 이면 처음부터 전부 사용 (BID5_Ratio 의 24시간 거래량 대체값, 최소 길이 검사에 영향)
+        :return: 시점마다 한 행인 DataFrame ('time' + INDICATOR_FIELDS 컬럼, IndicatorBatch.from_frame 으로 배열 묶음)
+                 calculate 가 None 을 돌려줄 시점(데이터 부족)은 NaN
+        """
+        if params is None:
+            params = {}
+        pass1_n = params.get('pass1_n', 3)
+        wide_n = params.get('wide_n', 17)
+        wide2_n = params.get('wide2_n', 3)
+        trend_n = params.get('trend_n', 2)
+        fast_n = params.get('fast_n', 24)
+
+        base_t = _epoch_seconds(df_base['time']) if df_base is not None and not df_base.empty else np.empty(0, np.int64)
+        m1_t = _epoch_seconds(df_1m['time']) if df_1m is not None and not df_1m.empty else np.empty(0, np.int64)
+        if times is None:
+            eval_t = base_t
+            end = np.arange(1, len(base_t) + 1)                 # 기준 분봉은 해당 캔들까지
+            end_1m = np.searchsorted(m1_t, base_t, side='right')  # 1분봉은 캔들 시작 분까지
+        else:
+            eval_t = _epoch_seconds(pd.Series(pd.to_datetime(times)))
+            end = np.searchsorted(base_t, eval_t, side='left')
+            end_1m = np.searchsorted(m1_t, eval_t, side='left')
+        start = np.zeros_like(end) if lookback is None else np.maximum(end - lookback, 0)
+        length = end - start
+
+        keys = list(INDICATOR_FIELDS)
+        out = pd.DataFrame(np.nan, index=range(len(eval_t)), columns=keys)
+        out.insert(0, 'time', pd.to_datetime(eval_t, unit='s').astype('datetime64[ns]'))
+        valid = length >= (wide_n * 2 + 5)
+        if not valid.any():
+            return out
+
+        vol = df_base['volume'].to_numpy(dtype=np.float64)
+        close = df_base['close'].to_numpy(dtype=np.float64)
+        vol_cs = np.concatenate([[0.0], np.cumsum(vol)])
+        close_cs = np.concatenate([[0.0], np.cumsum(close)])
+        s, e = start[valid], end[valid]
+
+        # 1. PASS1_Ratio: 직전 완성 1분봉 거래대금 / 직전 완성 기준봉 N개 평균
+        vol_1m = df_1m['volume'].to_numpy(dtype=np.float64) if len(m1_t) else np.zeros(1)
+        m = end_1m[valid]
+        cur_1m_vol = np.where(m >= 2, vol_1m[np.maximum(m - 2, 0)], np.where(m == 1, vol_1m[0], 0.0))
+        base_vol_avg_n = _slice_mean(vol_cs, s, e, pass1_n + 1, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pass1_ratio = np.where(base_vol_avg_n > 0, cur_1m_vol / base_vol_avg_n, 0.0)
+
+            # 2. BID5_Ratio
+            bid_sum_2 = _slice_sum(vol_cs, s, e, 3, 1)
+            final_24h_vol = log_24h_vol if log_24h_vol > 0 else vol_cs[e] - vol_cs[s]
+            final_24h_vol = np.broadcast_to(final_24h_vol, bid_sum_2.shape)
+            bid5_ratio = np.where(final_24h_vol > 0, bid_sum_2 / final_24h_vol, 0.0)
+
+            # 3~5. wideTrendAvg / wideTrendAvg2 / trendAvg (직전 n개 평균 / 그 앞 n개 평균)
+            ma_curr = _slice_mean(close_cs, s, e, wide_n + 1, 1)
+            ma_prev = _slice_mean(close_cs, s, e, 2 * wide_n + 1, wide_n + 1)
+            wide_trend = np.where(ma_prev > 0, ma_curr / ma_prev, 1.0)
+            ma2_curr = _slice_mean(close_cs, s, e, wide2_n + 1, 1)
+            ma2_prev = _slice_mean(close_cs, s, e, 2 * wide2_n + 1, wide2_n + 1)
+            wide_trend2 = np.where(ma2_prev > 0, ma2_curr / ma2_prev, 1.0)
+            trend_curr = _slice_mean(close_cs, s, e, trend_n + 1, 1)
+            trend_prev = _slice_mean(close_cs, s, e, 2 * trend_n + 1, trend_n + 1)
+            trend_avg_val = np.where(trend_prev > 0, trend_curr / trend_prev, 1.0)
+
+            # 6. CrossAvg
+            cross_avg = np.where(ma_curr > 0, trend_curr / ma_curr, 1.0)
+
+            # 7. FastRate: 직전 fast_n 개 중 거래대금 최대 캔들(첫 번째)과 그 2칸 앞 캔들 비교
+            fast_rate = _fast_rate(vol, s, e, fast_n)
+
+            # 8. upRate / 9. PrevPriceRate
+            vol_prev, vol_prev_2 = vol[e - 2], vol[e - 3]
+            up_rate = np.where(vol_prev_2 > 0, (vol_prev - vol_prev_2) / vol_prev_2, 0.0)
+            close_prev, close_prev_2 = close[e - 2], close[e - 3]
+            price_rate = np.where(close_prev_2 > 0, (close_prev - close_prev_2) / close_prev_2 * 100, 0.0)
+
+        out.loc[valid, keys] = np.column_stack([pass1_ratio, bid5_ratio, wide_trend, wide_trend2, trend_avg_val,
+                                                cross_avg, fast_rate, up_rate, price_rate])
+        return out
+
+
+    def calculate_grid(self, df_base, df_1m, log_24h_vol=0, grid=None):
+        """
+        한 시점(calculate 와 같은 입력)에 대해 파라미터 조합 전체의 지표를 한 번에 계산
+        지표마다 자기 파라미터(n)별 값만 누적합으로 구한 뒤 조합(cartesian product)으로 펼침
+        :param grid: {'pass1_n': [..], 'wide_n': [..], 'wide2_n': [..], 'trend_n': [..], 'fast_n': [..]}
+                     빠진 파라미터는 calculate 의 기본값 하나
+        :return: 조합마다 한 행인 DataFrame (파라미터 컬럼 5개 + INDICATOR_FIELDS 컬럼 9개)
+                 calculate 가 None 을 돌려줄 조합(기준 분봉 길이 < wide_n*2+5)은 지표가 NaN
+        """
+        grid = grid or {}
+        values = {name: np.atleast_1d(np.asarray(grid.get(name, [default]), dtype=np.int64))
+                  for name, default in GRID_DEFAULTS.items()}
+        mesh = np.meshgrid(*values.values(), indexing='ij')
+        out = pd.DataFrame({name: m.ravel() for name, m in zip(values, mesh)})
+        for col in GRID_COLUMNS:
+            out[col] = np.nan
+        if df_base is None or df_base.empty:
+            return out
+
+        vol = df_base['volume'].to_numpy(dtype=np.float64)
+        close = df_base['close'].to_numpy(dtype=np.float64)
+        L = len(vol)
+        vol_cs = np.concatenate([[0.0], np.cumsum(vol)])
+        close_cs = np.concatenate([[0.0], np.cumsum(close)])
+
+        if df_1m is not None and len(df_1m) >= 2:
+            cur_1m_vol = df_1m['volume'].iat[-2]
+        elif df_1m is not None and not df_1m.empty:
+            cur_1m_vol = df_1m['volume'].iat[-1]
+        else:
+            cur_1m_vol = 0
+
+        def trend(n):
+            curr = _slice_mean(close_cs, 0, L, n + 1, 1)
+            prev = _slice_mean(close_cs, 0, L, 2 * n + 1, n + 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return curr, np.where(prev > 0, curr / prev, 1.0)
+
+        # 파라미터별 1차원 값
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg = _slice_mean(vol_cs, 0, L, values['pass1_n'] + 1, 1)
+            pass1 = np.where(avg > 0, cur_1m_vol / avg, 0.0)
+            ma_curr, wide = trend(values['wide_n'])
+            _, wide2 = trend(values['wide2_n'])
+            trend_curr, trend_val = trend(values['trend_n'])
+            cross = np.where(ma_curr[None, :] > 0, trend_curr[:, None] / ma_curr[None, :], 1.0)  # (trend_n, wide_n)
+            fast = _fast_rate_suffix(vol, values['fast_n'])
+
+            bid_sum_2 = vol[max(L - 3, 0):max(L - 1, 0)].sum()
+            final_24h_vol = log_24h_vol if log_24h_vol > 0 else vol_cs[-1]
+            bid5 = bid_sum_2 / final_24h_vol if final_24h_vol > 0 else 0
+            if L >= 3:
+                up = (vol[-2] - vol[-3]) / vol[-3] if vol[-3] > 0 else 0
+                price = (close[-2] - close[-3]) / close[-3] * 100 if close[-3] > 0 else 0
+            else:
+                up = price = np.nan
+
+        # 조합으로 펼치기 (meshgrid 'ij' 순서의 인덱스)
+        shape = tuple(len(v) for v in values.values())
+        idx = np.unravel_index(np.arange(len(out)), shape)
+        i_p1, i_w, i_w2, i_t, i_f = idx
+        valid = L >= values['wide_n'][i_w] * 2 + 5
+        cols = {
+            'pass1_ratio': pass1[i_p1], 'bid5_ratio': np.full(len(out), bid5, dtype=np.float64),
+            'wide_trend': wide[i_w], 'wide_trend2': wide2[i_w2], 'trend_avg': trend_val[i_t],
+            'cross_avg': cross[i_t, i_w], 'fast_rate': fast[i_f],
+            'up_rate': np.full(len(out), up, dtype=np.float64),
+            'price_rate': np.full(len(out), price, dtype=np.float64),
         }
+        for col in GRID_COLUMNS:
+            out[col] = np.where(valid, cols[col], np.nan)
+        return out
+
+
+def _mean(values):
+    # pandas mean 처럼 빈 구간은 NaN (비교식 > 0 이 False 가 되어 기본값으로 처리됨)
+    return float(values.sum()) / len(values) if len(values) else np.nan
+
+
+def _epoch_seconds(times):
+    return times.to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def _slice_bounds(s, e, a, b):
+    # 길이 e-s 프레임의 iloc[-a:-b] 위치를 원본 배열 기준 [lo, hi) 로 (pandas 처럼 범위 밖은 잘라냄)
+    lo = np.maximum(e - a, s)
+    hi = np.maximum(e - b, s)
+    return lo, np.maximum(hi, lo)
+
+
+def _slice_sum(cs, s, e, a, b):
+    lo, hi = _slice_bounds(s, e, a, b)
+    return cs[hi] - cs[lo]
+
+
+def _slice_mean(cs, s, e, a, b):
+    # 빈 구간은 pandas mean 처럼 NaN
+    lo, hi = _slice_bounds(s, e, a, b)
+    n = hi - lo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 0, (cs[hi] - cs[lo]) / n, np.nan)
+
+
+def _fast_rate(vol, s, e, fast_n):
+    lo, hi = _slice_bounds(s, e, fast_n + 1, 1)
+    rate = np.zeros(len(e))
+    if fast_n <= 0:
+        return rate
+    idx = (hi - fast_n)[:, None] + np.arange(fast_n)
+    window = np.where(idx >= lo[:, None], vol[np.clip(idx, 0, len(vol) - 1)], -np.inf)
+    peak = idx[np.arange(len(e)), window.argmax(axis=1)]
+    has = (hi > lo) & (peak - 2 >= s)  # 고점 2칸 전 캔들이 프레임 안에 있어야 함
+    max_vol = vol[peak]
+    target_vol = vol[np.maximum(peak - 2, 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate[has] = np.where(max_vol[has] > 0, (target_vol[has] - max_vol[has]) / max_vol[has], 0.0)
+    return rate
+
+
+def _fast_rate_suffix(vol, fast_ns):
+    """
+    한 시점의 FastRate 를 여러 fast_n 에 대해 (직전 완성봉부터 과거로 k개 구간의 첫 번째 최대값을 한 번의 스캔으로)
+    """
+    L = len(vol)
+    rate = np.zeros(len(fast_ns))
+    if L < 2:
+        return rate
+    rev = vol[L - 2::-1]                      # rev[j] = vol[L-2-j] (직전 완성봉부터 과거로)
+    run_max = np.maximum.accumulate(rev)
+    # 같은 최대값이면 더 과거(원래 순서로 앞) 캔들이 argmax -> 최대값이 나온 마지막 j
+    last_at_max = np.maximum.accumulate(np.where(rev == run_max, np.arange(len(rev)), 0))
+    k = np.minimum(fast_ns, L - 1)
+    has = k > 0
+    peak = L - 2 - last_at_max[np.maximum(k - 1, 0)]
+    has &= peak - 2 >= 0
+    max_vol, target_vol = vol[peak], vol[np.maximum(peak - 2, 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate[has] = np.where(max_vol[has] > 0, (target_vol[has] - max_vol[has]) / max_vol[has], 0.0)
+    return rate
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+# 마켓 상장 이전까지 모두 받아온 구간의 시작값 (API가 요청 개수보다 적게 돌려준 경우)
+HISTORY_START = 0
+
+
+class CandleStore:
+    """
+    완성된 업비트 분봉을 저장하는 SQLite 캔들 저장소
+    candles  : (market, unit, ts) 별 OHLCV (ts = 캔들 시작 UTC epoch 초)
+    coverage : (market, unit) 별로 빠짐없이 받아둔 시간 구간 [start, end) 목록
+               거래가 없어 캔들이 없는 분도 구간 안이면 '없음'으로 확정된 것으로 봄
+    """
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS candles (
+                market TEXT, unit INTEGER, ts INTEGER,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (market, unit, ts)) WITHOUT ROWID""")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS coverage (
+                market TEXT, unit INTEGER, start INTEGER, end INTEGER)""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS coverage_idx ON coverage (market, unit, start)")
+
+    def span_at(self, market, unit, to_ts):
+        """to_ts 직전까지 이어지는 저장 구간 (start, end) (start < to_ts <= end), 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE market=? AND unit=? AND start<? AND end>=? LIMIT 1",
+                (market, unit, to_ts, to_ts)).fetchone()
+        return tuple(row) if row else None
+
+    def prev_span_end(self, market, unit, to_ts):
+        """to_ts 이전에 끝나는 가장 가까운 저장 구간의 end, 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(end) FROM coverage WHERE market=? AND unit=? AND end<?",
+                (market, unit, to_ts)).fetchone()
+        return row[0] if row else None
+
+    def count(self, market, unit, start_ts, end_ts):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM candles WHERE market=? AND unit=? AND ts>=? AND ts<?",
+                (market, unit, start_ts, end_ts)).fetchone()[0]
+
+    def query(self, market, unit, to_ts, count):
+        """to_ts 이전 캔들 최대 count개를 시간 오름차순 (ts, open, high, low, close, volume) 배열로"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE market=? AND unit=? AND ts<? ORDER BY ts DESC LIMIT ?",
+                (market, unit, to_ts, count)).fetchall()
+        return np.array(rows[::-1], dtype=np.float64).reshape(-1, 6)
+
+    def add(self, market, unit, rows, span_start, span_end):
+        """
+        rows (ts, open, high, low, close, volume)를 저장하고 [span_start, span_end) 를 받아둔 구간으로 병합
+        rows 에는 완성된 캔들만 넘겨야 함 (진행 중인 캔들은 값이 바뀜)
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(market, unit, int(r[0]), r[1], r[2], r[3], r[4], r[5]) for r in rows])
+            if span_end <= span_start:
+                return
+            # 겹치거나 맞닿은 구간을 하나로 병합
+            overlap = self._conn.execute(
+                "SELECT MIN(start), MAX(end) FROM coverage WHERE market=? AND unit=? AND start<=? AND end>=?",
+                (market, unit, span_end, span_start)).fetchone()
+            if overlap[0] is not None:
+                span_start = min(span_start, overlap[0])
+                span_end = max(span_end, overlap[1])
+            self._conn.execute(
+                "DELETE FROM coverage WHERE market=? AND unit=? AND start<=? AND end>=?",
+                (market, unit, span_end, span_start))
+            self._conn.execute("INSERT INTO coverage VALUES (?, ?, ?, ?)", (market, unit, span_start, span_end))
+
+    def stats(self):
+        """(캔들 수, 구간 수, 파일 바이트)"""
+        with self._lock:
+            n_candles = self._conn.execute("SELECT COUNT(*) FROM candles").fetchone()[0]
+            n_spans = self._conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        return n_candles, n_spans, os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM candles")
+            self._conn.execute("DELETE FROM coverage")
+
+
+def rows_to_frame(rows):
+    """(ts, open, high, low, close, volume) 배열 -> get_ohlcv 형식 DataFrame"""
+    # 컬럼별 배열로 바로 생성 (to_datetime 파싱 / insert 없이)
+    return pd.DataFrame({
+        'time': rows[:, 0].astype(np.int64).astype('datetime64[s]').astype('datetime64[ns]'),
+        'open': rows[:, 1], 'high': rows[:, 2], 'low': rows[:, 3], 'close': rows[:, 4], 'volume': rows[:, 5],
+    })
@@ -0,0 +1,160 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Tab 6 정밀 타점 시뮬레이션 엔진
+# 거래마다 특징(PASS1 비율, 1분봉 양봉/거래량 증가, WideTrend)을 후보 N 값 전체에 대해 한 번만 배열로 만들고,
+# (분봉 x PASS1_N x Wide_N) 조합 전체의 진입/스킵 수를 불리언 마스크 브로드캐스트로 한 번에 셈
+
+
+class EntryFeatures(NamedTuple):
+    """
+    build_entry_features 결과 (T = 거래 수, I = 분봉 수, P = PASS1_N 후보 수, W = Wide_N 후보 수)
+    결과가 없는 칸(데이터 부족)은 pass1 / wide 가 NaN
+    """
+    intervals: list
+    pass1_ns: list
+    wide_ns: list
+    is_ok: np.ndarray      # (T,) result == 'ok'
+    is_fail: np.ndarray    # (T,) result == 'x'
+    m1_len: np.ndarray     # (T,) 1분봉 개수
+    yang: np.ndarray       # (T,) 직전 완성 1분봉 양봉 (close > open)
+    vol_up: np.ndarray     # (T,) 직전 완성 1분봉 거래량 > 그 전 1분봉
+    base_len: np.ndarray   # (T, I) 기준 분봉 개수
+    pass1: np.ndarray      # (T, I, P) 직전 1분봉 거래금 / 기준 분봉 직전 N개 평균 거래금
+    wide: np.ndarray       # (T, I, W) WideTrend (calculate 의 wide_trend 와 같은 값)
+
+
+def _right_aligned(arrays, width):
+    # 길이가 다른 1차원 배열들을 오른쪽 정렬한 (n, width) 행렬로 (앞은 0: 누적합이 원래 배열의 누적합과 비트 단위로 같음)
+    out = np.zeros((len(arrays), width))
+    for i, a in enumerate(arrays):
+        if len(a):
+            out[i, width - len(a):] = a
+    return out
+
+
+def build_entry_features(trades, trade_times, frames, intervals, pass1_ns, wide_ns):
+    """
+    :param trades: 'market', 'result' 컬럼이 있는 거래 DataFrame
+    :param trade_times: 거래별 진입 시각 (UTC naive, frames 키와 같은 값)
+    :param frames: {(market, trade_time, 분봉): get_ohlcv 형식 DataFrame} (1 = 1분봉)
+    :return: EntryFeatures
+    """
+    intervals, pass1_ns, wide_ns = list(intervals), list(pass1_ns), list(wide_ns)
+    T = len(trades)
+    markets = trades['market'].tolist()
+    results = trades['result'].to_numpy()
+
+    # 1분봉: 직전 완성봉(iloc[-2]) 과 그 전 봉(iloc[-3])
+    m1_len = np.zeros(T, dtype=np.int64)
+    vol_1m = np.full(T, np.nan)
+    yang = np.zeros(T, dtype=bool)
+    vol_up = np.zeros(T, dtype=bool)
+    for t, (market, trade_time) in enumerate(zip(markets, trade_times)):
+        df_1m = frames[(market, trade_time, 1)]
+        m1_len[t] = len(df_1m)
+        if len(df_1m) < 2:
+            continue
+        volume = df_1m['volume'].to_numpy(dtype=np.float64)
+        close = df_1m['close'].to_numpy(dtype=np.float64)
+        open_ = df_1m['open'].to_numpy(dtype=np.float64)
+        vol_1m[t] = volume[-2] * close[-2]  # 거래대금 근사치 (원래 루프와 같은 식)
+        yang[t] = close[-2] > open_[-2]
+        vol_up[t] = len(df_1m) >= 3 and volume[-2] > volume[-3]
+
+    base_len = np.zeros((T, len(intervals)), dtype=np.int64)
+    pass1 = np.full((T, len(intervals), len(pass1_ns)), np.nan)
+    wide = np.full((T, len(intervals), len(wide_ns)), np.nan)
+    for i, interval in enumerate(intervals):
+        closes, values = [], []
+        for t, (market, trade_time) in enumerate(zip(markets, trade_times)):
+            df_base = frames[(market, trade_time, interval)]
+            base_len[t, i] = len(df_base)
+            close = df_base['close'].to_numpy(dtype=np.float64) if len(df_base) else np.empty(0)
+            closes.append(close)
+            values.append(df_base['volume'].to_numpy(dtype=np.float64) * close if len(df_base) else np.empty(0))
+        L = base_len[:, i]
+        width = max(int(L.max()) if T else 0, 1)
+
+        # PASS1: 직전 완성봉 N개 평균 거래금 (N 마다 같은 행렬의 끝 N칸 합, 모자라면 NaN)
+        value_mat = _right_aligned(values, width)
+        for p, n in enumerate(pass1_ns):
+            enough = L >= n + 1
+            if n + 1 > width or not enough.any():
+                continue
+            avg = value_mat[:, width - (n + 1):width - 1].sum(axis=1) / n
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pass1[:, i, p] = np.where(enough, np.where(avg == 0, 0.0, vol_1m / avg), np.nan)
+
+        # WideTrend: 직전 n개 평균 / 그 앞 n개 평균 (PASS1 처럼 구간을 직접 더함, 길이 < 2n+5 면 NaN)
+        # 누적합의 차는 가격이 평평할 때 1.0 이 아닌 0.99999.. 가 나와 wide >= 1.0 판정이 원래 루프와 달라짐
+        close_mat = _right_aligned(closes, width)
+        for w, n in enumerate(wide_ns):
+            enough = L >= n * 2 + 5
+            if n * 2 + 5 > width or not enough.any():
+                continue
+            curr = close_mat[:, width - (n + 1):width - 1].sum(axis=1) / n
+            prev = close_mat[:, width - (2 * n + 1):width - (n + 1)].sum(axis=1) / n
+            with np.errstate(divide='ignore', invalid='ignore'):
+                wide[:, i, w] = np.where(enough, np.where(prev > 0, curr / prev, 1.0), np.nan)
+
+    return EntryFeatures(intervals, pass1_ns, wide_ns, results == 'ok', results == 'x',
+                         m1_len, yang, vol_up, base_len, pass1, wide)
+
+
+def score_entry_filters(features, ratio_range, use_yangbong=True, use_vol_up=False):
+    """
+    (분봉, PASS1_N, Wide_N) 조합 전체를 한 번에 채점 (Tab 6 의 조합 x 거래 이중 루프와 같은 결과)
+    거래마다: 데이터 없음/기준 분봉 부족이면 세지 않고, PASS1 비율 범위 밖 / 음봉 / 거래량 감소 / WideTrend < 1 이면 스킵,
+    WideTrend 가 NaN(데이터 부족) 이면 세지 않고, 나머지는 진입
+    :param ratio_range: (min, max) PASS1 비율 인정 범위 (양 끝 포함)
+    :return: 조합마다 한 행인 DataFrame (진입이 한 번도 없는 조합은 제외, 순서는 itertools.product(intervals, pass1_ns, wide_ns))
+    """
+    f = features
+    lo, hi = ratio_range
+    ok = f.is_ok
+    n_fail = int(f.is_fail.sum())
+    # 1분봉 직전 완성봉(거래량 조건이면 그 전 봉까지) 이 있어야 판단 가능
+    m1_ok = f.m1_len >= (3 if use_vol_up else 2)
+    entry_ok = np.ones(len(ok), dtype=bool)
+    if use_yangbong:
+        entry_ok &= f.yang
+    if use_vol_up:
+        entry_ok &= f.vol_up
+    pass1_ns = np.asarray(f.pass1_ns)
+
+    rows = []
+    for i, interval in enumerate(f.intervals):
+        # (T, P): 셀 수 있는 거래 / 그 중 PASS1 + 1분봉 조건 통과
+        counted = (m1_ok & (f.base_len[:, i] > 0))[:, None] & (f.base_len[:, i][:, None] >= pass1_ns[None, :] + 1)
+        passed = counted & (f.pass1[:, i] >= lo) & (f.pass1[:, i] <= hi) & entry_ok[:, None]
+        pre_skip = counted & ~passed
+        # (T, P, W): WideTrend 필터 (NaN 이면 두 마스크 모두 False -> 세지 않음)
+        wide = f.wide[:, i][:, None, :]
+        enter = passed[:, :, None] & (wide >= 1.0)
+        skip = pre_skip[:, :, None] | (passed[:, :, None] & (wide < 1.0))
+
+        ok_pass = enter[ok].sum(axis=0)
+        fail_pass = enter[~ok].sum(axis=0)
+        ok_skip = skip[ok].sum(axis=0)
+        fail_skip = skip[~ok].sum(axis=0)
+        total_try = ok_pass + fail_pass
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_rate = ok_pass / total_try
+        avoid_rate = fail_skip / n_fail if n_fail > 0 else np.zeros(fail_skip.shape)
+        score = (win_rate * 0.7) + (avoid_rate * 0.3)
+
+        for p, w in zip(*np.nonzero(total_try)):
+            rows.append({
+                "Score": float(score[p, w]),
+                "설정": f"[{interval}분봉] vs 1분봉",
+                "PASS1_N": f.pass1_ns[p],
+                "Wide_N": f.wide_ns[w],
+                "승률(Win Rate)": f"{win_rate[p, w]*100:.1f}%",
+                "진입 횟수": int(total_try[p, w]),
+                "실패 방어율": f"{avoid_rate[p, w]*100:.1f}%",
+                "놓친 수익(Miss)": int(ok_skip[p, w])
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from src.candle_store import rows_to_frame
+from src.fetcher import FETCH_WORKERS, UPBIT_MAX_COUNT, _to_epoch, fetch_many
+
+
+class _Window:
+    """한 요청 (market, to, interval, count) 이 필요로 하는 구간"""
+    __slots__ = ('pos', 'to_ts', 'count')
+
+    def __init__(self, pos, to_ts, count):
+        self.pos = pos
+        self.to_ts = to_ts
+        self.count = count
+
+
+class FetchGroup:
+    """
+    같은 (market, interval) 에서 서로 겹치거나 가까운 요청들을 묶은 것
+    end_ts 에서 start_ts 까지 200캔들 길이 시간 구간별 페이지를 동시에 받고, 모자라면 더 과거 페이지를 이어 붙임
+    """
+    __slots__ = ('market', 'interval', 'windows')
+
+    def __init__(self, market, interval):
+        self.market = market
+        self.interval = interval
+        self.windows = []
+
+    @property
+    def end_ts(self):
+        return max(w.to_ts for w in self.windows)
+
+    @property
+    def start_ts(self):
+        # 캔들이 빠짐없이 있다고 가정했을 때 필요한 가장 이른 시각 (실제로는 더 과거까지 갈 수 있음)
+        return min(w.to_ts - w.count * self.interval * 60 for w in self.windows)
+
+    def estimated_calls(self):
+        return -(-(self.end_ts - self.start_ts) // (self.interval * 60 * UPBIT_MAX_COUNT))
+
+
+def plan_fetches(jobs):
+    """
+    (market, to_datetime, interval_min, count) 요청들을 (market, interval) 별로 정렬해
+    필요한 구간이 겹치거나 간격이 한 페이지(200개) 미만인 요청끼리 FetchGroup 으로 묶음
+    :return: (groups, singles) - singles 는 to_datetime 이 None 이라 묶지 않는 요청 위치 목록
+    """
+    by_key = {}
+    singles = []
+    for pos, (market, to_datetime, interval_min, count) in enumerate(jobs):
+        if to_datetime is None:
+            singles.append(pos)
+            continue
+        by_key.setdefault((market, interval_min), []).append(_Window(pos, _to_epoch(to_datetime), count))
+
+    groups = []
+    for (market, interval_min), windows in by_key.items():
+        page_sec = interval_min * 60 * UPBIT_MAX_COUNT
+        windows.sort(key=lambda w: w.to_ts)
+        group, group_end = None, None
+        for w in windows:
+            start = w.to_ts - w.count * interval_min * 60
+            # 사이 구간을 채우는 비용(페이지 1개 미만)이 따로 받는 비용(최소 1페이지)보다 작으면 합침
+            if group is None or start - group_end >= page_sec:
+                group = FetchGroup(market, interval_min)
+                groups.append(group)
+                group_end = w.to_ts
+            group.windows.append(w)
+            group_end = max(group_end, w.to_ts)
+    return groups, singles
+
+
+def _page_jobs(group):
+    # end_ts 에서 200캔들 길이씩 자른 시간 구간별 페이지 (get_ohlcv_range 와 같은 방식, 서로 독립이라 동시에 받을 수 있음)
+    # 업비트는 'to' 이전에 실제로 있는 캔들 200개를 주므로 거래 없는 분이 있어도 각 페이지가 자기 구간을 모두 덮음
+    page_sec = group.interval * 60 * UPBIT_MAX_COUNT
+    return [(group.market, pd.Timestamp(page_to, unit='s'), group.interval, UPBIT_MAX_COUNT)
+            for page_to in range(group.end_ts, group.start_ts, -page_sec)]
+
+
+class _GroupPages:
+    """그룹 하나의 받은 페이지 모음 (최신 -> 과거 순서), 페이지가 모자라면 다음 페이지 요청을 만듦"""
+    __slots__ = ('group', 'pages', 'error', 'exhausted')
+
+    def __init__(self, group):
+        self.group = group
+        self.pages = []
+        self.error = None
+        self.exhausted = False  # 상장 시점까지 모두 받음
+
+    def add(self, page):
+        if 'fetch_error' in page.attrs:
+            self.error = self.error or page.attrs['fetch_error']
+            return
+        if len(page) < UPBIT_MAX_COUNT:
+            self.exhausted = True
+        if not page.empty:
+            self.pages.append(page)
+
+    def frame(self):
+        if not self.pages:
+            return rows_to_frame(np.empty((0, 6)))
+        frame = pd.concat(self.pages[::-1], ignore_index=True)
+        # 거래 없는 분이 많은 페이지는 이전 페이지 구간까지 내려가므로 경계 캔들이 겹침
+        frame = frame.drop_duplicates('time', keep='last').sort_values('time', kind='stable')
+        return frame.reset_index(drop=True)
+
+    def next_job(self, frame):
+        """모든 요청이 count개를 채웠거나 더 받을 수 없으면 None, 아니면 가장 이른 캔들 이전 페이지 요청"""
+        if self.error is not None or self.exhausted or frame.empty:
+            return None
+        ts = _epoch_seconds(frame)
+        if all(int(np.searchsorted(ts, w.to_ts, side='left')) >= w.count for w in self.group.windows):
+            return None
+        return (self.group.market, frame['time'].iloc[0], self.group.interval, UPBIT_MAX_COUNT)
+
+
+def _epoch_seconds(frame):
+    return frame['time'].to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def fetch_windows(jobs, max_workers=FETCH_WORKERS, progress=None):
+    """
+    fetch_many 와 같은 입력/출력이지만, 같은 마켓/분봉에서 겹치는 요청은 한 번의 페이지 조회로 묶고
+    각 요청에는 합친 프레임의 iloc 슬라이스(복사 없음)를 돌려줌. count 는 200을 넘어도 됨 (여러 페이지)
+    모든 그룹의 페이지와 묶지 않은 요청을 한 번에 fetch_many 스레드 풀로 받고,
+    거래 없는 분 때문에 count개가 모자란 그룹만 더 과거 페이지를 (그룹끼리는 동시에) 이어 받음
+    :param jobs: (market, to_datetime, interval_min, count) 목록
+    :param progress: progress(완료 요청 수, 전체 요청 수) 콜백, 호출한 스레드에서 실행됨 (받은 페이지 비율로 환산)
+    :return: jobs 와 같은 순서의 DataFrame 목록 (슬라이스는 읽기 전용으로 사용)
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    if not jobs:
+        return results
+    groups, singles = plan_fetches(jobs)
+    states = [_GroupPages(group) for group in groups]
+
+    page_jobs, owners = [jobs[pos] for pos in singles], list(singles)
+    for state in states:
+        for job in _page_jobs(state.group):
+            page_jobs.append(job)
+            owners.append(state)
+
+    def report(done, total):
+        if progress is not None:
+            progress(min(len(jobs) - 1, len(jobs) * done // total), len(jobs))
+
+    while page_jobs:
+        pages = fetch_many(page_jobs, max_workers=max_workers, progress=report)
+        for owner, page in zip(owners, pages):
+            if isinstance(owner, _GroupPages):
+                owner.add(page)
+            else:
+                results[owner] = page
+
+        page_jobs, owners = [], []
+        for state in states:
+            if state.error is not None:
+                continue
+            job = state.next_job(state.frame())
+            if job is not None:
+                page_jobs.append(job)
+                owners.append(state)
+
+    for state in states:
+        if state.error is not None:
+            print(f"API Error: {state.error}")
+            for w in state.group.windows:
+                results[w.pos] = _error_frame(state.error)
+            continue
+        frame = state.frame()
+        ts = _epoch_seconds(frame)
+        for w in state.group.windows:
+            end = int(np.searchsorted(ts, w.to_ts, side='left'))
+            start = max(0, end - w.count)
+            results[w.pos] = frame.iloc[start:end] if end > start else pd.DataFrame()
+
+    if progress is not None:
+        progress(len(jobs), len(jobs))
+    return results
+
+
+def _error_frame(e):
+    df = pd.DataFrame()
+    df.attrs['fetch_error'] = str(e)
+    return df
+
+
+def plan_stats(jobs):
+    """(요청 수, 개별 조회 시 API 호출 수, 묶은 뒤 예상 API 호출 수) - 벤치마크/로그용"""
+    jobs = list(jobs)
+    groups, singles = plan_fetches(jobs)
+    naive = sum(-(-count // UPBIT_MAX_COUNT) for _, _, _, count in jobs)
+    planned = sum(g.estimated_calls() for g in groups) + len(singles)
+    return len(jobs), naive, planned
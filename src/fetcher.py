@@ -1,62 +1,371 @@
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
 import requests
+import numpy as np
 import pandas as pd
 import time
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_ohlcv(market, to_datetime, interval_min=5, count=200):
+from src.candle_store import HISTORY_START, CandleStore, rows_to_frame
+from src.fixtures import RECORD_ENV, FixtureRecorder
+
+# 업비트 분봉 API 한 번에 받을 수 있는 최대 개수
+UPBIT_MAX_COUNT = 200
+CANDLE_COLS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+# API 주소 (로컬 스텁 서버 등으로 바꿀 때 UPBIT_API_URL 환경변수 사용)
+UPBIT_API_URL = os.environ.get("UPBIT_API_URL", "https://api.upbit.com").rstrip("/")
+
+# HTTP 설정: (연결, 읽기) 타임아웃 초, 429/5xx 재시도 횟수와 백오프 계수 (0.5 -> 0.5, 1, 2초 ...)
+HTTP_TIMEOUT = (3.05, 10)
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+HTTP_POOL_SIZE = 16
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# 동시 조회 설정: 업비트 캔들 API는 IP당 초당 10회 (Remaining-Req 헤더의 sec 값이 이번 초 잔여 횟수)
+UPBIT_REQ_PER_SEC = 10
+FETCH_WORKERS = 8
+
+_session = None
+_session_lock = threading.Lock()
+_REMAINING_SEC_RE = re.compile(r'sec=(\d+)')
+
+
+class RateLimiter:
     """
-    업비트 캔들 조회
-    :param interval_min: 1, 3, 5, 10, 15, 30, 60, 240
-    :param to_datetime: 기준 시간 (UTC 기준)
+    요청 간격 제어용 토큰 버킷 (스레드 간 공유)
+    - 최근 window초 동안 보낸 요청이 per_sec개를 넘지 않도록 대기 (서버의 초 단위 창이 어디서 끊기든 안전)
+    - 응답의 Remaining-Req 'sec=N' 을 받으면 그 뒤 1초 동안은 N개까지만 보냄 (다른 프로세스가 같은 한도를 쓰는 경우 대비)
+    """
+    def __init__(self, per_sec=UPBIT_REQ_PER_SEC, window=1.1):
+        self.per_sec = per_sec
+        self.window = window
+        self._sent = deque()
+        self._cap_until = 0.0
+        self._cap_left = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.window:
+                    self._sent.popleft()
+                capped = now < self._cap_until
+                if len(self._sent) < self.per_sec and not (capped and self._cap_left <= 0):
+                    self._sent.append(now)
+                    if capped: self._cap_left -= 1
+                    return
+                wait = self._sent[0] + self.window - now if len(self._sent) >= self.per_sec else 0
+                if capped and self._cap_left <= 0:
+                    wait = max(wait, self._cap_until - now)
+            time.sleep(max(wait, 0.001))
+
+    def update(self, remaining_req):
+        """응답 헤더 Remaining-Req (예: 'group=candles; min=599; sec=9') 반영"""
+        m = _REMAINING_SEC_RE.search(remaining_req or '')
+        if not m:
+            return
+        with self._lock:
+            self._cap_until = time.monotonic() + 1.0
+            self._cap_left = int(m.group(1))
+
+
+rate_limiter = RateLimiter()
+
+
+class CandleFetchError(Exception):
+    """캔들 조회 실패 (네트워크 오류, 타임아웃, 재시도 후에도 429/5xx, 잘못된 응답). 데이터 없음과 구분"""
+
+
+def configure_http(base_url=None, timeout=None, retries=None, backoff=None, pool_size=None):
+    """HTTP 설정 변경. 다음 요청부터 새 세션(커넥션 풀)을 사용"""
+    global UPBIT_API_URL, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF, HTTP_POOL_SIZE, _session
+    with _session_lock:
+        if base_url is not None: UPBIT_API_URL = base_url.rstrip("/")
+        if timeout is not None: HTTP_TIMEOUT = timeout
+        if retries is not None: HTTP_RETRIES = retries
+        if backoff is not None: HTTP_BACKOFF = backoff
+        if pool_size is not None: HTTP_POOL_SIZE = pool_size
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """
+    keep-alive 커넥션 풀을 공유하는 requests.Session (스레드 간 공유)
+    429/5xx 와 연결 오류는 지수 백오프로 재시도하고, 429의 Retry-After 헤더를 따름
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES, status=HTTP_RETRIES,
+                          backoff_factor=HTTP_BACKOFF, status_forcelist=RETRY_STATUSES,
+                          allowed_methods=frozenset(["GET"]), respect_retry_after_header=True,
+                          raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update({"accept": "application/json"})
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# 완성된 캔들을 저장해두는 로컬 DB (빈 문자열이면 저장소 사용 안 함)
+CANDLE_DB_PATH = os.environ.get("ALNALYTIC_CANDLE_DB", os.path.join("data", "candles.sqlite"))
+_candle_store = None
+
+
+def get_candle_store():
+    global _candle_store
+    if _candle_store is None and CANDLE_DB_PATH:
+        _candle_store = CandleStore(CANDLE_DB_PATH)
+    return _candle_store
+
+
+def set_candle_store(path):
+    """캔들 저장소 경로 변경 (None/빈 문자열이면 저장소 끄고 항상 API 호출)"""
+    global _candle_store, CANDLE_DB_PATH
+    CANDLE_DB_PATH = path or ""
+    _candle_store = CandleStore(path) if path else None
+
+
+# API 응답 녹화 (ALNALYTIC_RECORD 환경변수에 픽스처 파일 경로를 주면 켜짐, src.fixtures 참고)
+_recorder = FixtureRecorder(os.environ[RECORD_ENV]) if os.environ.get(RECORD_ENV) else None
+
+
+def set_recorder(path):
+    """API 응답을 path 픽스처 파일에 녹화 (None이면 녹화 중지)"""
+    global _recorder
+    _recorder = FixtureRecorder(path) if path else None
+
+
+def _to_epoch(to_datetime):
+    # naive 시간은 UTC로 간주, 초 단위 버림 (API 'to' 파라미터와 같은 정밀도)
+    ts = pd.Timestamp(to_datetime)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+def _fetch_rows(market, to_ts, interval_min, count):
     """
-    url = f"https://api.upbit.com/v1/candles/minutes/{interval_min}"
-    
+    업비트 캔들 API 호출
+    :return: (ts, open, high, low, close, volume) 오름차순 배열 (데이터 없으면 0행)
+    :raises CandleFetchError: 요청 실패 또는 오류 응답
+    """
+    url = f"{UPBIT_API_URL}/v1/candles/minutes/{interval_min}"
+
     # [최종 수정] T와 Z를 포함한 ISO 8601 포맷 사용
     # 이렇게 해야 업비트가 UTC 시간임을 정확히 인식합니다.
-    if to_datetime is not None:
-        to_str = to_datetime.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if to_ts is not None:
+        to_str = pd.Timestamp(to_ts, unit='s').strftime("%Y-%m-%dT%H:%M:%SZ")
     else:
         to_str = ""
-    
-    headers = {"accept": "application/json"}
+
     params = {
         "market": market,
         "to": to_str,
         "count": count
     }
-    
+
     try:
-        response = requests.get(url, params=params, headers=headers)
+        rate_limiter.acquire()
+        response = get_session().get(url, params=params, timeout=HTTP_TIMEOUT)
+        rate_limiter.update(response.headers.get('Remaining-Req'))
         data = response.json()
-        
-        if isinstance(data, list):
-            df = pd.DataFrame(data)
-            # candle_date_time_utc를 기준으로 정렬
-            df = df.sort_values('candle_date_time_utc').reset_index(drop=True)
-            
-            # 숫자형 변환
-            cols = ['opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_price']
-            for c in cols:
-                df[c] = df[c].astype(float)
-                
-            # 컬럼명 통일 (open, high, low, close, volume)
-            # candle_date_time_utc를 'time' 컬럼으로 사용
-            df.rename(columns={
-                'opening_price': 'open',
-                'high_price': 'high',
-                'low_price': 'low',
-                'trade_price': 'close',
-                'candle_acc_trade_price': 'volume',
-                'candle_date_time_utc': 'time'
-            }, inplace=True)
-            
-            # 시간 컬럼 변환
-            df['time'] = pd.to_datetime(df['time'])
-            
-            return df
+    except (requests.RequestException, ValueError) as e:
+        raise CandleFetchError(f"{market} {interval_min}m: {e}") from e
+
+    if response.status_code != 200 or not isinstance(data, list):
+        raise CandleFetchError(f"{market} {interval_min}m: HTTP {response.status_code} {data}")
+
+    rows = decode_candles(data)
+    if _recorder is not None:
+        _recorder.record(market, interval_min, to_ts if to_ts is not None else int(time.time()), count, rows)
+    return rows
+
+
+_decode_prices = itemgetter('opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_price')
+
+
+def decode_candles(data):
+    """
+    업비트 캔들 응답(dict 목록) -> (ts, open, high, low, close, volume) 오름차순 float64 배열
+    필요한 6개 필드만 꺼내고, 시각 문자열은 numpy datetime64 로 한 번에 변환
+    업비트는 최신 캔들부터 주므로 정렬 대신 뒤집기만 함 (순서가 다르면 그때만 정렬)
+    """
+    n = len(data)
+    rows = np.empty((n, 6), dtype=np.float64)
+    if n == 0:
+        return rows
+    times = np.array([c['candle_date_time_utc'] for c in data], dtype='datetime64[s]')
+    rows[:, 0] = times.astype(np.int64)
+    rows[:, 1:] = list(map(_decode_prices, data))
+    if n > 1 and not (rows[1:, 0] < rows[:-1, 0]).all():
+        return rows[np.argsort(rows[:, 0], kind='stable')]
+    return rows[::-1].copy()
+
+
+def _fetch_with_store(store, market, to_ts, interval_min, count):
+    """
+    저장소에 있는 구간은 디스크에서, 빈 구간만 API로 채워서 to_ts 이전 count개 반환
+    진행 중인 캔들이 포함될 수 있는 요청(to가 없거나 현재 캔들 시작 이후)은 항상 API로 받고 완성된 캔들만 저장
+    """
+    unit_sec = interval_min * 60
+    live_start = int(time.time()) // unit_sec * unit_sec  # 진행 중인 캔들의 시작 시각
+
+    if to_ts is None or to_ts > live_start:
+        rows = _fetch_rows(market, to_ts, interval_min, count)
+        done = rows[rows[:, 0] < live_start]
+        span_end = live_start if to_ts is None else min(to_ts, live_start)
+        span_start = done[0, 0] if len(rows) == count and len(done) else HISTORY_START
+        if len(done) or len(rows) < count:
+            store.add(market, interval_min, done, int(span_start), span_end)
+        return rows
+
+    for _ in range(20):
+        span = store.span_at(market, interval_min, to_ts)
+        if span is not None:
+            have = store.count(market, interval_min, span[0], to_ts)
+            if have >= count or span[0] == HISTORY_START:
+                return store.query(market, interval_min, to_ts, count)
+            # 저장 구간 앞쪽(과거)만 부족분만큼 추가로 받음
+            req_to, req_count = span[0], min(count - have, UPBIT_MAX_COUNT)
+        else:
+            # to_ts 바로 앞의 비어있는 구간만 받음 (구간 길이보다 많은 캔들은 있을 수 없음)
+            prev_end = store.prev_span_end(market, interval_min, to_ts)
+            req_to = to_ts
+            req_count = count if prev_end is None else max(1, min(count, -(-(to_ts - prev_end) // unit_sec)))
+
+        rows = _fetch_rows(market, req_to, interval_min, req_count)
+        span_start = rows[0, 0] if len(rows) == req_count else HISTORY_START
+        store.add(market, interval_min, rows, int(span_start), req_to)
+
+    return store.query(market, interval_min, to_ts, count)
+
+
+def get_ohlcv(market, to_datetime, interval_min=5, count=200, raise_errors=False):
+    """
+    업비트 캔들 조회 (로컬 캔들 저장소에 있는 완성 캔들은 API를 다시 호출하지 않음)
+    :param interval_min: 1, 3, 5, 10, 15, 30, 60, 240
+    :param to_datetime: 기준 시간 (UTC 기준), 이 시각 이전 캔들을 반환
+    :param count: 최대 200 (업비트 API 한도)
+    :param raise_errors: True면 실패 시 CandleFetchError 발생
+    :return: time, open, high, low, close, volume 컬럼의 DataFrame (시간 오름차순)
+             실패하면 빈 DataFrame + attrs['fetch_error'] 에 사유 (데이터가 없을 때는 attrs 없이 빈 DataFrame)
+    """
+    count = min(count, UPBIT_MAX_COUNT)
+    to_ts = _to_epoch(to_datetime) if to_datetime is not None else None
+
+    store = get_candle_store()
+    try:
+        if store is None:
+            rows = _fetch_rows(market, to_ts, interval_min, count)
         else:
-            return pd.DataFrame()
-            
+            rows = _fetch_with_store(store, market, to_ts, interval_min, count)
     except Exception as e:
+        if raise_errors:
+            if isinstance(e, CandleFetchError): raise
+            raise CandleFetchError(f"{market} {interval_min}m: {e}") from e
         print(f"API Error: {e}")
+        df = pd.DataFrame()
+        df.attrs['fetch_error'] = str(e)
+        return df
+
+    if len(rows) == 0:
+        return pd.DataFrame()
+    return rows_to_frame(rows)
+
+
+def fetch_many(jobs, max_workers=FETCH_WORKERS, progress=None):
+    """
+    여러 캔들 조회를 스레드 풀로 동시에 실행 (요청 간격은 공유 rate_limiter 가 조절)
+    :param jobs: (market, to_datetime, interval_min, count) 목록
+    :param progress: progress(완료 수, 전체 수) 콜백, 호출한 스레드에서 실행됨 (Streamlit 진행바에 바로 사용 가능)
+    :return: jobs 와 같은 순서의 get_ohlcv 결과 DataFrame 목록
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    if not jobs:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        futures = {executor.submit(get_ohlcv, *job): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(jobs))
+    return results
+
+
+def fill_missing_candles(df, interval_min):
+    """
+    거래가 없어 업비트가 빼먹은 캔들을 채워 interval_min 간격이 빠짐없는 프레임으로
+    빈 캔들은 직전 종가로 open/high/low/close 를 채우고 volume 은 0 (첫 캔들 이전 구간은 채우지 않음)
+    """
+    if df.empty:
+        return df
+    grid = pd.date_range(df['time'].iloc[0], df['time'].iloc[-1], freq=f"{interval_min}min")
+    if len(grid) == len(df):
+        return df
+    out = df.set_index('time').reindex(grid)
+    out['close'] = out['close'].ffill()
+    for col in ('open', 'high', 'low'):
+        out[col] = out[col].fillna(out['close'])
+    out['volume'] = out['volume'].fillna(0.0)
+    return out.rename_axis('time').reset_index()
+
+
+def get_ohlcv_range(market, start, end, interval_min=5, fill_gaps=False, raise_errors=False,
+                    max_workers=FETCH_WORKERS):
+    """
+    [start, end) 사이에 시작하는 캔들을 200개 한도 없이 조회 (여러 페이지를 과거 방향으로 이어 붙임)
+    페이지는 end 에서 200캔들 길이씩 자른 시간 구간별로 나눠 동시에 받음. 업비트는 'to' 이전에 실제로 있는
+    캔들 200개를 주므로 거래 없는 분이 있어도 각 페이지가 자기 구간을 모두 덮고, 겹치는 캔들은 중복 제거함
+    :param start, end: UTC 기준 시각 (naive 는 UTC 로 간주)
+    :param fill_gaps: True면 거래 없는 분의 캔들을 직전 종가/거래대금 0으로 채움 (fill_missing_candles)
+    :param raise_errors: True면 한 페이지라도 실패 시 CandleFetchError 발생
+    :return: get_ohlcv 와 같은 형식의 시간 오름차순 DataFrame
+             실패하면 빈 DataFrame + attrs['fetch_error'] (일부 페이지만 받은 결과는 돌려주지 않음)
+    """
+    start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+    unit_sec = interval_min * 60
+    start_ts = -(-start_ts // unit_sec) * unit_sec  # start 이후 첫 캔들 시작 시각
+    if end_ts <= start_ts:
+        return pd.DataFrame()
+
+    page_sec = unit_sec * UPBIT_MAX_COUNT
+    jobs = []
+    for page_to in range(end_ts, start_ts, -page_sec):
+        count = min(UPBIT_MAX_COUNT, -(-(page_to - start_ts) // unit_sec))
+        jobs.append((market, pd.Timestamp(page_to, unit='s'), interval_min, count))
+    pages = fetch_many(jobs, max_workers=max_workers)
+
+    for page in pages:
+        if 'fetch_error' in page.attrs:
+            if raise_errors:
+                raise CandleFetchError(page.attrs['fetch_error'])
+            df = pd.DataFrame()
+            df.attrs['fetch_error'] = page.attrs['fetch_error']
+            return df
+
+    pages = [p for p in pages[::-1] if not p.empty]
+    if not pages:
         return pd.DataFrame()
+    df = pd.concat(pages, ignore_index=True)
+    # 거래 없는 분이 많은 페이지는 이전 페이지 구간까지 내려가므로 경계 캔들이 겹침
+    df = df.drop_duplicates('time', keep='last').sort_values('time', kind='stable')
+    df = df[df['time'] >= pd.Timestamp(start_ts, unit='s')].reset_index(drop=True)
+    if fill_gaps:
+        df = fill_missing_candles(df, interval_min)
+    return df
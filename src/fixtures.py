@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.candle_store import HISTORY_START, CandleStore
+
+# 실제 API 응답 녹화/재생 (네트워크 없이 재현 가능한 벤치마크와 회귀 비교용)
+# 픽스처 파일은 JSON Lines: 응답 하나당 {"market", "unit", "to", "count", "rows": [[ts, o, h, l, c, v], ...]}
+RECORD_ENV = "ALNALYTIC_RECORD"
+
+
+class FixtureMissError(LookupError):
+    """녹화된 픽스처로 답할 수 없는 요청 (해당 구간을 녹화한 적 없음)"""
+
+
+class FixtureRecorder:
+    """
+    fetcher 가 받은 API 응답을 픽스처 파일에 한 줄씩 덧붙임 (스레드 간 공유, 중간에 종료돼도 앞 줄은 유효)
+    캔들 저장소에서 꺼낸 캔들은 녹화되지 않으므로 녹화할 때는 저장소를 끄는 것이 좋음 (ALNALYTIC_CANDLE_DB=)
+    """
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(self, market, unit, to_ts, count, rows):
+        line = json.dumps({'market': market, 'unit': unit, 'to': to_ts, 'count': count, 'rows': rows.tolist()})
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class FixtureSource:
+    """
+    픽스처 파일들을 읽어 UpbitStubServer(source=...) 로 쓰는 캔들 공급자
+    응답들을 (market, unit) 별 구간으로 합쳐두므로 녹화 때와 to/count 가 달라도 녹화된 구간 안이면 답할 수 있음
+    """
+    def __init__(self, *paths):
+        self.store = CandleStore(':memory:')
+        self.responses = 0
+        for path in paths:
+            self.load(path)
+
+    def load(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                r = json.loads(line)
+                rows = np.array(r['rows'], dtype=np.float64).reshape(-1, 6)
+                # 응답이 요청 개수를 채웠으면 첫 캔들부터, 모자라면 상장 시점부터 to 직전까지 빠짐없이 받은 것
+                span_start = int(rows[0, 0]) if len(rows) == r['count'] else HISTORY_START
+                self.store.add(r['market'], r['unit'], rows, span_start, r['to'])
+                self.responses += 1
+
+    def __call__(self, market, unit, to_ts, count):
+        span = self.store.span_at(market, unit, to_ts)
+        if span is None or (span[0] != HISTORY_START and self.store.count(market, unit, span[0], to_ts) < count):
+            raise FixtureMissError(f"{market} {unit}m to={to_ts} count={count}: 녹화된 구간 밖")
+        return self.store.query(market, unit, to_ts, count)
@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.calculator import IndicatorCalculator, _param_tuple
+
+# 지표 계산 결과 메모리 캐시 (단건 분석 / 타점 시뮬레이션을 다시 돌릴 때 같은 입력은 재계산하지 않음)
+INDICATOR_CACHE_ENTRIES = 20000
+INDICATOR_CACHE_BYTES = 64 * 1024 * 1024
+# 캐시에 없음 표시 (결과가 None 인 것도 기억하므로 None 과 구분)
+_MISSING = object()
+
+
+def _value_bytes(value):
+    # 엔트리 크기 근사치 (calculate_grid 결과 DataFrame 은 컬럼 배열 크기, IndicatorResult 는 튜플 + float 들)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _closed(last_time, interval_min, now):
+    # 캔들 시작 시각(UTC naive) + 분봉 길이가 now(epoch 초) 이전이면 완성봉
+    return last_time.value // 10**9 + interval_min * 60 <= now
+
+
+def window_key(market, df_base, df_1m, log_24h_vol=0, interval=None, now=None):
+    """
+    calculate(df_base, df_1m, log_24h_vol) 의 결과를 정하는 입력 요약: (마켓, 분봉, 마지막 완성봉 시각, 캔들 수) x 2 + 24시간 거래대금
+    완성봉은 바뀌지 않으므로 캔들 값은 읽지 않음. 기준 분봉이나 1분봉의 마지막 캔들이 아직 진행 중이면
+    (시작 + 분봉 > now, 오늘 로그의 거래처럼) 값이 계속 바뀌므로 None (캐시하지 않음). 분봉을 모를 때도 None
+    DataFrame 칸 하나 읽는 데 수십 us 가 들어 시각 두 칸만 읽음
+    """
+    if interval is None:
+        interval = df_base.attrs.get('interval') if df_base is not None else None
+    n = 0 if df_base is None else len(df_base)
+    m = 0 if df_1m is None else len(df_1m)
+    last_base = df_base['time'].iat[-1] if n else None
+    last_1m = df_1m['time'].iat[-1] if m else None
+    now = time.time() if now is None else now
+    if (n and (interval is None or not _closed(last_base, interval, now))) or (m and not _closed(last_1m, 1, now)):
+        return None
+    return market, interval, last_base, n, last_1m, m, log_24h_vol
+
+
+class IndicatorCache:
+    """
+    IndicatorCalculator.calculate / calculate_grid 결과를 (window_key, 파라미터) 로 기억하는 LRU 캐시
+    엔트리 수와 대략적인 메모리 크기 두 한도 중 하나라도 넘으면 가장 오래 안 쓴 엔트리부터 버림 (스레드 간 공유 가능)
+    """
+    def __init__(self, max_entries=INDICATOR_CACHE_ENTRIES, max_bytes=INDICATOR_CACHE_BYTES, calculator=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.calculator = calculator or IndicatorCalculator()
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0  # 진행 중 캔들이 있어 캐시를 거치지 않은 계산 수
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _value_bytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _get_or_compute(self, key, compute):
+        if key is None:
+            # 진행 중 캔들이 있는 구간은 계산만 하고 기억하지 않음
+            with self._lock:
+                self.bypassed += 1
+            return compute()
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def calculate(self, market, df_base, df_1m, log_24h_vol=0, params=None, interval=None):
+        """calculate 와 같은 결과 (IndicatorResult 또는 None), 완성봉만 있는 같은 입력이면 계산하지 않고 기억한 값"""
+        window = window_key(market, df_base, df_1m, log_24h_vol, interval)
+        key = None if window is None else ('calc', window, _param_tuple(params))
+        return self._get_or_compute(key, lambda: self.calculator.calculate(df_base, df_1m, log_24h_vol, params))
+
+    def calculate_grid(self, market, df_base, df_1m, log_24h_vol=0, grid=None, interval=None):
+        """calculate_grid 와 같은 DataFrame (캐시 안의 객체와 따로 노는 복사본이라 수정해도 됨)"""
+        grid_key = tuple((name, tuple(values)) for name, values in sorted((grid or {}).items()))
+        window = window_key(market, df_base, df_1m, log_24h_vol, interval)
+        key = None if window is None else ('grid', window, grid_key)
+        return self._get_or_compute(key, lambda: self.calculator.calculate_grid(df_base, df_1m, log_24h_vol, grid)).copy()
+
+    def stats(self):
+        """{'entries', 'bytes', 'hits', 'misses', 'evictions', 'bypassed', 'hit_rate'}"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bypassed': self.bypassed,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """엔트리와 통계 모두 초기화, 지운 엔트리 수 반환"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self.bytes = self.hits = self.misses = self.evictions = self.bypassed = 0
+        return removed
+
+
+_indicator_cache = None
+_indicator_cache_lock = threading.Lock()
+
+
+def get_indicator_cache():
+    """프로세스 공용 IndicatorCache (Streamlit 재실행 사이에도 유지)"""
+    global _indicator_cache
+    with _indicator_cache_lock:
+        if _indicator_cache is None:
+            _indicator_cache = IndicatorCache()
+        return _indicator_cache
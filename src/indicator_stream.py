@@ -0,0 +1,164 @@
+from collections import deque
+
+from src.calculator import GRID_DEFAULTS, IndicatorResult
+
+# 실시간 감시용 증분 지표 엔진: 완성된 캔들 하나를 O(1) 로 반영하고 IndicatorCalculator.calculate 와 같은 IndicatorResult 를 돌려줌
+# 앱(app.py / market_comparer.py)은 아직 쓰지 않는 독립 엔진이고, 캔들 수신(웹소켓 등)은 호출하는 쪽 몫
+# BID5_Ratio 분모는 calculate 처럼 진행 중 캔들 거래대금(live_volume)이나 24시간 거래대금(log_24h_vol)을 넘겨야 같은 값
+# 누적합이 계속 커지면 부동소수 오차가 쌓이므로 이 개수마다 링 버퍼 안의 누적합을 0 기준으로 다시 맞춤
+REBASE_EVERY = 1 << 16
+
+
+class IndicatorStream:
+    """
+    한 (마켓, 분봉) 의 증분 지표 계산기
+    calculate(df_base, df_1m) 에서 df_base = 최근 lookback 개 (완성봉 + 진행 중 1개), df_1m = 완성 1분봉 + 진행 중 1개 인 상태를 유지
+    - 평균/합: 종가/거래대금 누적합 링 버퍼 (구간 합 = 누적합 두 개의 차)
+    - FastRate: 구간 최대 거래대금 단조 덱 (같은 값이면 먼저 나온 캔들이 앞, argmax 와 같음)
+    """
+    __slots__ = ('market', 'interval', 'params', 'lookback', 'count', 'last_1m_vol',
+                 '_cap', '_close', '_vol', '_cs_close', '_cs_vol', '_fast')
+
+    def __init__(self, market=None, interval=None, params=None, lookback=200):
+        # lookback: calculate 에 넘기는 기준 분봉 개수 (get_ohlcv count, 진행 중 캔들 포함)
+        self.market = market
+        self.interval = interval
+        self.params = {**GRID_DEFAULTS, **(params or {})}
+        self.lookback = lookback
+        self.count = 0          # 지금까지 받은 완성봉 수 (= 진행 중 캔들의 위치)
+        self.last_1m_vol = None  # 직전 완성 1분봉 거래대금
+        self._cap = lookback + 1
+        self._close = [0.0] * self._cap
+        self._vol = [0.0] * self._cap
+        self._cs_close = [0.0] * self._cap  # _cs_*[k % cap] = 완성봉 0..k-1 합
+        self._cs_vol = [0.0] * self._cap
+        self._fast = deque()                # (위치, 거래대금), 거래대금 내림차순
+
+    def add_candle(self, close, volume):
+        """기준 분봉 완성봉 하나 반영 (시간 순서대로)"""
+        c, cap = self.count, self._cap
+        self._close[c % cap] = close
+        self._vol[c % cap] = volume
+        self._cs_close[(c + 1) % cap] = self._cs_close[c % cap] + close
+        self._cs_vol[(c + 1) % cap] = self._cs_vol[c % cap] + volume
+        fast = self._fast
+        while fast and fast[-1][1] < volume:
+            fast.pop()
+        fast.append((c, volume))
+        self.count = c + 1
+        # 다음 values() 의 FastRate 구간 [max(e-1-fast_n, s), e-1) 밖으로 나간 캔들 제거 (e = count+1)
+        lo = max(self.count - self.params['fast_n'], self.count + 1 - self.lookback)
+        while fast and fast[0][0] < lo:
+            fast.popleft()
+        if self.count % REBASE_EVERY == 0:
+            self._rebase()
+
+    def add_minute(self, volume):
+        """완성된 1분봉 하나 반영 (PASS1 분자는 직전 완성 1분봉 거래대금)"""
+        self.last_1m_vol = volume
+
+    def warm_up(self, df_base, df_1m=None):
+        """과거 완성봉 DataFrame (get_ohlcv 형식) 으로 상태 채우기"""
+        for close, volume in zip(df_base['close'].tolist(), df_base['volume'].tolist()):
+            self.add_candle(close, volume)
+        if df_1m is not None and not df_1m.empty:
+            self.add_minute(float(df_1m['volume'].iat[-1]))
+        return self
+
+    def _rebase(self):
+        c, cap = self.count, self._cap
+        start = max(0, c - self.lookback)
+        base_close, base_vol = self._cs_close[start % cap], self._cs_vol[start % cap]
+        for k in range(start, c + 1):
+            self._cs_close[k % cap] -= base_close
+            self._cs_vol[k % cap] -= base_vol
+
+    def _window(self, cs, s, e, a, b):
+        # 프레임 [s, e) 의 iloc[-a:-b] 합과 개수
+        lo = max(e - a, s)
+        hi = max(e - b, lo)
+        return cs[hi % self._cap] - cs[lo % self._cap], hi - lo
+
+    def _trend(self, s, e, n):
+        cur_sum, cur_n = self._window(self._cs_close, s, e, n + 1, 1)
+        prev_sum, prev_n = self._window(self._cs_close, s, e, 2 * n + 1, n + 1)
+        curr = cur_sum / cur_n if cur_n else float('nan')
+        prev = prev_sum / prev_n if prev_n else float('nan')
+        return curr, (curr / prev if prev > 0 else 1.0)
+
+    def values(self, live_volume=0.0, log_24h_vol=0):
+        """
+        진행 중인 캔들 기준 지표 (calculate 와 같은 IndicatorResult, 데이터 부족 시 None)
+        :param live_volume: 진행 중인 캔들의 현재 거래대금 (log_24h_vol 이 없을 때 BID5_Ratio 분모에만 사용)
+        """
+        p = self.params
+        pass1_n, wide_n, wide2_n, trend_n, fast_n = p['pass1_n'], p['wide_n'], p['wide2_n'], p['trend_n'], p['fast_n']
+        e = self.count + 1                 # 진행 중 캔들 포함 프레임 끝
+        s = max(0, e - self.lookback)      # 프레임 시작
+        if e - s < wide_n * 2 + 5:
+            return None
+        cap, vol, close, cs_vol = self._cap, self._vol, self._close, self._cs_vol
+
+        # 1. PASS1_Ratio
+        cur_1m_vol = self.last_1m_vol or 0
+        vol_sum, vol_n = self._window(cs_vol, s, e, pass1_n + 1, 1)
+        avg = vol_sum / vol_n if vol_n else float('nan')
+        pass1_ratio = cur_1m_vol / avg if avg > 0 else 0
+
+        # 2. BID5_Ratio
+        bid_sum_2, _ = self._window(cs_vol, s, e, 3, 1)
+        final_24h_vol = log_24h_vol if log_24h_vol > 0 else cs_vol[self.count % cap] - cs_vol[s % cap] + live_volume
+        bid5_ratio = bid_sum_2 / final_24h_vol if final_24h_vol > 0 else 0
+
+        # 3~6. wideTrendAvg / wideTrendAvg2 / trendAvg / CrossAvg
+        ma_curr, wide_trend = self._trend(s, e, wide_n)
+        _, wide_trend2 = self._trend(s, e, wide2_n)
+        trend_curr, trend_avg_val = self._trend(s, e, trend_n)
+        cross_avg = trend_curr / ma_curr if ma_curr > 0 else 1.0
+
+        # 7. FastRate: 덱 맨 앞이 구간 최대 (같은 값이면 먼저 나온 캔들)
+        fast_rate = 0
+        if self._fast:
+            peak, max_vol = self._fast[0]
+            if peak - 2 >= s:
+                target_vol = vol[(peak - 2) % cap]
+                fast_rate = (target_vol - max_vol) / max_vol if max_vol > 0 else 0
+
+        # 8. upRate / 9. PrevPriceRate
+        vol_prev, vol_prev_2 = vol[(e - 2) % cap], vol[(e - 3) % cap]
+        up_rate = (vol_prev - vol_prev_2) / vol_prev_2 if vol_prev_2 > 0 else 0
+        close_prev, close_prev_2 = close[(e - 2) % cap], close[(e - 3) % cap]
+        price_rate = ((close_prev - close_prev_2) / close_prev_2) * 100 if close_prev_2 > 0 else 0
+
+        return IndicatorResult(pass1_ratio, bid5_ratio, wide_trend, wide_trend2, trend_avg_val,
+                               cross_avg, fast_rate, up_rate, price_rate,
+                               (pass1_n, wide_n, wide2_n, trend_n, fast_n), self.interval)
+
+
+class IndicatorStreams:
+    """(마켓, 분봉) 별 IndicatorStream 모음 (모든 마켓에 같은 파라미터)"""
+    def __init__(self, params=None, lookback=200):
+        self.params = params
+        self.lookback = lookback
+        self.streams = {}
+        self._by_market = {}
+
+    def get(self, market, interval):
+        stream = self.streams.get((market, interval))
+        if stream is None:
+            stream = self.streams[(market, interval)] = IndicatorStream(market, interval, self.params, self.lookback)
+            self._by_market.setdefault(market, []).append(stream)
+        return stream
+
+    def on_candle(self, market, interval, close, volume, live_volume=0.0, log_24h_vol=0):
+        """
+        완성봉 하나 반영 후 새 진행 중 캔들 기준 지표 반환 (1분봉은 그 마켓 모든 분봉 스트림의 PASS1 분자에도 반영)
+        :param live_volume, log_24h_vol: values() 로 그대로 넘김 (둘 다 없으면 BID5_Ratio 가 calculate 와 다름)
+        """
+        # 처음 받는 1분봉이어도 그 1분봉 스트림이 PASS1 분자를 받도록 스트림부터 만듦
+        stream = self.get(market, interval)
+        if interval == 1:
+            for other in self._by_market[market]:
+                other.add_minute(volume)
+        stream.add_candle(close, volume)
+        return stream.values(live_volume, log_24h_vol)
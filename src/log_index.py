@@ -0,0 +1,100 @@
+import json
+import os
+import re
+
+import numpy as np
+
+# 인덱스 포맷이 바뀌면 올려서 기존 사이드카를 다시 만들게 함
+INDEX_VERSION = 1
+# 이 간격 이하로 떨어진 구간은 하나로 합쳐 seek 횟수를 줄임 (사이에 낀 다른 마켓 줄은 결과에 영향 없음)
+MERGE_GAP_BYTES = 64 * 1024
+
+# 마켓 없이 찍히는 줄 분류
+VAL_KEY = '__val__'      # val 값 (모든 마켓의 PASS 스냅샷이 공유)
+ORDER_KEY = '__order__'  # 매수/매도 주문 JSON
+
+_MARKET_RE_B = re.compile(rb'KRW-[A-Z0-9]+')
+_VAL_RE_B = re.compile(rb'val\s*:\s*[\d\.E\+\-]+')
+
+
+def index_path(acc_path):
+    return acc_path + ".idx.npz"
+
+
+def _fingerprint(acc_path):
+    st = os.stat(acc_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'version': INDEX_VERSION}
+
+
+def _add_span(spans, key, start, end):
+    lst = spans.get(key)
+    if lst and start - lst[-1][1] <= MERGE_GAP_BYTES:
+        lst[-1][1] = end
+    elif lst:
+        lst.append([start, end])
+    else:
+        spans[key] = [[start, end]]
+
+
+def build_market_index(acc_path):
+    """
+    로그를 한 번 훑어서 마켓별(+ val, 주문 JSON) 바이트 구간 [start, end) 목록을 만들고 사이드카로 저장
+    :return: {키: (N, 2) int64 배열}
+    """
+    fingerprint = _fingerprint(acc_path)
+    spans = {}
+    offset = 0
+    with open(acc_path, 'rb') as f:
+        for line in f:
+            end = offset + len(line)
+            if b'KRW-' in line:
+                for mkt in set(_MARKET_RE_B.findall(line)):
+                    _add_span(spans, mkt.decode('ascii'), offset, end)
+            if b'val' in line and _VAL_RE_B.search(line):
+                _add_span(spans, VAL_KEY, offset, end)
+            if b'"side":"' in line:
+                _add_span(spans, ORDER_KEY, offset, end)
+            offset = end
+
+    index = {key: np.array(lst, dtype=np.int64) for key, lst in spans.items()}
+    keys = sorted(index)
+    arrays = {f"k{i}": index[key] for i, key in enumerate(keys)}
+    arrays['__meta__'] = np.array(json.dumps({'fingerprint': fingerprint, 'keys': keys}))
+
+    path = index_path(acc_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return index
+
+
+def load_market_index(acc_path):
+    """사이드카가 현재 로그(크기, mtime)와 맞으면 읽고, 없거나 오래됐으면 다시 생성"""
+    path = index_path(acc_path)
+    if os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                meta = json.loads(str(npz['__meta__']))
+                if meta['fingerprint'] == _fingerprint(acc_path):
+                    return {key: npz[f"k{i}"] for i, key in enumerate(meta['keys'])}
+        except Exception as e:
+            print(f"Index Error: {e}")
+    return build_market_index(acc_path)
+
+
+def market_ranges(index, markets):
+    """지정 마켓 + val + 주문 JSON 줄을 모두 덮는 정렬/병합된 (start, end) 구간 목록"""
+    parts = [index[key] for key in list(markets) + [VAL_KEY, ORDER_KEY] if key in index]
+    if not parts:
+        return []
+    spans = np.concatenate(parts)
+    spans = spans[np.argsort(spans[:, 0], kind='stable')]
+
+    merged = []
+    for start, end in spans.tolist():
+        if merged and start - merged[-1][1] <= MERGE_GAP_BYTES:
+            if end > merged[-1][1]: merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
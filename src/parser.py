@@ -1,208 +1,721 @@
 import re
+import numpy as np
 import pandas as pd
-from datetime import datetime
 import os
+import io
 import json
+import pickle
+import gzip
+import hashlib
+import bz2
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
 
-def parse_single_day_expi(acc_path, date_str):
-    clean_date_str = date_str[:10]
-
-    patterns = {
-        'pass1_avg': re.compile(r'PASS 1 prevAccTradePrice12Avg\s+KRW.*\/ ([\d\.E\+\-]+)'),
-        'pass1_cur': re.compile(r'PASS 1 targetVo\.getAccTradePrice1min\(\).*\/ ([\d\.E\+\-]+)'),
-        'wideTrendAvg': re.compile(r'wideTrendAvg\s*:\s*([\d\.E\+\-]+)'),
-        'wideTrendAvg2': re.compile(r'wideTrendAvg2\s*:\s*([\d\.E\+\-]+)'),
-        'crossAvg': re.compile(r'BID crossAvg\s*:\s*([\d\.E\+\-]+)'),
-        'trendAvg': re.compile(r'trendAvg\s*:\s*([\d\.E\+\-]+)'),
-        'upRate': re.compile(r'BID upRate\s*:\s*([\d\.E\+\-]+)'),
-        'fastRate': re.compile(r'fastRate\s*:\s*([\d\.E\+\-]+)'),
-        'bid5_24h': re.compile(r'BID 5 targetVo\.getAccTradePrice24h\(\).*\/ ([\d\.E\+\-]+)'),
-        'bid5_prev': re.compile(r'BID 5 prevAccTradePrice.*\/ ([\d\.E\+\-]+)'),
-    }
-
-    # price 2 패턴 (공백 및 형식에 유연하게 대응)
-    price2_pattern = re.compile(r'price 2\s*:\s*[A-Z0-9-]+\s*/\s*([\d\.E\+\-]+)\s*/\s*([\d\.E\+\-]+)')
-
-    live_state = {}
-    last_pass = {}
-    pending_trades = {}
-    final_data = []
-    last_val = None  # 마켓 없이 찍히는 val 임시 보관
+from src.log_index import load_market_index, market_ranges
 
-    if not os.path.exists(acc_path): 
-        return pd.DataFrame()
+_NUM = r'([\d\.E\+\-]+)'
 
-    with open(acc_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line: continue
+# 마켓 지표 추출기: (키워드, 컬럼명, 패턴)
+# 라인마다 모든 정규식을 돌리지 않고, 키워드가 들어있는 라인에서만 해당 패턴을 실행
+_FIELD_EXTRACTORS = (
+    ('PASS 1 prevAccTradePrice12Avg', 'pass1_avg', re.compile(r'PASS 1 prevAccTradePrice12Avg\s+KRW.*\/ ' + _NUM)),
+    ('PASS 1 targetVo.getAccTradePrice1min()', 'pass1_cur', re.compile(r'PASS 1 targetVo\.getAccTradePrice1min\(\).*\/ ' + _NUM)),
+    ('wideTrendAvg', 'wideTrendAvg', re.compile(r'wideTrendAvg\s*:\s*' + _NUM)),
+    ('wideTrendAvg2', 'wideTrendAvg2', re.compile(r'wideTrendAvg2\s*:\s*' + _NUM)),
+    ('BID crossAvg', 'crossAvg', re.compile(r'BID crossAvg\s*:\s*' + _NUM)),
+    ('trendAvg', 'trendAvg', re.compile(r'trendAvg\s*:\s*' + _NUM)),
+    ('BID upRate', 'upRate', re.compile(r'BID upRate\s*:\s*' + _NUM)),
+    ('fastRate', 'fastRate', re.compile(r'fastRate\s*:\s*' + _NUM)),
+    ('BID 5 targetVo.getAccTradePrice24h()', 'bid5_24h', re.compile(r'BID 5 targetVo\.getAccTradePrice24h\(\).*\/ ' + _NUM)),
+    ('BID 5 prevAccTradePrice', 'bid5_prev', re.compile(r'BID 5 prevAccTradePrice.*\/ ' + _NUM)),
+)
+
+# price 2 패턴 (공백 및 형식에 유연하게 대응)
+_PRICE2_RE = re.compile(r'price 2\s*:\s*[A-Z0-9-]+\s*/\s*' + _NUM + r'\s*/\s*' + _NUM)
+_VAL_RE = re.compile(r'val\s*:\s*' + _NUM)
+_TIME_RE = re.compile(r'\[(\d{2}:\d{2}:\d{2}\.\d{3})\]')
+_MARKET_RE = re.compile(r'(KRW-[A-Z0-9]+)')
+_SLASH_PRICE_RE = re.compile(r'/\s*([\d\.]+)')
+_PRICE_SLASH_RE = re.compile(r'price\s+([\d\.]+)\s+/')
+_BACKUP_ASK_RE = re.compile(r'(up ask|down ask|highest ask)\s+(KRW-[A-Z0-9]+)')
+
+# 파싱 결과(컬럼/값)가 바뀌면 올려서 디스크 캐시를 무효화
+PARSER_VERSION = 3
+
+RESULT_COLS = ['date', 'timestamp', 'sell_time', 'market', 'result', 'profit_rate', 'profit_krw', 'invested_krw', 'price', 'PASS1_Ratio', 'BID5_Ratio', 'bid5_24h',
+               'wideTrendAvg', 'wideTrendAvg2', 'crossAvg', 'trendAvg', 'upRate', 'fastRate', 'bid_price_unit', 'ask_price', 'volume']
 
-            # val 추출 (마켓 정보가 없을 수 있으므로 별도 처리)
-            val_match = re.search(r'val\s*:\s*([\d\.E\+\-]+)', line)
-            if val_match:
-                try:
-                    last_val = float(val_match.group(1)) * 100
-                except: pass
 
-            time_match = re.search(r'\[(\d{2}:\d{2}:\d{2}\.\d{3})\]', line)
-            if not time_match: continue
-            current_dt = datetime.strptime(f"{clean_date_str} {time_match.group(1)}", "%Y-%m-%d %H:%M:%S.%f")
-
-            market_match = re.search(r'(KRW-[A-Z0-9]+)', line)
-            market = market_match.group(1) if market_match else None
-
-            if market:
-                if market not in live_state: live_state[market] = {}
-                for key, pattern in patterns.items():
-                    m = pattern.search(line)
-                    if m:
-                        try: live_state[market][key] = float(m.group(1))
-                        except: pass
-                
-                # price 2 매칭 및 계산 (금액 1 / (금액 2 * 2))
-                m_p2 = price2_pattern.search(line)
-                if m_p2:
+def _tokenize_line(line):
+    """
+    로그 한 줄을 키워드로 한 번 분류해서 필요한 추출기만 실행
+    :return: (val, time, market, fields, is_pass, bid_order, bid_unit, ask_start, ask_price, ask_order, backup_ask) 또는 None
+    """
+    line = line.strip()
+    if not line: return None
+
+    # val 추출 (마켓 정보가 없을 수 있으므로 별도 처리)
+    val = None
+    if 'val' in line:
+        val_match = _VAL_RE.search(line)
+        if val_match:
+            try: val = float(val_match.group(1)) * 100
+            except: pass
+
+    time_match = _TIME_RE.match(line) or ('[' in line and _TIME_RE.search(line))
+    if not time_match:
+        return (val, None, None, None, False, None, None, False, None, None, None) if val is not None else None
+    time_str = time_match.group(1)
+
+    market_match = 'KRW-' in line and _MARKET_RE.search(line)
+    market = market_match.group(1) if market_match else None
+
+    fields = None
+    is_pass = False
+    bid_unit = None
+    ask_start = False
+    ask_price = None
+    if market:
+        for keyword, key, pattern in _FIELD_EXTRACTORS:
+            if keyword in line:
+                m = pattern.search(line)
+                if m:
                     try:
-                        val1 = float(m_p2.group(1))
-                        val2 = float(m_p2.group(2))
-                        live_state[market]['price'] = val1 / (val2 * 2) if val2 != 0 else 0
+                        if fields is None: fields = {}
+                        fields[key] = float(m.group(1))
                     except: pass
 
-            if 'BID PASS 7 minus 2 candles' in line and market:
-                snapshot = live_state.get(market, {}).copy()
-                snapshot['market'] = market
-                snapshot['pass_time'] = current_dt
-                snapshot['val'] = last_val  # 가장 최근의 val 저장
-                p1_c = snapshot.get('pass1_cur', 0); p1_a = snapshot.get('pass1_avg', 0)
-                snapshot['PASS1_Ratio'] = p1_c / p1_a if p1_a != 0 else 0
-                b5_p = snapshot.get('bid5_prev', 0); b5_24 = snapshot.get('bid5_24h', 0)
-                snapshot['BID5_Ratio'] = b5_p / b5_24 if b5_24 != 0 else 0
-                last_pass[market] = snapshot
-
-            # 매수 주문 시 투자 금액(KRW) 추출
-            if '"side":"bid"' in line:
+        # price 2 매칭 및 계산 (금액 1 / (금액 2 * 2))
+        if 'price 2' in line:
+            m_p2 = _PRICE2_RE.search(line)
+            if m_p2:
                 try:
-                    json_str = line.split(' - ')[-1]
-                    order_data = json.loads(json_str)
-                    mkt = order_data.get('market')
-                    if mkt and mkt in last_pass:
-                        trade_info = last_pass[mkt].copy()
-                        trade_info['bid_time'] = current_dt
-                        trade_info['invested_krw'] = float(order_data.get('price', 0))
-                        
-                        # 매수 시점의 가장 최신 price 정보 반영
-                        if mkt in live_state and 'price' in live_state[mkt]:
-                            trade_info['price'] = live_state[mkt]['price']
-                            
-                        pending_trades[mkt] = trade_info
+                    val1 = float(m_p2.group(1))
+                    val2 = float(m_p2.group(2))
+                    if fields is None: fields = {}
+                    fields['price'] = val1 / (val2 * 2) if val2 != 0 else 0
                 except: pass
 
-            # 실제 매수 단가 추출
-            if 'bid trade price' in line and market:
-                price_match = re.search(r'/\s*([\d\.]+)', line)
-                if price_match and market in pending_trades:
-                    pending_trades[market]['bid_price_unit'] = float(price_match.group(1))
-
-            # 매도 시작 신호 포착
-            if 'ASK start' in line and market:
-                if market in pending_trades:
-                    pending_trades[market]['is_asking'] = True
-
-            # 실제 매도 단가 추출 (ASK start 이후의 trade price를 임시 저장)
-            if 'trade price' in line and market and 'bid' not in line:
-                if market in pending_trades and pending_trades[market].get('is_asking'):
-                    price_match = re.search(r'/\s*([\d\.]+)', line)
-                    if not price_match:
-                        price_match = re.search(r'price\s+([\d\.]+)\s+/', line)
-                    
-                    if price_match:
-                        pending_trades[market]['temp_ask_price'] = float(price_match.group(1))
-
-            # 매도 주문 JSON 로그가 찍힐 때 최종 확정
-            if '"side":"ask"' in line:
-                try:
-                    json_str = line.split(' - ')[-1]
-                    order_data = json.loads(json_str)
-                    mkt = order_data.get('market')
-                    if mkt and mkt in pending_trades:
-                        trade = pending_trades.pop(mkt)
-                        volume = float(order_data.get('volume', 0))
-                        ask_price_unit = trade.get('temp_ask_price', 0)
-                        bid_unit = trade.get('bid_price_unit', 0)
-                        
-                        if bid_unit > 0 and ask_price_unit > 0:
-                            trade['profit_rate'] = (ask_price_unit - bid_unit) / bid_unit * 100
-                            trade['profit_krw'] = (ask_price_unit - bid_unit) * volume - (trade.get('invested_krw', 0) * 0.001)
-                            trade['result'] = 'ok' if ask_price_unit > bid_unit else 'x' if ask_price_unit < bid_unit else 'NB'
-                        else:
-                            trade['profit_rate'] = 0; trade['profit_krw'] = 0; trade['result'] = 'NB'
-                        
-                        trade['ask_price'] = ask_price_unit
-                        trade['volume'] = volume
-                        
-                        # 타임스탬프를 매수 시점(bid_time)으로 고정하고 매도 시간은 별도 저장
-                        if 'bid_time' in trade:
-                            trade['timestamp'] = trade['bid_time']
-                            trade['sell_time'] = current_dt
-                        else:
-                            trade['timestamp'] = current_dt
-                            
-                        trade['date'] = clean_date_str
-                        final_data.append(trade)
-                        continue
-                except: pass
+        is_pass = 'BID PASS 7 minus 2 candles' in line
+
+        # 실제 매수 단가 (숫자 변환은 대기 거래가 있을 때만 하므로 문자열로 보관)
+        if 'bid trade price' in line:
+            price_match = _SLASH_PRICE_RE.search(line)
+            if price_match: bid_unit = price_match.group(1)
+
+        ask_start = 'ASK start' in line
+
+        # 매도 단가 후보
+        if 'trade price' in line and 'bid' not in line:
+            price_match = _SLASH_PRICE_RE.search(line) or _PRICE_SLASH_RE.search(line)
+            if price_match: ask_price = price_match.group(1)
+
+    # 매수/매도 주문 JSON
+    bid_order = None
+    if '"side":"bid"' in line:
+        try:
+            order_data = json.loads(line.split(' - ')[-1])
+            mkt = order_data.get('market')
+            if mkt: bid_order = (mkt, float(order_data.get('price', 0)))
+        except: pass
+
+    ask_order = None
+    if '"side":"ask"' in line:
+        try:
+            order_data = json.loads(line.split(' - ')[-1])
+            mkt = order_data.get('market')
+            if mkt: ask_order = (mkt, order_data.get('volume', 0))
+        except: pass
+
+    # 기존 매도 결과 로그 (백업용)
+    backup_ask = None
+    if 'ask' in line:
+        ask_match = _BACKUP_ASK_RE.search(line)
+        if ask_match:
+            prices = _SLASH_PRICE_RE.findall(line)
+            backup_ask = (ask_match.group(2), prices[-1] if prices else None)
+
+    if (val is None and fields is None and not is_pass and bid_order is None and bid_unit is None
+            and not ask_start and ask_price is None and ask_order is None and backup_ask is None):
+        return None
+    return (val, time_str, market, fields, is_pass, bid_order, bid_unit, ask_start, ask_price, ask_order, backup_ask)
+
+
+def _time_to_ms(time_str):
+    # 'HH:MM:SS.mmm' 고정 포맷 -> 자정 기준 밀리초 (strptime 대신 자리수로 직접 계산)
+    return (int(time_str[0:2]) * 3600000 + int(time_str[3:5]) * 60000
+            + int(time_str[6:8]) * 1000 + int(time_str[9:12]))
+
+
+# live_state 마켓별 지표 키 -> PASS 스냅샷 튜플 위치
+_SNAP_FIELDS = ('pass1_avg', 'pass1_cur', 'wideTrendAvg', 'wideTrendAvg2', 'crossAvg', 'trendAvg',
+                'upRate', 'fastRate', 'bid5_24h', 'bid5_prev', 'price')
+_SNAP_POS = {k: i for i, k in enumerate(_SNAP_FIELDS)}
+
+
+class _PassSnapshot:
+    """BID PASS 7 시점의 마켓 지표 (만든 뒤 바뀌지 않으므로 매수 주문 때 복사하지 않고 공유)"""
+    __slots__ = ('market', 'pass_ms', 'val', 'values', 'pass1_ratio', 'bid5_ratio')
+
+    def __init__(self, market, pass_ms, val, live):
+        self.market = market
+        self.pass_ms = pass_ms
+        self.val = val
+        self.values = tuple(map(live.get, _SNAP_FIELDS))
+        p1_c = live.get('pass1_cur', 0); p1_a = live.get('pass1_avg', 0)
+        self.pass1_ratio = p1_c / p1_a if p1_a != 0 else 0
+        b5_p = live.get('bid5_prev', 0); b5_24 = live.get('bid5_24h', 0)
+        self.bid5_ratio = b5_p / b5_24 if b5_24 != 0 else 0
+
+
+class _PendingTrade:
+    """매수 주문 이후 매도 확정 전까지의 거래"""
+    __slots__ = ('snap', 'bid_ms', 'invested_krw', 'price', 'bid_price_unit', 'is_asking', 'temp_ask_price')
+
+    def __init__(self, snap, bid_ms, invested_krw, price):
+        self.snap = snap
+        self.bid_ms = bid_ms
+        self.invested_krw = invested_krw
+        self.price = price
+        self.bid_price_unit = None
+        self.is_asking = False
+        self.temp_ask_price = None
+
 
-            # 기존 매도 결과 처리 로직 (백업용)
-            ask_match = re.search(r'(up ask|down ask|highest ask)\s+(KRW-[A-Z0-9]+)', line)
-            if ask_match:
-                mkt = ask_match.group(2)
-                if mkt in pending_trades:
-                    trade = pending_trades.pop(mkt)
-                    prices = re.findall(r'/\s*([\d\.]+)', line)
-                    ask_price_unit = float(prices[-1]) if prices else trade.get('temp_ask_price', 0)
-                    
-                    bid_unit = trade.get('bid_price_unit', 0)
-                    volume = trade.get('volume', 0)
-                    
-                    if bid_unit > 0 and ask_price_unit > 0:
-                        trade['profit_rate'] = (ask_price_unit - bid_unit) / bid_unit * 100
-                        trade['profit_krw'] = (ask_price_unit - bid_unit) * volume - (trade.get('invested_krw', 0) * 0.001)
-                        trade['result'] = 'ok' if ask_price_unit > bid_unit else 'x' if ask_price_unit < bid_unit else 'NB'
-                    else:
-                        trade['profit_rate'] = 0; trade['profit_krw'] = 0; trade['result'] = 'NB'
-                    
-                    trade['ask_price'] = ask_price_unit
-                    
-                    # 타임스탬프를 매수 시점(bid_time)으로 고정하고 매도 시간은 별도 저장
-                    if 'bid_time' in trade:
-                        trade['timestamp'] = trade['bid_time']
-                        trade['sell_time'] = current_dt
-                    else:
-                        trade['timestamp'] = current_dt
-
-                    trade['date'] = clean_date_str
-                    final_data.append(trade)
+class TradeRecord(NamedTuple):
+    """완성된 거래 한 건 (시간은 자정 기준 ms, DataFrame 변환 시 datetime64로 바뀜)"""
+    date: str
+    timestamp_ms: int
+    sell_time_ms: Optional[int]
+    market: str
+    result: str
+    profit_rate: float
+    profit_krw: float
+    invested_krw: float
+    price: Optional[float]
+    PASS1_Ratio: float
+    BID5_Ratio: float
+    bid5_24h: Optional[float]
+    wideTrendAvg: Optional[float]
+    wideTrendAvg2: Optional[float]
+    crossAvg: Optional[float]
+    trendAvg: Optional[float]
+    upRate: Optional[float]
+    fastRate: Optional[float]
+    bid_price_unit: Optional[float]
+    ask_price: float
+    volume: Optional[float]
 
+
+class ExpiParserState:
+    """
+    마켓별 PASS -> bid -> ask 상태 머신
+    _tokenize_line 결과를 로그 순서대로 받아서 완성된 거래(TradeRecord)를 돌려줌
+    """
+    def __init__(self, date_str):
+        self.clean_date_str = date_str[:10]
+        self.live_state = {}
+        self.last_pass = {}
+        self.pending_trades = {}
+        self.last_val = None  # 마켓 없이 찍히는 val 임시 보관
+
+    def to_checkpoint(self):
+        return {
+            'date': self.clean_date_str,
+            'live_state': self.live_state,
+            'last_pass': self.last_pass,
+            'pending_trades': self.pending_trades,
+            'last_val': self.last_val,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, data):
+        state = cls(data['date'])
+        state.live_state = data['live_state']
+        state.last_pass = data['last_pass']
+        state.pending_trades = data['pending_trades']
+        state.last_val = data['last_val']
+        return state
+
+    def _close_trade(self, trade, ask_price_unit, volume, time_str):
+        bid_unit = trade.bid_price_unit or 0
+        if bid_unit > 0 and ask_price_unit > 0:
+            profit_rate = (ask_price_unit - bid_unit) / bid_unit * 100
+            profit_krw = (ask_price_unit - bid_unit) * (volume or 0) - (trade.invested_krw * 0.001)
+            result = 'ok' if ask_price_unit > bid_unit else 'x' if ask_price_unit < bid_unit else 'NB'
+        else:
+            profit_rate = 0; profit_krw = 0; result = 'NB'
+
+        # 타임스탬프는 매수 시점(bid_ms)으로 고정하고 매도 시간은 별도 저장
+        snap = trade.snap
+        v = snap.values
+        return TradeRecord(
+            self.clean_date_str, trade.bid_ms, _time_to_ms(time_str), snap.market, result,
+            profit_rate, profit_krw, trade.invested_krw, trade.price, snap.pass1_ratio, snap.bid5_ratio,
+            v[8], v[2], v[3], v[4], v[5], v[6], v[7],
+            trade.bid_price_unit, ask_price_unit, volume,
+        )
+
+    def apply(self, rec):
+        val, time_str, market, fields, is_pass, bid_order, bid_unit, ask_start, ask_price, ask_order, backup_ask = rec
+        if val is not None:
+            self.last_val = val
+        if time_str is None:
+            return None
+
+        live_state = self.live_state
+        pending_trades = self.pending_trades
+
+        if fields:
+            if market not in live_state: live_state[market] = {}
+            live_state[market].update(fields)
+
+        if is_pass:
+            # 가장 최근의 val 저장
+            self.last_pass[market] = _PassSnapshot(market, _time_to_ms(time_str), self.last_val, live_state.get(market, {}))
+
+        # 매수 주문 시 투자 금액(KRW) 반영
+        if bid_order is not None:
+            mkt, invested = bid_order
+            snap = self.last_pass.get(mkt)
+            if snap is not None:
+                # 매수 시점의 가장 최신 price 정보 반영
+                live = live_state.get(mkt)
+                price = live['price'] if live and 'price' in live else snap.values[_SNAP_POS['price']]
+                pending_trades[mkt] = _PendingTrade(snap, _time_to_ms(time_str), invested, price)
+
+        if bid_unit is not None and market in pending_trades:
+            pending_trades[market].bid_price_unit = float(bid_unit)
+
+        # 매도 시작 신호 포착
+        if ask_start and market in pending_trades:
+            pending_trades[market].is_asking = True
+
+        # 실제 매도 단가 (ASK start 이후의 trade price를 임시 저장)
+        if ask_price is not None and market in pending_trades and pending_trades[market].is_asking:
+            pending_trades[market].temp_ask_price = float(ask_price)
+
+        # 매도 주문 JSON 로그가 찍힐 때 최종 확정
+        if ask_order is not None:
+            mkt, volume = ask_order
+            if mkt in pending_trades:
+                trade = pending_trades.pop(mkt)
+                try: volume = float(volume)
+                except: trade = None
+                if trade is not None:
+                    return self._close_trade(trade, trade.temp_ask_price or 0, volume, time_str)
+
+        # 기존 매도 결과 처리 로직 (백업용, 주문 수량 정보 없음)
+        if backup_ask is not None:
+            mkt, last_price = backup_ask
+            if mkt in pending_trades:
+                trade = pending_trades.pop(mkt)
+                ask_price_unit = float(last_price) if last_price is not None else (trade.temp_ask_price or 0)
+                return self._close_trade(trade, ask_price_unit, None, time_str)
+
+        return None
+
+
+# 출력 컬럼 dtype: 지표/비율은 float32, 금액/단가/수량은 정밀도 때문에 float64 유지
+_CATEGORY_COLS = ('date', 'market', 'result')
+_FLOAT32_COLS = ('profit_rate', 'PASS1_Ratio', 'BID5_Ratio', 'wideTrendAvg', 'wideTrendAvg2',
+                 'crossAvg', 'trendAvg', 'upRate', 'fastRate')
+_FLOAT64_COLS = ('profit_krw', 'invested_krw', 'price', 'bid5_24h', 'bid_price_unit', 'ask_price', 'volume')
+
+
+def _build_result_frame(final_data):
+    """TradeRecord 목록 -> 컬럼별 배열로 바로 DataFrame 생성 (categorical / float32 / datetime64[ns])"""
     if not final_data: return pd.DataFrame()
-    result_df = pd.DataFrame(final_data)
-    cols = ['date', 'timestamp', 'sell_time', 'market', 'result', 'profit_rate', 'profit_krw', 'invested_krw', 'price', 'PASS1_Ratio', 'BID5_Ratio', 'bid5_24h',
-            'wideTrendAvg', 'wideTrendAvg2', 'crossAvg', 'trendAvg', 'upRate', 'fastRate', 'bid_price_unit', 'ask_price', 'volume']
-    
-    # 필수 컬럼 보장
-    for c in cols:
-        if c not in result_df.columns:
-            result_df[c] = None
-            
-    return result_df[cols]
-
-def load_all_data(data_dir, date_list):
-    all_dfs = []
+    columns = dict(zip(TradeRecord._fields, zip(*final_data)))
+
+    data = {}
+    for c in _CATEGORY_COLS:
+        data[c] = pd.Categorical(columns[c])
+    # 자정 기준 ms -> datetime64[ns] 벡터 변환
+    day_start = pd.to_datetime(pd.Series(data['date']).astype(str), format='%Y-%m-%d').to_numpy('datetime64[ns]')
+    for c in ('timestamp', 'sell_time'):
+        ms = np.array(columns[c + '_ms'], dtype=np.float64)
+        data[c] = day_start + pd.to_timedelta(ms, unit='ms').to_numpy('timedelta64[ns]')
+    for c in _FLOAT32_COLS:
+        data[c] = np.array(columns[c], dtype=np.float32)
+    for c in _FLOAT64_COLS:
+        data[c] = np.array(columns[c], dtype=np.float64)
+
+    return pd.DataFrame(data, columns=RESULT_COLS)
+
+
+def concat_result_frames(frames):
+    """_build_result_frame 결과 여러 개 합치기 (날짜/마켓마다 다른 categorical 카테고리를 다시 맞춤)"""
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames: return pd.DataFrame()
+    result_df = pd.concat(frames, ignore_index=True)
+    for c in _CATEGORY_COLS:
+        if c in result_df.columns and not isinstance(result_df[c].dtype, pd.CategoricalDtype):
+            result_df[c] = result_df[c].astype('category')
+    return result_df
+
+
+def _decode_lines(raw):
+    # 줄 단위로 잘린 bytes를 텍스트 모드(universal newline)와 같은 규칙으로 분리
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+READ_BLOCK = 4 * 1024 * 1024
+# 청크 하나가 이보다 작으면 병렬로 나누지 않음 (프로세스 기동/전송 비용이 더 큼)
+PARALLEL_MIN_CHUNK_BYTES = 32 * 1024 * 1024
+# tail 체크포인트에 지문으로 저장하는 파일 앞부분 크기 (로테이션/교체 감지용)
+TAIL_HEAD_BYTES = 4096
+
+
+COMPRESSED_SUFFIXES = ('.gz', '.zst', '.bz2')
+# 압축 해제 스트림을 이 크기 단위로 읽어서 텍스트로 디코딩
+DECOMPRESS_BLOCK = 1024 * 1024
+
+
+def is_compressed_log(acc_path):
+    return acc_path.endswith(COMPRESSED_SUFFIXES)
+
+
+def _open_zstd(acc_path):
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.open(acc_path, 'rb')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd 로그를 읽으려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+    return zstandard.ZstdDecompressor().stream_reader(open(acc_path, 'rb'), read_size=DECOMPRESS_BLOCK, closefd=True)
+
+
+def open_acc_log(acc_path):
+    """
+    acc_log를 텍스트 스트림으로 열기
+    .gz / .zst / .bz2 는 디스크에 풀지 않고 DECOMPRESS_BLOCK 단위로 스트리밍 해제
+    """
+    if not is_compressed_log(acc_path):
+        return open(acc_path, 'r', encoding='utf-8')
+    if acc_path.endswith('.gz'):
+        raw = gzip.open(acc_path, 'rb')
+    elif acc_path.endswith('.bz2'):
+        raw = bz2.open(acc_path, 'rb')
+    else:
+        raw = _open_zstd(acc_path)
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size=DECOMPRESS_BLOCK), encoding='utf-8')
+
+
+def _chunk_bounds(acc_path, n_chunks):
+    """파일을 줄 경계에 맞춘 n_chunks개의 (start, end) 바이트 구간으로 분할"""
+    size = os.path.getsize(acc_path)
+    bounds = [0]
+    with open(acc_path, 'rb') as f:
+        for k in range(1, n_chunks):
+            pos = size * k // n_chunks
+            f.seek(pos - 1)
+            f.readline()
+            cut = f.tell()
+            if bounds[-1] < cut < size:
+                bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _iter_range_lines(f, start, end):
+    # 줄 경계에 맞춘 [start, end) 바이트 구간을 READ_BLOCK 단위로 읽으면서 줄 단위로 yield
+    f.seek(start)
+    remaining = end - start
+    rest = b''
+    while remaining > 0:
+        block = f.read(min(READ_BLOCK, remaining))
+        if not block: break
+        remaining -= len(block)
+        rest += block
+        cut = rest.rfind(b'\n') + 1
+        if cut:
+            yield from _decode_lines(rest[:cut])
+            rest = rest[cut:]
+    if rest:
+        yield from _decode_lines(rest)
+
+
+def _tokenize_range(acc_path, start, end):
+    # 병렬 청크 작업: 구간 안의 줄을 토큰화만 하고 상태 머신은 돌리지 않음
+    records = []
+    with open(acc_path, 'rb') as f:
+        for line in _iter_range_lines(f, start, end):
+            rec = _tokenize_line(line)
+            if rec is not None: records.append(rec)
+    return records
+
+
+def _parse_chunked(acc_path, date_str, n_chunks):
+    """
+    하나의 큰 로그를 줄 경계 청크로 나눠 병렬 토큰화한 뒤, 레코드를 파일 순서대로 상태 머신에 흘려 이어붙임
+    마켓별 PASS -> bid -> ask 상태는 순차 단계에서만 바뀌므로 청크 경계를 넘는 거래도 순차 파싱과 결과가 같음
+    """
+    bounds = _chunk_bounds(acc_path, n_chunks)
+    state = ExpiParserState(date_str)
+    final_data = []
+    with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+        futures = [pool.submit(_tokenize_range, acc_path, start, end) for start, end in bounds]
+        for fut in futures:
+            for rec in fut.result():
+                trade = state.apply(rec)
+                if trade is not None: final_data.append(trade)
+    return final_data
+
+
+def parse_single_day_expi(acc_path, date_str, workers=1):
+    """
+    :param workers: 2 이상이면 큰 파일을 청크로 나눠 병렬 파싱 (청크당 PARALLEL_MIN_CHUNK_BYTES 이상일 때만, 압축 파일은 순차)
+    """
+    if not os.path.exists(acc_path):
+        return pd.DataFrame()
+
+    n_chunks = 0 if is_compressed_log(acc_path) else min(workers, os.path.getsize(acc_path) // PARALLEL_MIN_CHUNK_BYTES)
+    if n_chunks >= 2:
+        try:
+            return _build_result_frame(_parse_chunked(acc_path, date_str, n_chunks))
+        except (OSError, NotImplementedError) as e:
+            print(f"Process pool unavailable, parsing sequentially: {e}")
+
+    return _build_result_frame(list(iter_trades(acc_path, date_str)))
+
+
+def parse_single_day_market(acc_path, date_str, markets):
+    """
+    특정 마켓 거래만 파싱 (parse_single_day_expi 결과를 마켓으로 거른 것과 동일)
+    마켓별 바이트 인덱스 사이드카(src.log_index)로 해당 마켓/val/주문 JSON 줄이 있는 구간만 seek해서 읽음
+    :param markets: 'KRW-OPEN' 또는 마켓 리스트
+    """
+    if isinstance(markets, str): markets = [markets]
+    wanted = set(markets)
+    if not os.path.exists(acc_path):
+        return pd.DataFrame()
+    if is_compressed_log(acc_path):
+        # 압축 파일은 seek가 안 되므로 전체 스트리밍 후 필터
+        return _build_result_frame([t for t in iter_trades(acc_path, date_str) if t.market in wanted])
+
+    ranges = market_ranges(load_market_index(acc_path), markets)
+    state = ExpiParserState(date_str)
+    final_data = []
+    with open(acc_path, 'rb') as f:
+        for start, end in ranges:
+            for line in _iter_range_lines(f, start, end):
+                rec = _tokenize_line(line)
+                if rec is None: continue
+                trade = state.apply(rec)
+                if trade is not None and trade.market in wanted: final_data.append(trade)
+    return _build_result_frame(final_data)
+
+
+def iter_trades(acc_path, date_str):
+    """
+    완성된 거래(TradeRecord)를 매도 확정 순서대로 하나씩 yield
+    전체 거래 목록을 메모리에 쌓지 않으므로 긴 기간 일괄 처리/내보내기에 사용
+    """
+    if not os.path.exists(acc_path):
+        return
+
+    state = ExpiParserState(date_str)
+    with open_acc_log(acc_path) as f:
+        for line in f:
+            rec = _tokenize_line(line)
+            if rec is None: continue
+            trade = state.apply(rec)
+            if trade is not None: yield trade
+
+
+def iter_trade_batches(trades, batch_size=10000):
+    """거래 스트림을 batch_size 건씩 parse_single_day_expi와 같은 컬럼의 DataFrame으로 묶어 yield"""
+    batch = []
+    for trade in trades:
+        batch.append(trade)
+        if len(batch) >= batch_size:
+            yield _build_result_frame(batch)
+            batch = []
+    if batch:
+        yield _build_result_frame(batch)
+
+
+def _file_identity(acc_path, offset):
+    # (장치, inode, 앞부분 해시): 로그가 커지기만 하면 그대로이고, 로테이션/교체되면 (더 큰 파일이라도) 달라짐
+    # 해시는 이미 읽은 부분(offset) 안쪽만 사용하므로 이어 붙여 쓰는 동안에는 변하지 않음
+    st = os.stat(acc_path)
+    with open(acc_path, 'rb') as f:
+        head = f.read(min(offset, TAIL_HEAD_BYTES))
+    return (st.st_dev, st.st_ino, len(head), hashlib.sha1(head).hexdigest())
+
+
+def _load_tail_checkpoint(checkpoint_path, acc_path, date_str):
+    if not os.path.exists(checkpoint_path):
+        return None
+    try:
+        with open(checkpoint_path, 'rb') as f:
+            ckpt = pickle.load(f)
+    except Exception as e:
+        print(f"Checkpoint Error: {e}")
+        return None
+    if ckpt.get('version') != PARSER_VERSION or ckpt.get('path') != os.path.abspath(acc_path) or ckpt['state']['date'] != date_str[:10]:
+        return None
+    # 파일이 잘렸거나 교체/로테이션된 경우(크기가 더 커도) 처음부터 다시 읽음
+    if os.path.getsize(acc_path) < ckpt['offset']:
+        return None
+    if ckpt.get('identity') != _file_identity(acc_path, ckpt['offset']):
+        return None
+    return ckpt
+
+
+def parse_new_trades(acc_path, date_str, checkpoint_path, final=False):
+    """
+    계속 늘어나는 로그를 이어서 파싱 (tail 모드)
+    체크포인트에 저장된 바이트 오프셋부터 새로 추가된 부분만 읽고, 파서 상태(live_state, last_pass, pending_trades, last_val)를 이어받음
+    :param checkpoint_path: 오프셋과 파서 상태를 저장할 파일 경로 (파일 inode/앞부분 해시가 달라지면 처음부터 다시 파싱)
+    :param final: True면 줄바꿈으로 끝나지 않은 마지막 줄도 완성된 줄로 처리 (기본은 다음 호출까지 보류)
+    :return: 이번 호출에서 새로 완성된 거래만 담은 DataFrame
+    """
+    if not os.path.exists(acc_path):
+        return pd.DataFrame()
+    if is_compressed_log(acc_path):
+        raise ValueError(f"압축 로그는 tail 파싱을 지원하지 않습니다 (parse_single_day_expi 사용): {acc_path}")
+
+    ckpt = _load_tail_checkpoint(checkpoint_path, acc_path, date_str)
+    if ckpt is None:
+        offset, state = 0, ExpiParserState(date_str)
+    else:
+        offset, state = ckpt['offset'], ExpiParserState.from_checkpoint(ckpt['state'])
+
+    final_data = []
+
+    def feed(lines):
+        for line in lines:
+            rec = _tokenize_line(line)
+            if rec is None: continue
+            trade = state.apply(rec)
+            if trade is not None: final_data.append(trade)
+
+    with open(acc_path, 'rb') as f:
+        f.seek(offset)
+        rest = b''
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block: break
+            rest += block
+            cut = rest.rfind(b'\n') + 1
+            if cut:
+                feed(_decode_lines(rest[:cut]))
+                offset += cut
+                rest = rest[cut:]
+        if final and rest:
+            feed(_decode_lines(rest))
+            offset += len(rest)
+
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': PARSER_VERSION, 'path': os.path.abspath(acc_path), 'offset': offset,
+                     'identity': _file_identity(acc_path, offset), 'state': state.to_checkpoint()}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+    return _build_result_frame(final_data)
+
+
+# 평문 우선, 없으면 압축본 (.txt.gz 등)
+ACC_LOG_PATTERNS = [p + ext for ext in ('',) + COMPRESSED_SUFFIXES
+                    for p in ("acc_log.{date}.txt", "acc_log.{date}.txt.log", "acc_log.{date}.log")]
+
+
+def find_acc_log(data_dir, date_str):
+    for p in ACC_LOG_PATTERNS:
+        acc_path = os.path.join(data_dir, p.format(date=date_str))
+        if os.path.exists(acc_path):
+            return acc_path
+    return None
+
+
+def iter_all_trades(data_dir, date_list):
+    """여러 날짜의 거래를 date_list 순서대로 이어서 yield (하루씩 순차 스트리밍)"""
+    for date_str in date_list:
+        acc_path = find_acc_log(data_dir, date_str)
+        if acc_path:
+            yield from iter_trades(acc_path, date_str)
+
+
+def _parse_day_job(acc_path, date_str, markets=None, workers=1):
+    # 프로세스 풀에서 실행되는 작업 단위 (pickle 가능하도록 모듈 최상위에 둠)
+    if markets:
+        return parse_single_day_market(acc_path, date_str, markets)
+    return parse_single_day_expi(acc_path, date_str, workers=workers)
+
+
+def load_all_data(data_dir, date_list, max_workers=None, cache=None, markets=None):
+    """
+    여러 날짜의 로그를 프로세스 풀로 병렬 파싱
+    :param max_workers: 워커 프로세스 수 (None이면 CPU 개수, 1이면 순차 처리)
+    :param cache: ParsedTradeCache. 주어지면 변경되지 않은 날짜는 캐시에서 읽고 새로 파싱한 결과는 저장
+    :param markets: 지정하면 해당 마켓 거래만 인덱스 기반으로 파싱 (캐시는 사용하지 않음)
+    :return: date_list 순서대로 합친 DataFrame. 실패한 날짜는 attrs['load_errors']에 (날짜, 경로, 에러) 로 기록
+    """
+    jobs = []
     for date_str in date_list:
-        patterns = [f"acc_log.{date_str}.txt", f"acc_log.{date_str}.txt.log", f"acc_log.{date_str}.log"]
-        for p in patterns:
-            acc_path = os.path.join(data_dir, p)
-            if os.path.exists(acc_path):
-                df = parse_single_day_expi(acc_path, date_str)
-                if not df.empty: all_dfs.append(df)
-                break
-    return pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+        acc_path = find_acc_log(data_dir, date_str)
+        if acc_path: jobs.append((date_str, acc_path))
+
+    results = [None] * len(jobs)
+    errors = []
+
+    todo = []
+    for i, (date_str, acc_path) in enumerate(jobs):
+        if cache is not None and not markets:
+            results[i] = cache.load(acc_path, date_str)
+        if results[i] is None:
+            todo.append(i)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # 하루치만 남았으면 날짜 병렬 대신 파일 내부 청크 병렬
+    chunk_workers = max_workers if len(todo) == 1 else 1
+    max_workers = min(max_workers, len(todo))
+
+    pool = None
+    if max_workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"Process pool unavailable, parsing sequentially: {e}")
+
+    if pool is None:
+        for i in todo:
+            date_str, acc_path = jobs[i]
+            try:
+                results[i] = _parse_day_job(acc_path, date_str, markets, workers=chunk_workers)
+            except Exception as e:
+                errors.append((date_str, acc_path, f"{type(e).__name__}: {e}"))
+    else:
+        with pool:
+            futures = {i: pool.submit(_parse_day_job, jobs[i][1], jobs[i][0], markets) for i in todo}
+            for i in todo:
+                date_str, acc_path = jobs[i]
+                try:
+                    results[i] = futures[i].result()
+                except Exception as e:
+                    errors.append((date_str, acc_path, f"{type(e).__name__}: {e}"))
+
+    if cache is not None and not markets:
+        for i in todo:
+            if results[i] is not None:
+                date_str, acc_path = jobs[i]
+                try:
+                    cache.store(acc_path, date_str, results[i])
+                except Exception as e:
+                    print(f"Cache Error [{date_str}]: {e}")
+
+    for date_str, acc_path, msg in errors:
+        print(f"Parse Error [{date_str}] {acc_path}: {msg}")
+
+    result_df = concat_result_frames(results)
+    result_df.attrs['load_errors'] = errors
+    return result_df
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from src.candle_store import rows_to_frame
+from src.fetcher import _to_epoch
+
+# 업비트 분봉 단위 (캔들 시작 시각은 UTC epoch 기준 unit 분 경계, 240분봉도 UTC 00/04/08/.. 시 시작)
+UPBIT_UNITS = (1, 3, 5, 10, 15, 30, 60, 240)
+
+
+def _frame_to_rows(df):
+    ts = df['time'].to_numpy().astype('datetime64[s]').astype(np.int64)
+    return np.column_stack([ts, df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)])
+
+
+def resample_rows(rows, interval_min):
+    """
+    (ts, open, high, low, close, volume) 오름차순 1분봉 배열을 interval_min 분봉으로 묶음
+    open 은 첫 1분봉, close 는 마지막 1분봉, high/low 는 최대/최소, volume(거래대금)은 합계
+    거래가 없는 버킷은 업비트처럼 빠짐
+    """
+    if interval_min not in UPBIT_UNITS:
+        raise ValueError(f"지원하지 않는 분봉: {interval_min} (가능: {UPBIT_UNITS})")
+    if interval_min == 1 or len(rows) == 0:
+        return rows
+    unit_sec = interval_min * 60
+    bucket = rows[:, 0].astype(np.int64) // unit_sec * unit_sec
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+    return np.column_stack([
+        bucket[starts],
+        rows[starts, 1],
+        np.maximum.reduceat(rows[:, 2], starts),
+        np.minimum.reduceat(rows[:, 3], starts),
+        rows[ends, 4],
+        np.add.reduceat(rows[:, 5], starts),
+    ]).astype(np.float64)
+
+
+def resample_candles(df_1m, interval_min, start=None):
+    """
+    get_ohlcv 형식 1분봉 DataFrame -> interval_min 분봉 DataFrame
+    :param start: 1분봉이 빠짐없이 받아진 구간의 시작. 이 시각보다 먼저 시작하는 버킷은 일부 분만 있으므로 버림
+                  (구간 끝쪽 버킷은 1분봉이 그 버킷 끝까지 있어야 API 캔들과 같음)
+    """
+    if df_1m.empty:
+        return df_1m
+    rows = resample_rows(_frame_to_rows(df_1m), interval_min)
+    if start is not None:
+        rows = rows[rows[:, 0] >= _to_epoch(start)]
+    return rows_to_frame(rows) if len(rows) else pd.DataFrame()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.parser import PARSER_VERSION, parse_single_day_expi
+
+
+class ParsedTradeCache:
+    """
+    parse_single_day_expi 결과를 컬럼별 NumPy 배열(.npz)로 저장하는 디스크 캐시
+    엔트리는 (경로, 파일 크기, mtime, 파서 버전)이 모두 같을 때만 사용하고, 하나라도 바뀌면 다시 파싱
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, acc_path, date_str):
+        key = f"{os.path.abspath(acc_path)}|{date_str}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + ".npz")
+
+    @staticmethod
+    def _fingerprint(acc_path, date_str):
+        st = os.stat(acc_path)
+        return {
+            'path': os.path.abspath(acc_path),
+            'date': date_str,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'parser_version': PARSER_VERSION,
+        }
+
+    def load(self, acc_path, date_str):
+        """캐시에 유효한 엔트리가 있으면 DataFrame, 없으면 None"""
+        entry = self._entry_path(acc_path, date_str)
+        if not os.path.exists(entry) or not os.path.exists(acc_path):
+            return None
+        try:
+            with np.load(entry, allow_pickle=False) as npz:
+                meta = json.loads(str(npz['__meta__']))
+                if meta['fingerprint'] != self._fingerprint(acc_path, date_str):
+                    return None
+                data = {}
+                for col, dtype in meta['columns']:
+                    values = npz[f"c:{col}"]
+                    if f"n:{col}" in npz:
+                        # 문자열 컬럼은 None 마스크로 복원
+                        values = values.astype(object)
+                        values[npz[f"n:{col}"]] = None
+                        series = pd.Series(values, dtype=object)
+                        data[col] = series if dtype == 'object' else series.astype(dtype)
+                    else:
+                        data[col] = values
+        except Exception as e:
+            print(f"Cache Error: {e}")
+            return None
+        return pd.DataFrame(data, columns=[c for c, _ in meta['columns']])
+
+    def store(self, acc_path, date_str, df):
+        arrays = {}
+        columns = []
+        for col in df.columns:
+            s = df[col]
+            columns.append((col, str(s.dtype)))
+            if s.dtype.kind in 'biufM':
+                arrays[f"c:{col}"] = s.to_numpy()
+            else:
+                isnull = s.isna().to_numpy()
+                arrays[f"c:{col}"] = np.array(['' if n else str(v) for v, n in zip(s.tolist(), isnull)], dtype=str)
+                arrays[f"n:{col}"] = isnull
+        meta = {'fingerprint': self._fingerprint(acc_path, date_str), 'columns': columns}
+        arrays['__meta__'] = np.array(json.dumps(meta))
+
+        entry = self._entry_path(acc_path, date_str)
+        tmp_path = entry + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, entry)
+
+    def get_or_parse(self, acc_path, date_str):
+        df = self.load(acc_path, date_str)
+        if df is None:
+            df = parse_single_day_expi(acc_path, date_str)
+            self.store(acc_path, date_str, df)
+        return df
+
+    def clear(self):
+        """캐시 전체 삭제. 삭제한 엔트리 수를 반환"""
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz") or name.endswith(".tmp"):
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        return removed
+
+    def size(self):
+        """(엔트리 수, 전체 바이트)"""
+        count, total = 0, 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                count += 1
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return count, total
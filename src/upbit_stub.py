@@ -0,0 +1,286 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+# 업비트 분봉 API 흉내를 내는 로컬 서버 (네트워크 없이 fetcher 벤치마크/검증용)
+# 1분봉은 (마켓, 시각)만으로 결정되는 합성 데이터이고, 상위 분봉은 그 1분봉을 묶어서 만듦
+SUPPORTED_UNITS = (1, 3, 5, 10, 15, 30, 60, 240)
+LISTED_AT = 1_600_000_000 // 3600 * 3600  # 합성 마켓 상장 시각 (이전에는 캔들 없음)
+NO_TRADE_RATE = 0.15                      # 거래가 없어 캔들이 빠지는 1분 비율
+MAX_COUNT = 200
+RATE_LIMIT_PER_SEC = 10                   # 업비트 캔들 그룹 초당 한도
+
+_CANDLE_PATH_RE = re.compile(r'^/v1/candles/minutes/(\d+)$')
+
+
+def _market_key(market):
+    key = 0
+    for ch in market.encode('utf-8'):
+        key = (key * 131 + ch) & 0xFFFFFFFF
+    return key
+
+
+def _uniform(ts, market_key, salt):
+    # (시각, 마켓, salt) -> [0, 1) 결정적 난수 (splitmix 계열 정수 해시)
+    x = (ts.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ np.uint64(market_key * 0x85EBCA6B + salt * 0xC2B2AE35)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def synthetic_minutes(market, start_ts, end_ts):
+    """
+    [start_ts, end_ts) 구간의 합성 1분봉
+    :return: (ts, open, high, low, close, volume) 오름차순 배열 (거래 없는 분은 빠짐)
+    """
+    start_ts = max(int(start_ts), LISTED_AT) // 60 * 60
+    if end_ts <= start_ts:
+        return np.empty((0, 6))
+    ts = np.arange(start_ts, int(end_ts), 60, dtype=np.int64)
+    if len(ts) == 0:
+        return np.empty((0, 6))
+    key = _market_key(market)
+    ts = ts[_uniform(ts, key, 1) >= NO_TRADE_RATE]
+
+    # 느린 추세 + 분 단위 노이즈 (호가 단위처럼 보이도록 정수 가격)
+    base = 10000 * (1 + 0.05 * np.sin(ts / 21600.0) + 0.01 * np.sin(ts / 1800.0 + key % 7))
+    open_ = np.round(base * (1 + (_uniform(ts, key, 2) - 0.5) * 0.004))
+    close = np.round(base * (1 + (_uniform(ts, key, 3) - 0.5) * 0.004))
+    high = np.maximum(open_, close) + np.round(base * _uniform(ts, key, 4) * 0.002)
+    low = np.minimum(open_, close) - np.round(base * _uniform(ts, key, 5) * 0.002)
+    volume = np.round(_uniform(ts, key, 6) * 5e6, 2)
+    return np.column_stack([ts, open_, high, low, close, volume]).astype(np.float64)
+
+
+def aggregate_minutes(rows, unit):
+    """
+    1분봉 배열을 unit 분봉으로 묶음 (UTC epoch 기준 정렬, 거래 없는 버킷은 빠짐)
+    src.resample.resample_rows 검증 기준이므로 일부러 다른 방식(pandas groupby)으로 계산
+    """
+    if unit == 1 or len(rows) == 0:
+        return rows
+    df = pd.DataFrame(rows, columns=['ts', 'open', 'high', 'low', 'close', 'volume'])
+    df['ts'] = df['ts'].astype(np.int64) // (unit * 60) * (unit * 60)
+    out = df.groupby('ts', sort=True).agg(
+        open=('open', 'first'), high=('high', 'max'), low=('low', 'min'),
+        close=('close', 'last'), volume=('volume', 'sum'))
+    return np.column_stack([out.index.to_numpy(), out.to_numpy()]).astype(np.float64)
+
+
+def synthetic_candles(market, unit, to_ts, count):
+    """to_ts 이전(시작 시각 < to_ts) unit 분봉 최대 count개, 오름차순"""
+    unit_sec = unit * 60
+    end_bucket = -(-int(to_ts) // unit_sec) * unit_sec  # to_ts 를 포함하는 버킷의 끝
+    # 거래 없는 버킷을 감안해 넉넉히 받아두고 뒤에서 count개만 사용
+    span = unit_sec * (count + count // 2 + 8)
+    while True:
+        start = end_bucket - span
+        rows = aggregate_minutes(synthetic_minutes(market, start, min(end_bucket, int(time.time()) + 60)), unit)
+        rows = rows[rows[:, 0] < to_ts]
+        if len(rows) >= count or start <= LISTED_AT:
+            return rows[-count:] if count else rows[:0]
+        span *= 2
+
+
+def _utc_str(ts):
+    return pd.Timestamp(int(ts), unit='s').strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def candles_to_json(market, unit, rows):
+    """업비트 응답 형식 (최신 캔들이 먼저)"""
+    out = []
+    for ts, o, h, l, c, v in rows[::-1].tolist():
+        out.append({
+            'market': market,
+            'candle_date_time_utc': _utc_str(ts),
+            'candle_date_time_kst': _utc_str(ts + 9 * 3600),
+            'opening_price': o,
+            'high_price': h,
+            'low_price': l,
+            'trade_price': c,
+            'timestamp': int(ts + unit * 60 - 1) * 1000,
+            'candle_acc_trade_price': v,
+            'candle_acc_trade_volume': round(v / c, 8) if c else 0.0,
+            'unit': unit,
+        })
+    return out
+
+
+def parse_to_param(to_str):
+    """'to' 파라미터 -> UTC epoch 초 (비어 있으면 현재 시각). 'Z' 또는 +09:00 같은 오프셋 지원, 없으면 UTC"""
+    if not to_str:
+        return int(time.time())
+    ts = pd.Timestamp(to_str.replace(' ', 'T'))
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # 헤더/본문을 따로 쓰므로 keep-alive 연결에서 지연 ACK 대기 방지
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # 새 연결마다 한 번 (TCP+TLS 핸드셰이크 비용 흉내)
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+
+    def _send_json(self, status, body, remaining=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if remaining is not None:
+            limit = self.server.rate_limit or RATE_LIMIT_PER_SEC
+            self.send_header('Remaining-Req', f"group=candles; min={limit * 60}; sec={remaining}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        m = _CANDLE_PATH_RE.match(url.path)
+        if not m:
+            return self._send_json(404, {'error': {'name': 'not_found', 'message': url.path}})
+
+        status = server.next_injected_status()
+        if status is not None:
+            return self._send_json(status, {'error': {'name': 'injected', 'message': f"HTTP {status}"}})
+
+        remaining = server.take_rate_token()
+        if remaining < 0:
+            return self._send_json(429, {'error': {'name': 'too_many_requests', 'message': 'Too many API requests.'}}, 0)
+
+        unit = int(m.group(1))
+        q = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        market = q.get('market', '')
+        try:
+            count = int(q.get('count', 1) or 1)
+            to_ts = parse_to_param(q.get('to', ''))
+        except ValueError as e:
+            return self._send_json(400, {'error': {'name': 'invalid_parameter', 'message': str(e)}}, remaining)
+        if unit not in SUPPORTED_UNITS or not market or not (1 <= count <= MAX_COUNT):
+            return self._send_json(400, {'error': {'name': 'invalid_parameter', 'message': self.path}}, remaining)
+
+        try:
+            rows = server.source(market, unit, to_ts, count)
+        except LookupError as e:  # 녹화 재생 시 녹화되지 않은 구간
+            return self._send_json(404, {'error': {'name': 'fixture_missing', 'message': str(e)}}, remaining)
+        self._send_json(200, candles_to_json(market, unit, rows), remaining)
+
+
+class UpbitStubServer(ThreadingHTTPServer):
+    """
+    로컬 업비트 캔들 서버. with 블록 안에서 백그라운드 스레드로 동작
+    :param latency: 요청마다 추가할 지연 (초, 네트워크 왕복 흉내)
+    :param handshake: 새 연결마다 추가할 지연 (초, TCP+TLS 핸드셰이크 흉내)
+    :param rate_limit: 초당 허용 요청 수 (넘으면 429, None이면 제한 없음)
+    :param source: (market, unit, to_ts, count) -> 오름차순 캔들 배열 (기본: 합성 데이터, 녹화 재생은 FixtureSource)
+                   LookupError 를 내면 404 로 응답
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, handshake=0.0, rate_limit=RATE_LIMIT_PER_SEC, source=None):
+        super().__init__((host, port), _StubHandler)
+        self.latency = latency
+        self.handshake = handshake
+        self.rate_limit = rate_limit
+        self.source = source or synthetic_candles
+        self.injected_statuses = []  # 다음 요청들에 그대로 돌려줄 HTTP 상태 (재시도 검증용)
+        self.requests_served = 0
+        self.throttled = 0  # 한도 초과로 429를 돌려준 횟수
+        self._lock = threading.Lock()
+        self._sec = None
+        self._used = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def next_injected_status(self):
+        with self._lock:
+            return self.injected_statuses.pop(0) if self.injected_statuses else None
+
+    def take_rate_token(self):
+        """이번 초에 남은 요청 수 (음수면 한도 초과)"""
+        if self.rate_limit is None:
+            return RATE_LIMIT_PER_SEC - 1
+        with self._lock:
+            sec = int(time.time())
+            if sec != self._sec:
+                self._sec, self._used = sec, 0
+            self._used += 1
+            if self._used > self.rate_limit:
+                self.throttled += 1
+            return self.rate_limit - self._used
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """
+    단독 실행: python -m src.upbit_stub --port 8765 [--fixtures rec.jsonl ...]
+    다른 터미널에서 UPBIT_API_URL=http://127.0.0.1:8765 로 app.py / debug_case.py 등을 실행하면 네트워크 없이 동작
+    """
+    import argparse
+    from src.fixtures import FixtureSource
+
+    ap = argparse.ArgumentParser(description="로컬 업비트 캔들 서버 (합성 데이터 또는 녹화 재생)")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--fixtures', nargs='*', default=[], help="ALNALYTIC_RECORD 로 녹화한 픽스처 파일 (없으면 합성 데이터)")
+    ap.add_argument('--latency-ms', type=float, default=0.0, help="요청마다 서버 지연")
+    ap.add_argument('--rate-limit', type=int, default=RATE_LIMIT_PER_SEC, help="초당 허용 요청 수 (0이면 제한 없음)")
+    args = ap.parse_args()
+
+    source = FixtureSource(*args.fixtures) if args.fixtures else None
+    server = UpbitStubServer(args.host, args.port, latency=args.latency_ms / 1000,
+                             rate_limit=args.rate_limit or None, source=source)
+    what = f"픽스처 {len(args.fixtures)}개 (응답 {source.responses}건)" if source else "합성 데이터"
+    print(f"업비트 스텁 서버 {server.url} - {what}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
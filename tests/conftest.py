@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 저장소 루트의 src 와 tests 헬퍼(tests.legacy: 원본 구현 보관) 를 import 할 수 있게
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
@@ -0,0 +1,520 @@
+"""
+변경 전 구현 보관 (테스트/벤치마크의 결과 비교 기준, 고치지 말 것)
+benchmark.py 도 여기서 가져다 쓰므로 벤치마크를 바꿔도 테스트 기준은 그대로
+"""
+import itertools
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src import fetcher
+from src.calculator import IndicatorCalculator
+
+
+def legacy_parse_single_day_expi(acc_path, date_str):
+    """키워드 분류 파서 도입 전의 원본 구현 (결과 비교 기준)"""
+    clean_date_str = date_str[:10]
+
+    patterns = {
+        'pass1_avg': re.compile(r'PASS 1 prevAccTradePrice12Avg\s+KRW.*\/ ([\d\.E\+\-]+)'),
+        'pass1_cur': re.compile(r'PASS 1 targetVo\.getAccTradePrice1min\(\).*\/ ([\d\.E\+\-]+)'),
+        'wideTrendAvg': re.compile(r'wideTrendAvg\s*:\s*([\d\.E\+\-]+)'),
+        'wideTrendAvg2': re.compile(r'wideTrendAvg2\s*:\s*([\d\.E\+\-]+)'),
+        'crossAvg': re.compile(r'BID crossAvg\s*:\s*([\d\.E\+\-]+)'),
+        'trendAvg': re.compile(r'trendAvg\s*:\s*([\d\.E\+\-]+)'),
+        'upRate': re.compile(r'BID upRate\s*:\s*([\d\.E\+\-]+)'),
+        'fastRate': re.compile(r'fastRate\s*:\s*([\d\.E\+\-]+)'),
+        'bid5_24h': re.compile(r'BID 5 targetVo\.getAccTradePrice24h\(\).*\/ ([\d\.E\+\-]+)'),
+        'bid5_prev': re.compile(r'BID 5 prevAccTradePrice.*\/ ([\d\.E\+\-]+)'),
+    }
+    price2_pattern = re.compile(r'price 2\s*:\s*[A-Z0-9-]+\s*/\s*([\d\.E\+\-]+)\s*/\s*([\d\.E\+\-]+)')
+
+    live_state = {}
+    last_pass = {}
+    pending_trades = {}
+    final_data = []
+    last_val = None
+
+    if not os.path.exists(acc_path):
+        return pd.DataFrame()
+
+    with open(acc_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+
+            val_match = re.search(r'val\s*:\s*([\d\.E\+\-]+)', line)
+            if val_match:
+                try:
+                    last_val = float(val_match.group(1)) * 100
+                except: pass
+
+            time_match = re.search(r'\[(\d{2}:\d{2}:\d{2}\.\d{3})\]', line)
+            if not time_match: continue
+            current_dt = datetime.strptime(f"{clean_date_str} {time_match.group(1)}", "%Y-%m-%d %H:%M:%S.%f")
+
+            market_match = re.search(r'(KRW-[A-Z0-9]+)', line)
+            market = market_match.group(1) if market_match else None
+
+            if market:
+                if market not in live_state: live_state[market] = {}
+                for key, pattern in patterns.items():
+                    m = pattern.search(line)
+                    if m:
+                        try: live_state[market][key] = float(m.group(1))
+                        except: pass
+
+                m_p2 = price2_pattern.search(line)
+                if m_p2:
+                    try:
+                        val1 = float(m_p2.group(1))
+                        val2 = float(m_p2.group(2))
+                        live_state[market]['price'] = val1 / (val2 * 2) if val2 != 0 else 0
+                    except: pass
+
+            if 'BID PASS 7 minus 2 candles' in line and market:
+                snapshot = live_state.get(market, {}).copy()
+                snapshot['market'] = market
+                snapshot['pass_time'] = current_dt
+                snapshot['val'] = last_val
+                p1_c = snapshot.get('pass1_cur', 0); p1_a = snapshot.get('pass1_avg', 0)
+                snapshot['PASS1_Ratio'] = p1_c / p1_a if p1_a != 0 else 0
+                b5_p = snapshot.get('bid5_prev', 0); b5_24 = snapshot.get('bid5_24h', 0)
+                snapshot['BID5_Ratio'] = b5_p / b5_24 if b5_24 != 0 else 0
+                last_pass[market] = snapshot
+
+            if '"side":"bid"' in line:
+                try:
+                    json_str = line.split(' - ')[-1]
+                    order_data = json.loads(json_str)
+                    mkt = order_data.get('market')
+                    if mkt and mkt in last_pass:
+                        trade_info = last_pass[mkt].copy()
+                        trade_info['bid_time'] = current_dt
+                        trade_info['invested_krw'] = float(order_data.get('price', 0))
+                        if mkt in live_state and 'price' in live_state[mkt]:
+                            trade_info['price'] = live_state[mkt]['price']
+                        pending_trades[mkt] = trade_info
+                except: pass
+
+            if 'bid trade price' in line and market:
+                price_match = re.search(r'/\s*([\d\.]+)', line)
+                if price_match and market in pending_trades:
+                    pending_trades[market]['bid_price_unit'] = float(price_match.group(1))
+
+            if 'ASK start' in line and market:
+                if market in pending_trades:
+                    pending_trades[market]['is_asking'] = True
+
+            if 'trade price' in line and market and 'bid' not in line:
+                if market in pending_trades and pending_trades[market].get('is_asking'):
+                    price_match = re.search(r'/\s*([\d\.]+)', line)
+                    if not price_match:
+                        price_match = re.search(r'price\s+([\d\.]+)\s+/', line)
+                    if price_match:
+                        pending_trades[market]['temp_ask_price'] = float(price_match.group(1))
+
+            if '"side":"ask"' in line:
+                try:
+                    json_str = line.split(' - ')[-1]
+                    order_data = json.loads(json_str)
+                    mkt = order_data.get('market')
+                    if mkt and mkt in pending_trades:
+                        trade = pending_trades.pop(mkt)
+                        volume = float(order_data.get('volume', 0))
+                        ask_price_unit = trade.get('temp_ask_price', 0)
+                        bid_unit = trade.get('bid_price_unit', 0)
+                        if bid_unit > 0 and ask_price_unit > 0:
+                            trade['profit_rate'] = (ask_price_unit - bid_unit) / bid_unit * 100
+                            trade['profit_krw'] = (ask_price_unit - bid_unit) * volume - (trade.get('invested_krw', 0) * 0.001)
+                            trade['result'] = 'ok' if ask_price_unit > bid_unit else 'x' if ask_price_unit < bid_unit else 'NB'
+                        else:
+                            trade['profit_rate'] = 0; trade['profit_krw'] = 0; trade['result'] = 'NB'
+                        trade['ask_price'] = ask_price_unit
+                        trade['volume'] = volume
+                        if 'bid_time' in trade:
+                            trade['timestamp'] = trade['bid_time']
+                            trade['sell_time'] = current_dt
+                        else:
+                            trade['timestamp'] = current_dt
+                        trade['date'] = clean_date_str
+                        final_data.append(trade)
+                        continue
+                except: pass
+
+            ask_match = re.search(r'(up ask|down ask|highest ask)\s+(KRW-[A-Z0-9]+)', line)
+            if ask_match:
+                mkt = ask_match.group(2)
+                if mkt in pending_trades:
+                    trade = pending_trades.pop(mkt)
+                    prices = re.findall(r'/\s*([\d\.]+)', line)
+                    ask_price_unit = float(prices[-1]) if prices else trade.get('temp_ask_price', 0)
+                    bid_unit = trade.get('bid_price_unit', 0)
+                    volume = trade.get('volume', 0)
+                    if bid_unit > 0 and ask_price_unit > 0:
+                        trade['profit_rate'] = (ask_price_unit - bid_unit) / bid_unit * 100
+                        trade['profit_krw'] = (ask_price_unit - bid_unit) * volume - (trade.get('invested_krw', 0) * 0.001)
+                        trade['result'] = 'ok' if ask_price_unit > bid_unit else 'x' if ask_price_unit < bid_unit else 'NB'
+                    else:
+                        trade['profit_rate'] = 0; trade['profit_krw'] = 0; trade['result'] = 'NB'
+                    trade['ask_price'] = ask_price_unit
+                    if 'bid_time' in trade:
+                        trade['timestamp'] = trade['bid_time']
+                        trade['sell_time'] = current_dt
+                    else:
+                        trade['timestamp'] = current_dt
+                    trade['date'] = clean_date_str
+                    final_data.append(trade)
+
+    if not final_data: return pd.DataFrame()
+    result_df = pd.DataFrame(final_data)
+    cols = ['date', 'timestamp', 'sell_time', 'market', 'result', 'profit_rate', 'profit_krw', 'invested_krw', 'price', 'PASS1_Ratio', 'BID5_Ratio', 'bid5_24h',
+            'wideTrendAvg', 'wideTrendAvg2', 'crossAvg', 'trendAvg', 'upRate', 'fastRate', 'bid_price_unit', 'ask_price', 'volume']
+    for c in cols:
+        if c not in result_df.columns:
+            result_df[c] = None
+    return result_df[cols]
+
+
+def legacy_decode(data):
+    """원본 get_ohlcv 의 응답 -> DataFrame 변환 (결과 비교 기준)"""
+    df = pd.DataFrame(data)
+    df = df.sort_values('candle_date_time_utc').reset_index(drop=True)
+    for c in ['opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_price']:
+        df[c] = df[c].astype(float)
+    df.rename(columns={'opening_price': 'open', 'high_price': 'high', 'low_price': 'low', 'trade_price': 'close',
+                       'candle_acc_trade_price': 'volume', 'candle_date_time_utc': 'time'}, inplace=True)
+    df['time'] = pd.to_datetime(df['time'])
+    return df
+
+
+def tuple_decode(data):
+    """decode_candles 도입 전의 행 단위 변환 (정렬 + 캔들마다 pd.Timestamp)"""
+    data = sorted(data, key=lambda c: c['candle_date_time_utc'])
+    rows = [(fetcher._to_epoch(c['candle_date_time_utc']), float(c['opening_price']), float(c['high_price']),
+             float(c['low_price']), float(c['trade_price']), float(c['candle_acc_trade_price'])) for c in data]
+    return np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+
+def legacy_calculate(df_base, df_1m, log_24h_vol=0, params=None):
+    """배열 경로 도입 전의 IndicatorCalculator.calculate (pandas 슬라이스/라벨 조회, 결과 비교 기준)"""
+    if params is None:
+        params = {}
+
+    # 파라미터 가져오기 (기본값 설정)
+    pass1_n = params.get('pass1_n', 3)
+    wide_n = params.get('wide_n', 17)  # Wide1 기본값
+    wide2_n = params.get('wide2_n', 3) # Wide2 기본값
+    trend_n = params.get('trend_n', 2)
+    fast_n = params.get('fast_n', 24)
+
+    # 데이터 유효성 검사
+    if df_base is None or df_base.empty or len(df_base) < (wide_n * 2 + 5):
+        return {}
+
+    # 1. PASS1_Ratio (거래량 비율)
+    # df_1m이 비어있으면 0 처리
+    if df_1m is not None and len(df_1m) >= 2:
+        # [수정] 현재 진행중인 1분봉(-1)이 아니라, '직전 완성된 1분봉(-2)'의 거래대금을 사용
+        cur_1m_vol = df_1m.iloc[-2]['volume'] 
+    elif df_1m is not None and not df_1m.empty:
+        cur_1m_vol = df_1m.iloc[-1]['volume']
+    else:
+        cur_1m_vol = 0
+
+    # 기준 분봉(df_base)의 직전 N개 평균 거래량 (거래대금)
+    # 수정: 인덱싱 범위를 [-(n+1) : -1]로 하여 '진행중인 봉' 제외하고 '직전 완성봉'부터 N개를 가져옴
+    base_vol_avg_N = df_base['volume'].iloc[-(pass1_n + 1):-1].mean()
+
+    # 분모가 0이거나 데이터가 없으면 방어 처리
+    if base_vol_avg_N > 0:
+        pass1_ratio = cur_1m_vol / base_vol_avg_N
+    else:
+        pass1_ratio = 0
+
+    # 2. BID5_Ratio (직전 2개 캔들 거래량 합 / 24시간 거래량)
+    bid_sum_2 = df_base['volume'].iloc[-3:-1].sum()
+    final_24h_vol = log_24h_vol if log_24h_vol > 0 else df_base['volume'].sum()
+    bid5_ratio = bid_sum_2 / final_24h_vol if final_24h_vol > 0 else 0
+
+    # 3. wideTrendAvg (Wide1 - 장기)
+    ma_curr = df_base['close'].iloc[-(wide_n+1):-1].mean()
+    ma_prev = df_base['close'].iloc[-(2*wide_n+1):-(wide_n+1)].mean()
+    wide_trend = ma_curr / ma_prev if ma_prev > 0 else 1.0
+
+    # 4. wideTrendAvg2 (Wide2 - 중기)
+    ma2_curr = df_base['close'].iloc[-(wide2_n+1):-1].mean()
+    ma2_prev = df_base['close'].iloc[-(2*wide2_n+1):-(wide2_n+1)].mean()
+    wide_trend2 = ma2_curr / ma2_prev if ma2_prev > 0 else 1.0
+
+    # 5. trendAvg (Trend - 단기)
+    trend_curr = df_base['close'].iloc[-(trend_n+1):-1].mean()
+    trend_prev = df_base['close'].iloc[-(2*trend_n+1):-(trend_n+1)].mean()
+    trend_avg_val = trend_curr / trend_prev if trend_prev > 0 else 1.0
+
+    # 6. CrossAvg (이격도: Trend / Wide1)
+    # Trend(단기) / Wide1(장기) -> 값이 1보다 크면 단기가 장기보다 높음(골든크로스 방향)
+    cross_avg = trend_curr / ma_curr if ma_curr > 0 else 1.0
+
+    # 7. FastRate (고점 대비 하락률)
+    window_fast = df_base.iloc[-(fast_n + 1):-1]
+    if not window_fast.empty:
+        max_vol_idx_rel = window_fast['volume'].argmax()
+        max_vol_idx_abs = window_fast.index[max_vol_idx_rel]
+        target_idx = max_vol_idx_abs - 2 # 고점 2칸 전
+
+        if target_idx in df_base.index:
+            max_vol = df_base.loc[max_vol_idx_abs]['volume']
+            target_vol = df_base.loc[target_idx]['volume']
+            fast_rate = (target_vol - max_vol) / max_vol if max_vol > 0 else 0
+        else:
+            fast_rate = 0
+    else:
+        fast_rate = 0
+
+    # 8. upRate (Volume 변동률)
+    vol_prev = df_base.iloc[-2]['volume']
+    vol_prev_2 = df_base.iloc[-3]['volume']
+    up_rate = (vol_prev - vol_prev_2) / vol_prev_2 if vol_prev_2 > 0 else 0
+
+    # 9. PrevPriceRate (직전 캔들 가격 등락률 %)
+    close_prev = df_base.iloc[-2]['close']   # 직전 봉 종가
+    close_prev_2 = df_base.iloc[-3]['close'] # 전전 봉 종가
+    price_rate = ((close_prev - close_prev_2) / close_prev_2) * 100 if close_prev_2 > 0 else 0
+
+    return {
+        f"PASS1_Ratio (avg{pass1_n})": pass1_ratio, # 0
+        "BID5_Ratio": bid5_ratio,                   # 1
+        f"wideTrendAvg (n{wide_n})": wide_trend,    # 2
+        f"wideTrendAvg2 (n{wide2_n})": wide_trend2, # 3
+        f"trendAvg (n{trend_n})": trend_avg_val,    # 4
+        "CrossAvg": cross_avg,                      # 5
+        f"FastRate (range{fast_n})": fast_rate,     # 6
+        "upRate(Vol)": up_rate,                     # 7
+        "PrevPriceRate(%)": price_rate,             # 8
+        "settings": f"{df_base.attrs.get('interval')}분" # 9
+    }
+
+
+def legacy_entry_scan(combined_samples, n_fail, cached_data, target_intervals, list_p1, list_w1,
+                      range_p1_ratio, use_yangbong, use_vol_up):
+    """변경 전 Tab 6 채점 (calculate_grid 로 WideTrend 미리 계산 + 조합 x 거래 이중 루프), 결과 비교용으로 보존"""
+    calc = IndicatorCalculator()
+    wide_grid = {'pass1_n': [3], 'wide_n': list_w1, 'wide2_n': [2], 'trend_n': [1], 'fast_n': [10]}
+    wide_by_key = {}
+    for _, row in combined_samples.iterrows():
+        ts_str = str(row['timestamp'])
+        if '+' in ts_str: trade_time = pd.to_datetime(ts_str).tz_convert(None)
+        else: trade_time = pd.to_datetime(ts_str)
+        df_1m = cached_data[(row['market'], trade_time, 1)]
+        for interval in target_intervals:
+            df_base = cached_data[(row['market'], trade_time, interval)]
+            if df_1m.empty or df_base.empty: continue
+            grid = calc.calculate_grid(df_base, df_1m, row.get('bid5_24h', 0), wide_grid)
+            wide_by_key[(row['market'], trade_time, interval)] = dict(zip(grid['wide_n'].tolist(), grid['wide_trend'].tolist()))
+
+    combinations = list(itertools.product(target_intervals, list_p1, list_w1))
+
+    results = []
+
+    for combo in combinations:
+        interval, n_p1, n_w1 = combo
+
+        # 카운터
+        cnt_ok_pass = 0    # 성공 케이스인데 조건 통과한 수 (Win)
+        cnt_fail_pass = 0  # 실패 케이스인데 조건 통과한 수 (Loss)
+        cnt_fail_skip = 0  # 실패 케이스인데 조건 안 맞아서 잘 거른 수 (Avoid)
+        cnt_ok_skip = 0    # 성공 케이스인데 조건 너무 빡빡해서 놓친 수 (Miss)
+
+        for idx, row in combined_samples.iterrows():
+            market = row['market']
+            # UTC 시간 문제 해결
+            ts_str = str(row['timestamp'])
+            if '+' in ts_str: trade_time = pd.to_datetime(ts_str).tz_convert(None)
+            else: trade_time = pd.to_datetime(ts_str)
+
+            # [1] 1분봉 데이터 가져오기 (디테일 확인용)
+            df_1m = cached_data[(market, trade_time, 1)]
+
+            # [2] 기준 분봉 데이터 가져오기 (배경 확인용)
+            df_base = cached_data[(market, trade_time, interval)]
+
+            if df_1m.empty or df_base.empty: continue
+
+            # --- [형님의 PASS 1 로직 직접 구현] ---
+            # 1. 1분봉 파워 (직전 1분봉 거래대금) - 실제 체결된 봉 기준
+            # timestamp가 '진입 시점'이라면, 그 직전에 완성된 1분봉을 봐야 함 (iloc[-1] or -2 주의)
+            # 보통 백테스팅에선 iloc[-2]가 '직전 완성봉'
+            last_1m = df_1m.iloc[-2] 
+            vol_1m = last_1m['volume'] * last_1m['close'] # 거래대금 근사치
+
+            # 2. 기준 분봉 배경 (N개 평균)
+            # df_base에서 N개 가져오기
+            if len(df_base) < n_p1 + 1: continue
+            base_subset = df_base.iloc[-(n_p1+1):-1] # 직전 완성봉들
+            avg_base_val = (base_subset['volume'] * base_subset['close']).mean()
+
+            # 3. 비율 계산
+            if avg_base_val == 0: pass1_ratio = 0
+            else: pass1_ratio = vol_1m / avg_base_val
+
+            # --- [필터링 1: 비율 조건] ---
+            if not (range_p1_ratio[0] <= pass1_ratio <= range_p1_ratio[1]):
+                # 범위 밖이면 진입 안함 (Skip)
+                if row['result'] == 'ok': cnt_ok_skip += 1
+                else: cnt_fail_skip += 1
+                continue
+
+            # --- [필터링 2: 체결강도 시뮬레이션 (Skip 조건)] ---
+            # 양봉 조건: 시가보다 종가가 높았나?
+            if use_yangbong and (last_1m['close'] <= last_1m['open']):
+                if row['result'] == 'ok': cnt_ok_skip += 1
+                else: cnt_fail_skip += 1
+                continue
+
+            # 거래량 증가 조건
+            if use_vol_up:
+                prev_1m = df_1m.iloc[-3]
+                if last_1m['volume'] <= prev_1m['volume']:
+                    if row['result'] == 'ok': cnt_ok_skip += 1
+                    else: cnt_fail_skip += 1
+                    continue
+
+            # --- [필터링 3: 추세 지표 (WideTrend)] ---
+            # 이건 기존 계산기 활용 (calculate_grid 로 미리 계산, NaN 이면 데이터 부족)
+            # WideTrend만 봅니다
+            wd_val = wide_by_key[(market, trade_time, interval)][n_w1]
+            if np.isnan(wd_val): continue
+
+            # WideTrend가 1.0 이상이어야 진입한다고 가정 (기본 필터)
+            if wd_val < 1.0:
+                 if row['result'] == 'ok': cnt_ok_skip += 1
+                 else: cnt_fail_skip += 1
+                 continue
+
+            # --- [최종 진입] ---
+            # 여기까지 왔으면 매수 버튼 누른 것
+            if row['result'] == 'ok': cnt_ok_pass += 1
+            else: cnt_fail_pass += 1
+
+        # --- [점수 산정] ---
+        total_try = cnt_ok_pass + cnt_fail_pass
+        if total_try == 0: continue
+
+        win_rate = cnt_ok_pass / total_try
+        # 실패 방어율: 원래 실패였던 애들 중 몇 개나 안 사고 넘겼나?
+        fail_total = n_fail
+        avoid_rate = cnt_fail_skip / fail_total if fail_total > 0 else 0
+
+        score = (win_rate * 0.7) + (avoid_rate * 0.3)
+
+        results.append({
+            "Score": score,
+            "설정": f"[{interval}분봉] vs 1분봉",
+            "PASS1_N": n_p1,
+            "Wide_N": n_w1,
+            "승률(Win Rate)": f"{win_rate*100:.1f}%",
+            "진입 횟수": total_try,
+            "실패 방어율": f"{avoid_rate*100:.1f}%",
+            "놓친 수익(Miss)": cnt_ok_skip
+        })
+    return results
+
+
+def baseline_entry_scan(combined_samples, n_fail, cached_data, target_intervals, list_p1, list_w1,
+                        range_p1_ratio, use_yangbong, use_vol_up):
+    """
+    최초 Tab 6 채점 (조합 x 거래마다 IndicatorCalculator 를 새로 만들어 원본 calculate(legacy_calculate) 호출), 결과 비교용으로 보존
+    1분봉이 1개뿐이면 iloc[-2], 거래량 증가 조건에서 2개뿐이면 iloc[-3] 에서 IndexError (지금 채점은 그 거래를 세지 않음)
+    """
+    combinations = list(itertools.product(target_intervals, list_p1, list_w1))
+
+    results = []
+
+    for combo in combinations:
+        interval, n_p1, n_w1 = combo
+
+        cnt_ok_pass = 0    # 성공 케이스인데 조건 통과한 수 (Win)
+        cnt_fail_pass = 0  # 실패 케이스인데 조건 통과한 수 (Loss)
+        cnt_fail_skip = 0  # 실패 케이스인데 조건 안 맞아서 잘 거른 수 (Avoid)
+        cnt_ok_skip = 0    # 성공 케이스인데 조건 너무 빡빡해서 놓친 수 (Miss)
+
+        for idx, row in combined_samples.iterrows():
+            market = row['market']
+            ts_str = str(row['timestamp'])
+            if '+' in ts_str: trade_time = pd.to_datetime(ts_str).tz_convert(None)
+            else: trade_time = pd.to_datetime(ts_str)
+
+            log_24h = row.get('bid5_24h', 0)
+
+            df_1m = cached_data[(market, trade_time, 1)]
+            df_base = cached_data[(market, trade_time, interval)]
+
+            if df_1m.empty or df_base.empty: continue
+
+            # 직전 완성 1분봉 거래대금 / 기준 분봉 직전 N개 평균 거래대금
+            last_1m = df_1m.iloc[-2]
+            vol_1m = last_1m['volume'] * last_1m['close'] # 거래대금 근사치
+
+            if len(df_base) < n_p1 + 1: continue
+            base_subset = df_base.iloc[-(n_p1+1):-1] # 직전 완성봉들
+            avg_base_val = (base_subset['volume'] * base_subset['close']).mean()
+
+            if avg_base_val == 0: pass1_ratio = 0
+            else: pass1_ratio = vol_1m / avg_base_val
+
+            if not (range_p1_ratio[0] <= pass1_ratio <= range_p1_ratio[1]):
+                if row['result'] == 'ok': cnt_ok_skip += 1
+                else: cnt_fail_skip += 1
+                continue
+
+            if use_yangbong and (last_1m['close'] <= last_1m['open']):
+                if row['result'] == 'ok': cnt_ok_skip += 1
+                else: cnt_fail_skip += 1
+                continue
+
+            if use_vol_up:
+                prev_1m = df_1m.iloc[-3]
+                if last_1m['volume'] <= prev_1m['volume']:
+                    if row['result'] == 'ok': cnt_ok_skip += 1
+                    else: cnt_fail_skip += 1
+                    continue
+
+            # WideTrend 는 조합/거래마다 계산기를 새로 만들어 calculate
+            df_base.attrs['interval'] = interval
+            p_sim = {'pass1_n': 3, 'wide_n': n_w1, 'wide2_n': 2, 'trend_n': 1, 'fast_n': 10}
+            res_ind = legacy_calculate(df_base, df_1m, log_24h, p_sim)
+            if not res_ind: continue
+
+            wd_val = res_ind.get(f"wideTrendAvg (n{n_w1})", 0)
+            if wd_val < 1.0:
+                 if row['result'] == 'ok': cnt_ok_skip += 1
+                 else: cnt_fail_skip += 1
+                 continue
+
+            if row['result'] == 'ok': cnt_ok_pass += 1
+            else: cnt_fail_pass += 1
+
+        total_try = cnt_ok_pass + cnt_fail_pass
+        if total_try == 0: continue
+
+        win_rate = cnt_ok_pass / total_try
+        avoid_rate = cnt_fail_skip / n_fail if n_fail > 0 else 0
+
+        score = (win_rate * 0.7) + (avoid_rate * 0.3)
+
+        results.append({
+            "Score": score,
+            "설정": f"[{interval}분봉] vs 1분봉",
+            "PASS1_N": n_p1,
+            "Wide_N": n_w1,
+            "승률(Win Rate)": f"{win_rate*100:.1f}%",
+            "진입 횟수": total_try,
+            "실패 방어율": f"{avoid_rate*100:.1f}%",
+            "놓친 수익(Miss)": cnt_ok_skip
+        })
+    return results
@@ -0,0 +1,37 @@
+"""테스트/벤치마크 공용 합성 데이터 (스텁 서버와 같은 데이터, 네트워크 없이)"""
+import numpy as np
+import pandas as pd
+
+from src.candle_store import rows_to_frame
+from src.upbit_stub import aggregate_minutes, synthetic_minutes
+
+
+def synthetic_history(days, interval):
+    """2024-03-01 부터 days 일치 합성 (기준 분봉, 1분봉) DataFrame"""
+    start = int(pd.Timestamp('2024-03-01').value // 10**9)
+    minutes = synthetic_minutes('KRW-BTC', start, start + days * 86400)
+    return rows_to_frame(aggregate_minutes(minutes, interval)), rows_to_frame(minutes)
+
+
+def synthetic_trades(n_trades, intervals, seed=0):
+    """합성 거래 + Tab 6 형식 캔들 프레임 {(market, trade_time, 분봉): DataFrame} (일부는 캔들이 없거나 짧음)"""
+    rng = np.random.default_rng(seed)
+    _, df_1m_all = synthetic_history(3, 1)
+    minutes = np.column_stack([df_1m_all['time'].to_numpy().astype('datetime64[s]').astype(np.int64),
+                               df_1m_all[['open', 'high', 'low', 'close', 'volume']].to_numpy()])
+    base_all = {interval: aggregate_minutes(minutes, interval) for interval in intervals}
+
+    trades, frames = [], {}
+    for t in range(n_trades):
+        market = f"KRW-M{t % 25:03d}"
+        ts = int(minutes[rng.integers(3000, len(minutes)), 0]) + int(rng.integers(0, 60))
+        trade_time = pd.Timestamp(ts, unit='s') + pd.Timedelta(seconds=t)  # 거래마다 다른 시각
+        m1 = minutes[minutes[:, 0] < ts][-int(rng.choice([0, 3, 20, 20, 20])):] if t % 17 else minutes[:0]
+        frames[(market, trade_time, 1)] = rows_to_frame(m1) if len(m1) else pd.DataFrame()
+        for interval in intervals:
+            rows = base_all[interval]
+            count = int(rng.choice([0, 6, 30, 60, 100, 100, 100]))
+            rows = rows[rows[:, 0] < ts][-count:] if count else rows[:0]
+            frames[(market, trade_time, interval)] = rows_to_frame(rows) if len(rows) else pd.DataFrame()
+        trades.append({'timestamp': trade_time, 'market': market, 'result': 'ok' if rng.random() < 0.45 else 'x'})
+    return pd.DataFrame(trades), frames
@@ -0,0 +1,29 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from src.calculator import GRID_COLUMNS, IndicatorCalculator
+from tests.synthetic import synthetic_history
+
+
+@pytest.fixture(scope="module")
+def history():
+    return synthetic_history(1, 5)
+
+
+def test_calculate_grid_matches_calculate(history):
+    df_base, df_1m = history
+    df_base, df_1m = df_base.iloc[-120:], df_1m.iloc[-60:]
+    grid = {'pass1_n': [1, 3, 7], 'wide_n': [5, 20, 60], 'wide2_n': [1, 4], 'trend_n': [1, 3], 'fast_n': [5, 24]}
+    calc = IndicatorCalculator()
+    out = calc.calculate_grid(df_base, df_1m, 0, grid)
+    values = out[GRID_COLUMNS].to_numpy()
+    for i, combo in enumerate(itertools.product(*grid.values())):
+        params = dict(zip(grid, combo))
+        assert tuple(out.loc[i, list(grid)]) == combo
+        ref = calc.calculate(df_base, df_1m, 0, params)
+        if ref is None:
+            assert np.isnan(values[i]).all()
+            continue
+        assert np.allclose(values[i], ref[:len(GRID_COLUMNS)], rtol=1e-9), params
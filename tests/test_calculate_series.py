@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from src.calculator import INDICATOR_FIELDS, IndicatorBatch, IndicatorCalculator
+from tests.synthetic import synthetic_history
+
+
+@pytest.fixture(scope="module")
+def history():
+    return synthetic_history(1, 5)
+
+
+@pytest.mark.parametrize("lookback", [None, 60])
+def test_calculate_series_matches_calculate(history, lookback):
+    df_base, df_1m = history
+    calc = IndicatorCalculator()
+    params = {'pass1_n': 4, 'wide_n': 10}
+    series = calc.calculate_series(df_base, df_1m, 0, params, None, lookback)
+    batch = IndicatorBatch.from_frame(series)
+    m1_time = df_1m['time']
+    for i in range(0, len(df_base), 3):
+        window = df_base.iloc[0 if lookback is None else max(0, i + 1 - lookback):i + 1]
+        ref = calc.calculate(window, df_1m[m1_time <= df_base['time'].iat[i]], 0, params)
+        if ref is None:
+            assert not batch.valid[i]
+            continue
+        assert batch.valid[i]
+        assert np.allclose(series[list(INDICATOR_FIELDS)].iloc[i].to_numpy(), ref[:len(INDICATOR_FIELDS)], rtol=1e-9)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from src.calculator import INDICATOR_FIELDS, IndicatorCalculator
+from tests.legacy import legacy_calculate
+from tests.synthetic import synthetic_history
+
+
+@pytest.fixture(scope="module")
+def history():
+    return synthetic_history(1, 5)
+
+
+def _expected(ref):
+    return [v for k, v in ref.items() if k != 'settings']
+
+
+def test_calculate_matches_legacy(history):
+    df_base_all, df_1m_all = history
+    calc = IndicatorCalculator()
+    m1_end = np.searchsorted(df_1m_all['time'].to_numpy(), df_base_all['time'].to_numpy(), side='right')
+    for e in range(40, len(df_base_all), 7):
+        df_base = df_base_all.iloc[max(0, e - 200):e]
+        df_1m = df_1m_all.iloc[max(0, m1_end[e - 1] - 60):m1_end[e - 1]]
+        for params in ({}, {'pass1_n': 1, 'wide_n': 5, 'wide2_n': 1, 'trend_n': 1, 'fast_n': 3}):
+            old = legacy_calculate(df_base, df_1m, 0, params)
+            new = calc.calculate(df_base, df_1m, 0, params)
+            if not old:
+                assert new is None
+                continue
+            assert list(old) == list(new.as_dict())
+            assert np.allclose(_expected(old), new[:len(INDICATOR_FIELDS)], rtol=1e-12)
+
+
+def test_calculate_not_enough_data(history):
+    df_base, df_1m = history
+    assert IndicatorCalculator().calculate(df_base.iloc[:10], df_1m) is None
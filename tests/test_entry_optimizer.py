@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.entry_optimizer import build_entry_features, score_entry_filters
+from tests.legacy import baseline_entry_scan, legacy_entry_scan
+from tests.synthetic import synthetic_trades
+
+INTERVALS = [5, 10]
+PASS1_NS = [1, 3, 8]
+WIDE_NS = [10, 20, 30]
+
+
+@pytest.fixture(scope="module")
+def trades():
+    return synthetic_trades(24, INTERVALS, seed=3)
+
+
+@pytest.mark.parametrize("ratio_range,use_yangbong,use_vol_up", [
+    ((0.1, 2.0), True, False),
+    ((0.0, 10.0), False, False),
+    ((0.0, 10.0), True, True),
+])
+def test_scores_match_legacy_loop(trades, ratio_range, use_yangbong, use_vol_up):
+    df, frames = trades
+    n_fail = int((df['result'] == 'x').sum())
+    base = baseline_entry_scan(df, n_fail, frames, INTERVALS, PASS1_NS, WIDE_NS, ratio_range, use_yangbong, use_vol_up)
+    old = legacy_entry_scan(df, n_fail, frames, INTERVALS, PASS1_NS, WIDE_NS, ratio_range, use_yangbong, use_vol_up)
+    features = build_entry_features(df, list(df['timestamp']), frames, INTERVALS, PASS1_NS, WIDE_NS)
+    new = score_entry_filters(features, ratio_range, use_yangbong, use_vol_up)
+    assert base
+    assert base == old == new.to_dict('records')
+
+
+@pytest.mark.parametrize("m1_rows,use_vol_up", [(1, False), (2, True)])
+def test_short_minute_frames_are_skipped(trades, m1_rows, use_vol_up):
+    # 최초 루프는 IndexError 로 멈추던 거래: 지금은 세지 않음 (그 거래를 뺀 결과와 같음)
+    df, frames = trades
+    frames = dict(frames)
+    n_fail = int((df['result'] == 'x').sum())
+    t = next(t for t, (market, ts) in enumerate(zip(df['market'], df['timestamp']))
+             if len(frames[(market, ts, 1)]) >= 3 and not frames[(market, ts, INTERVALS[0])].empty)
+    key = (df['market'].iat[t], df['timestamp'].iat[t], 1)
+    frames[key] = frames[key].iloc[-m1_rows:].reset_index(drop=True)
+    with pytest.raises(IndexError):
+        baseline_entry_scan(df, n_fail, frames, INTERVALS, PASS1_NS, WIDE_NS, (0.0, 10.0), False, use_vol_up)
+
+    expected = baseline_entry_scan(df.drop(df.index[t]), n_fail, frames, INTERVALS, PASS1_NS, WIDE_NS,
+                                   (0.0, 10.0), False, use_vol_up)
+    features = build_entry_features(df, list(df['timestamp']), frames, INTERVALS, PASS1_NS, WIDE_NS)
+    assert expected == score_entry_filters(features, (0.0, 10.0), False, use_vol_up).to_dict('records')
+
+
+def _flat_tail_trades(n_trades, level=17.3, seed=7):
+    # 앞 50개는 랜덤, 뒤 50개는 같은 가격인 기준 분봉 (거래 없는 비유동 마켓처럼 WideTrend 가 정확히 1.0)
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp('2024-03-01 00:00:00')
+    trades, frames = [], {}
+    for t in range(n_trades):
+        trade_time = base + pd.Timedelta(hours=t)
+        close = np.r_[rng.uniform(level * 0.9, level * 1.1, 50), np.full(50, level)]
+        frames[('KRW-FLAT', trade_time, 5)] = pd.DataFrame({
+            'time': pd.date_range(end=trade_time, periods=100, freq='5min'),
+            'open': close, 'high': close, 'low': close, 'close': close,
+            'volume': rng.uniform(1e5, 1e6, 100),
+        })
+        m1 = rng.uniform(level * 0.99, level * 1.01, 20)
+        frames[('KRW-FLAT', trade_time, 1)] = pd.DataFrame({
+            'time': pd.date_range(end=trade_time, periods=20, freq='1min'),
+            'open': m1, 'high': m1, 'low': m1, 'close': m1 + 0.01,
+            'volume': rng.uniform(1e4, 1e5, 20),
+        })
+        trades.append({'timestamp': trade_time, 'market': 'KRW-FLAT', 'result': 'ok' if t % 2 else 'x'})
+    return pd.DataFrame(trades), frames
+
+
+def test_flat_price_tail_matches_baseline():
+    # 평평한 가격에서 WideTrend 가 정확히 1.0 이어야 wide >= 1.0 진입 판정이 원래 루프와 같음
+    df, frames = _flat_tail_trades(40)
+    wide_ns = [5, 10, 15, 20]
+    base = baseline_entry_scan(df, int((df['result'] == 'x').sum()), frames, [5], PASS1_NS, wide_ns,
+                               (0.0, 1e9), False, False)
+    features = build_entry_features(df, list(df['timestamp']), frames, [5], PASS1_NS, wide_ns)
+    assert (features.wide[:, 0, :] == 1.0).all()
+    assert base == score_entry_filters(features, (0.0, 1e9), False, False).to_dict('records')
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src import fetcher
+from src.fetch_planner import fetch_windows, plan_stats
+from src.upbit_stub import LISTED_AT, UpbitStubServer
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    # 캔들 저장소 없이 로컬 스텁 서버로 조회, 끝나면 원래 설정으로
+    old_url = fetcher.UPBIT_API_URL
+    monkeypatch.setattr(fetcher, 'CANDLE_DB_PATH', "")
+    monkeypatch.setattr(fetcher, '_candle_store', None)
+    with UpbitStubServer(rate_limit=None) as server:
+        fetcher.configure_http(base_url=server.url)
+        yield server
+    fetcher.configure_http(base_url=old_url)
+
+
+def test_fetch_windows_matches_fetch_many(stub):
+    base = pd.Timestamp('2024-03-01 06:00:00')
+    listed = pd.Timestamp(LISTED_AT, unit='s')
+    jobs = [
+        ('KRW-AAA', base, 1, 60),
+        ('KRW-AAA', base + pd.Timedelta(minutes=37), 1, 60),
+        ('KRW-AAA', base + pd.Timedelta(minutes=90), 1, 200),
+        ('KRW-AAA', base, 5, 200),
+        ('KRW-AAA', base + pd.Timedelta(hours=3), 5, 200),
+        ('KRW-BBB', base, 1, 450),  # 여러 페이지 + 거래 없는 분 때문에 추가 페이지
+        ('KRW-BBB', listed + pd.Timedelta(minutes=30), 1, 100),  # 상장 시점에서 끊김
+    ]
+    expected = fetcher.fetch_many(jobs)
+    calls = stub.requests_served
+
+    seen = []
+    got = fetch_windows(jobs, progress=lambda done, total: seen.append((done, total)))
+    assert len(got) == len(jobs)
+    for job, old, new in zip(jobs, expected, got):
+        if old.empty:
+            assert new.empty
+            continue
+        # fetch_many 는 200개까지만 받으므로 끝 부분만 비교
+        pd.testing.assert_frame_equal(old, new.iloc[-len(old):].reset_index(drop=True))
+        if job[3] > fetcher.UPBIT_MAX_COUNT:
+            assert len(new) == job[3]
+            assert new['time'].is_monotonic_increasing and new['time'].is_unique
+    assert seen[-1] == (len(jobs), len(jobs))
+    n_jobs, naive, planned = plan_stats(jobs)
+    assert stub.requests_served - calls < naive
@@ -0,0 +1,24 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src import fetcher
+from src.candle_store import rows_to_frame
+from src.upbit_stub import candles_to_json, synthetic_candles
+from tests.legacy import legacy_decode, tuple_decode
+
+COLS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+
+@pytest.mark.parametrize("unit,count", [(1, 200), (5, 37), (240, 3)])
+def test_decode_candles_matches_legacy(unit, count):
+    to_ts = int(pd.Timestamp('2024-03-01 12:00:00').value // 10**9)
+    data = json.loads(json.dumps(candles_to_json('KRW-BTC', unit, synthetic_candles('KRW-BTC', unit, to_ts, count))))
+    new = rows_to_frame(fetcher.decode_candles(data))
+    pd.testing.assert_frame_equal(legacy_decode(data)[COLS].astype({'time': 'datetime64[ns]'}), new)
+    pd.testing.assert_frame_equal(rows_to_frame(tuple_decode(data)), new)
+
+
+def test_decode_candles_empty():
+    assert len(fetcher.decode_candles([])) == 0
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.calculator import IndicatorCalculator
+from src.indicator_cache import IndicatorCache, window_key
+from tests.synthetic import synthetic_history
+
+GRID = {'pass1_n': [3], 'wide_n': [10, 15, 20], 'wide2_n': [2], 'trend_n': [1], 'fast_n': [10]}
+
+
+def _window(df_base, df_1m, end):
+    m1_end = int(np.searchsorted(df_1m['time'].to_numpy(), df_base['time'].to_numpy()[end - 1], side='right'))
+    return df_base.iloc[end - 100:end], df_1m.iloc[m1_end - 20:m1_end]
+
+
+def test_cache_matches_calculator_and_counts_hits():
+    df_base, df_1m = synthetic_history(1, 5)
+    calc, cache = IndicatorCalculator(), IndicatorCache()
+    windows = [_window(df_base, df_1m, end) for end in (150, 200, 250)]
+    for _ in range(2):
+        for b, m in windows:
+            assert cache.calculate('KRW-BTC', b, m, 0, {'wide_n': 17}, 5) == calc.calculate(b, m, 0, {'wide_n': 17})
+            pd.testing.assert_frame_equal(cache.calculate_grid('KRW-BTC', b, m, 0, GRID, 5), calc.calculate_grid(b, m, 0, GRID))
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (6, 6, 6)
+
+
+def test_calculate_grid_returns_a_copy():
+    df_base, df_1m = synthetic_history(1, 5)
+    b, m = _window(df_base, df_1m, 200)
+    cache = IndicatorCache()
+    first = cache.calculate_grid('KRW-BTC', b, m, 0, GRID, 5)
+    expected = first.copy()
+    first['wide_trend'] = -1.0
+    pd.testing.assert_frame_equal(cache.calculate_grid('KRW-BTC', b, m, 0, GRID, 5), expected)
+
+
+def test_lru_evicts_beyond_max_entries():
+    df_base, df_1m = synthetic_history(1, 5)
+    cache = IndicatorCache(max_entries=2)
+    windows = [_window(df_base, df_1m, end) for end in (150, 200, 250)]
+    for b, m in windows:
+        cache.calculate('KRW-BTC', b, m, 0, None, 5)
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    cache.calculate('KRW-BTC', *windows[0], 0, None, 5)  # 가장 오래된 것은 밀려났으므로 다시 계산
+    assert cache.stats()['hits'] == 0
+
+
+def test_window_with_open_candle_is_not_cached():
+    # 오늘 로그의 거래처럼 거래가 든 캔들이 아직 진행 중이면 결과를 기억하지 않음
+    df_base, df_1m = synthetic_history(1, 5)
+    b, m = _window(df_base, df_1m, 200)
+    calc, cache = IndicatorCalculator(), IndicatorCache()
+    shift = pd.Timestamp.now(tz='UTC').tz_localize(None).floor('5min') - b['time'].iat[-1]
+    live_b, live_m = b.assign(time=b['time'] + shift), m.assign(time=m['time'] + shift)
+    assert window_key('KRW-BTC', live_b, live_m, 0, 5) is None
+    for _ in range(2):
+        assert cache.calculate('KRW-BTC', live_b, live_m, 0, None, 5) == calc.calculate(live_b, live_m)
+        cache.calculate_grid('KRW-BTC', live_b, live_m, 0, GRID, 5)
+    stats = cache.stats()
+    assert (len(cache), stats['hits'], stats['misses'], stats['bypassed']) == (0, 0, 0, 4)
+
+    # 분봉을 모르면 완성 여부를 알 수 없으므로 캐시하지 않음
+    assert window_key('KRW-BTC', b, m) is None
+    assert window_key('KRW-BTC', b, m, 0, 5) is not None
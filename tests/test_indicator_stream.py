@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.calculator import IndicatorCalculator
+from src.indicator_stream import IndicatorStreams
+from tests.synthetic import synthetic_history
+
+
+def test_first_minute_candle_reaches_its_own_stream():
+    streams = IndicatorStreams()
+    streams.on_candle('KRW-BTC', 1, 100.0, 5000.0)
+    assert streams.get('KRW-BTC', 1).last_1m_vol == 5000.0
+
+
+def test_streams_match_calculate_with_live_volume():
+    df_base, _ = synthetic_history(1, 1)
+    closes, vols = df_base['close'].tolist(), df_base['volume'].tolist()
+    calc = IndicatorCalculator()
+    streams = IndicatorStreams(lookback=200)
+
+    compared = 0
+    for i in range(260):
+        got = streams.on_candle('KRW-BTC', 1, closes[i], vols[i], live_volume=vols[i + 1])
+        # 완성봉 0..i + 진행 중 캔들 i+1 (1분봉 기준이면 기준 분봉 프레임이 곧 1분봉 프레임)
+        frame = df_base.iloc[max(0, i + 2 - 200):i + 2]
+        expected = calc.calculate(frame, frame)
+        if expected is None:
+            assert got is None
+            continue
+        np.testing.assert_allclose(got[:9], expected[:9], rtol=1e-9)
+        assert got[9] == expected[9]  # 파라미터 튜플
+        compared += 1
+    assert compared > 200
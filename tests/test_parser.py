@@ -0,0 +1,101 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import src.parser as parser
+from src.parser import load_all_data, parse_new_trades, parse_single_day_expi, parse_single_day_market
+from src.trade_cache import ParsedTradeCache
+from tests.conftest import FIXTURES
+from tests.legacy import legacy_parse_single_day_expi
+
+DATE = "2025-01-15"
+FIXTURE = os.path.join(FIXTURES, f"acc_log.{DATE}.txt")
+
+
+@pytest.fixture(params=["lf", "crlf"])
+def log_dir(request, tmp_path):
+    """픽스처 로그를 LF / CRLF 줄바꿈으로 복사한 데이터 폴더"""
+    with open(FIXTURE, 'rb') as f:
+        raw = f.read()
+    if request.param == "crlf":
+        raw = raw.replace(b'\n', b'\r\n')
+    with open(tmp_path / f"acc_log.{DATE}.txt", 'wb') as f:
+        f.write(raw)
+    return tmp_path
+
+
+def assert_same_as_legacy(new_df, old_df):
+    # 출력 dtype(categorical/float32/datetime64[ns])이 바뀌었으므로 원본 결과를 같은 dtype으로 맞춘 뒤 비교
+    pd.testing.assert_frame_equal(new_df.reset_index(drop=True), old_df.reset_index(drop=True).astype(new_df.dtypes.to_dict()))
+
+
+def test_fixture_covers_all_results():
+    old = legacy_parse_single_day_expi(FIXTURE, DATE)
+    assert set(old['result']) == {'ok', 'x', 'NB'}
+    assert len(old) == 4
+
+
+def test_parse_single_day_expi_matches_legacy(log_dir):
+    path = str(log_dir / f"acc_log.{DATE}.txt")
+    assert_same_as_legacy(parse_single_day_expi(path, DATE), legacy_parse_single_day_expi(path, DATE))
+
+
+def test_chunked_parse_matches_legacy(log_dir, monkeypatch):
+    # 작은 파일도 청크로 나뉘도록 최소 청크 크기를 낮춤
+    monkeypatch.setattr(parser, 'PARALLEL_MIN_CHUNK_BYTES', 256)
+    path = str(log_dir / f"acc_log.{DATE}.txt")
+    assert_same_as_legacy(parse_single_day_expi(path, DATE, workers=3), legacy_parse_single_day_expi(path, DATE))
+
+
+@pytest.mark.parametrize("markets", [['KRW-AAA'], ['KRW-BBB', 'KRW-CCC']])
+def test_parse_single_day_market_matches_legacy(log_dir, markets):
+    path = str(log_dir / f"acc_log.{DATE}.txt")
+    old = legacy_parse_single_day_expi(path, DATE)
+    assert_same_as_legacy(parse_single_day_market(path, DATE, markets), old[old['market'].isin(markets)])
+
+
+def test_load_all_data_matches_legacy(log_dir, tmp_path):
+    old = legacy_parse_single_day_expi(str(log_dir / f"acc_log.{DATE}.txt"), DATE)
+    assert_same_as_legacy(load_all_data(str(log_dir), [DATE], max_workers=1), old)
+
+    # 캐시에 저장한 뒤 다시 읽어도 같은 결과
+    cache = ParsedTradeCache(str(tmp_path / "cache"))
+    assert_same_as_legacy(load_all_data(str(log_dir), [DATE], max_workers=1, cache=cache), old)
+    assert_same_as_legacy(load_all_data(str(log_dir), [DATE], max_workers=1, cache=cache), old)
+
+
+def test_load_all_data_multiple_days(tmp_path):
+    for day in ("2025-01-15", "2025-01-16"):
+        shutil.copy(FIXTURE, tmp_path / f"acc_log.{day}.txt")
+    old = pd.concat([legacy_parse_single_day_expi(str(tmp_path / f"acc_log.{day}.txt"), day)
+                     for day in ("2025-01-15", "2025-01-16")])
+    new = load_all_data(str(tmp_path), ["2025-01-15", "2025-01-16"], max_workers=2)
+    assert new.attrs['load_errors'] == []
+    assert_same_as_legacy(new, old.astype({'date': str}))
+
+
+def test_parse_new_trades_resumes_and_detects_replacement(tmp_path):
+    with open(FIXTURE, 'rb') as f:
+        raw = f.read()
+    path = tmp_path / f"acc_log.{DATE}.txt"
+    ckpt = str(tmp_path / "tail.ckpt")
+    old = legacy_parse_single_day_expi(FIXTURE, DATE)
+
+    # 줄 중간에서 끊어 두 번에 나눠 써도 한 번에 파싱한 것과 같음
+    cut = raw.index(b'ASK start') + 3
+    path.write_bytes(raw[:cut])
+    first = parse_new_trades(str(path), DATE, ckpt)
+    with open(path, 'ab') as f:
+        f.write(raw[cut:])
+    second = parse_new_trades(str(path), DATE, ckpt, final=True)
+    assert_same_as_legacy(pd.concat([first, second]), old)
+    assert parse_new_trades(str(path), DATE, ckpt).empty
+
+    # 더 큰 다른 파일로 교체되면 오래된 오프셋에서 이어 읽지 않고 처음부터
+    replaced = tmp_path / "replaced.txt"
+    replaced.write_bytes(b'[08:59:59.000] INFO - rotated header line KRW-AAA\n' + raw + raw[-200:])
+    os.replace(replaced, path)
+    again = parse_new_trades(str(path), DATE, ckpt, final=True)
+    assert len(again) == len(old)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import fetcher, upbit_stub
+from src.resample import resample_candles, resample_rows
+from src.upbit_stub import LISTED_AT, UpbitStubServer, aggregate_minutes, synthetic_minutes
+
+INTERVALS = [3, 5, 15, 60, 240]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    old_url = fetcher.UPBIT_API_URL
+    monkeypatch.setattr(fetcher, 'CANDLE_DB_PATH', "")
+    monkeypatch.setattr(fetcher, '_candle_store', None)
+    with UpbitStubServer(rate_limit=None) as server:
+        fetcher.configure_http(base_url=server.url)
+        yield server
+    fetcher.configure_http(base_url=old_url)
+
+
+@pytest.mark.parametrize("unit", INTERVALS)
+def test_resample_rows_matches_stub_aggregation(unit):
+    to_ts = int(pd.Timestamp('2024-03-01 12:00:00').value // 10**9)
+    rows = synthetic_minutes('KRW-BTC', to_ts - 3 * 86400, to_ts)
+    np.testing.assert_allclose(resample_rows(rows, unit), aggregate_minutes(rows, unit), rtol=1e-12)
+
+
+@pytest.mark.parametrize("no_trade_rate,start", [
+    (0.15, pd.Timestamp('2024-03-01 00:00:00')),
+    (0.99, pd.Timestamp('2024-03-01 00:00:00')),  # 비유동 마켓: 거래 없는 버킷은 빠짐
+    (0.15, pd.Timestamp(LISTED_AT, unit='s') - pd.Timedelta(hours=4)),  # 상장 전 구간 포함
+])
+def test_resample_candles_matches_api_candles(stub, monkeypatch, no_trade_rate, start):
+    # 240분봉 경계에 맞춘 하루 구간의 1분봉을 묶으면 같은 구간의 API 분봉과 같음
+    monkeypatch.setattr(upbit_stub, 'NO_TRADE_RATE', no_trade_rate)
+    end = start + pd.Timedelta(days=1)
+    df_1m = fetcher.get_ohlcv_range('KRW-ILQ', start, end, interval_min=1)
+    for interval in [3, 15, 60, 240]:
+        expected = fetcher.get_ohlcv_range('KRW-ILQ', start, end, interval_min=interval)
+        pd.testing.assert_frame_equal(expected, resample_candles(df_1m, interval, start=start))